@@ -0,0 +1,357 @@
+"""
+Audio Fingerprint Index
+
+Recognizes re-uploads of the same cooking clip across platforms (YouTube Shorts,
+Instagram Reels, TikTok, ...) whose URLs have nothing in common, so a repost can
+reuse the stored parse result instead of running Whisper, OCR and the LLM again.
+
+Fingerprints are landmark hashes over the first seconds of audio: the strongest
+spectral peak per frequency band is picked from each STFT frame, and nearby
+peaks are paired into (freq1, freq2, time delta) hashes. Two clips match when
+enough hashes line up at the same relative time offset, which tolerates
+re-encoding, volume changes and a few seconds of trimmed/added intro.
+
+The index keeps one row per clip in SQLite (hashes and frames as int64 blobs),
+so adding a clip writes only that clip. In memory, postings live in sorted
+NumPy arrays: a merged main segment plus a small segment of recently added
+clips that is folded into the main one every `merge_every` additions. Voting
+is a searchsorted/unique pass over those arrays and runs outside the lock.
+Each stored clip keeps at most `max_hashes` hashes, spread evenly over time.
+Queries are not capped, so every landmark a stored clip kept can still vote,
+and the match ratio is taken against the smaller of the two sets.
+"""
+
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+SAMPLE_RATE = 8000
+N_FFT = 1024
+HOP = 512
+# Frequency band edges (FFT bins, ~7.8 Hz each at 8 kHz) - one peak per band per frame
+BAND_EDGES = [2, 10, 20, 40, 80, 160, 320, 512]
+FAN_OUT = 5
+MAX_DT = 63  # frames (~4s), must fit in 6 bits
+
+
+def decode_audio(audio_path: str, ffmpeg_path: str, seconds: float = 30.0, timeout: Optional[float] = None) -> np.ndarray:
+    """Decode the first `seconds` of an audio file to mono float32 samples at SAMPLE_RATE."""
+    cmd = [
+        ffmpeg_path,
+        "-i", audio_path,
+        "-t", str(seconds),
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", "s16le",
+        "-loglevel", "error",
+        "-"
+    ]
+    raw = subprocess.run(cmd, check=True, capture_output=True, timeout=timeout).stdout
+    return np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def compute_fingerprint(samples: np.ndarray) -> np.ndarray:
+    """
+    Compute landmark hashes for mono samples at SAMPLE_RATE.
+
+    Returns:
+        int64 array of shape (n, 2): [hash, anchor_frame] rows
+    """
+    if len(samples) < N_FFT:
+        return np.empty((0, 2), dtype=np.int64)
+
+    frames = np.lib.stride_tricks.sliding_window_view(samples, N_FFT)[::HOP]
+    spectrum = np.log1p(np.abs(np.fft.rfft(frames * np.hanning(N_FFT), axis=1)))
+
+    # Strongest bin per band, kept only if it stands out from the frame's other band peaks
+    band_bins = np.stack(
+        [lo + np.argmax(spectrum[:, lo:hi], axis=1) for lo, hi in zip(BAND_EDGES[:-1], BAND_EDGES[1:])],
+        axis=1
+    )
+    band_mags = np.take_along_axis(spectrum, band_bins, axis=1)
+    keep = (band_mags > band_mags.mean(axis=1, keepdims=True)) & (band_mags > 0.05)
+    peak_frames, band_idx = np.nonzero(keep)
+    peak_bins = band_bins[peak_frames, band_idx]
+    if len(peak_frames) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # Pair each anchor peak with the next FAN_OUT peaks (np.nonzero already orders them by frame)
+    hashes = []
+    for k in range(1, FAN_OUT + 1):
+        t1, t2 = peak_frames[:-k], peak_frames[k:]
+        f1, f2 = peak_bins[:-k], peak_bins[k:]
+        dt = t2 - t1
+        valid = (dt > 0) & (dt <= MAX_DT)
+        h = (f1[valid].astype(np.int64) << 16) | (f2[valid].astype(np.int64) << 6) | dt[valid]
+        hashes.append(np.stack([h, t1[valid]], axis=1))
+    return np.unique(np.concatenate(hashes), axis=0)
+
+
+# (entry, offset) pairs are packed into one int64 for counting; offsets stay far below 2**20 frames
+_OFFSET_BIAS = 1 << 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    key TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    hashes BLOB NOT NULL,
+    frames BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fingerprints_created_at ON fingerprints (created_at);
+"""
+
+
+class _Postings:
+    """Immutable postings segment: hashes sorted ascending, with the frame and entry id of each."""
+
+    def __init__(self, hashes: np.ndarray, frames: np.ndarray, entries: np.ndarray):
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        self.frames = frames[order]
+        self.entries = entries[order]
+
+    @classmethod
+    def build(cls, clips: List[Tuple[int, np.ndarray]], alive: Optional[np.ndarray] = None) -> "_Postings":
+        """Segment over (entry id, fingerprint) clips, dropping entries that are no longer alive."""
+        if alive is not None:
+            clips = [(entry, fp) for entry, fp in clips if entry < len(alive) and alive[entry]]
+        if not clips:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty, empty)
+        return cls(
+            np.concatenate([fp[:, 0] for _, fp in clips]),
+            np.concatenate([fp[:, 1] for _, fp in clips]),
+            np.concatenate([np.full(len(fp), entry, dtype=np.int64) for entry, fp in clips]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def votes(self, query: np.ndarray) -> np.ndarray:
+        """Packed (entry, time offset) pair for every posting that shares a hash with the query."""
+        lo = np.searchsorted(self.hashes, query[:, 0], side="left")
+        hi = np.searchsorted(self.hashes, query[:, 0], side="right")
+        counts = hi - lo
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Expand each [lo, hi) range into posting rows without a Python loop
+        starts = np.cumsum(counts) - counts
+        rows = np.repeat(lo, counts) + (np.arange(total) - np.repeat(starts, counts))
+        offsets = self.frames[rows] - np.repeat(query[:, 1], counts)
+        return (self.entries[rows] << 21) | (offsets + _OFFSET_BIAS)
+
+
+class AudioFingerprintIndex:
+    """
+    Local index of audio fingerprints, keyed by canonical video key.
+
+    Storage: SQLite table fingerprints(key, created_at, hashes, frames), one row per clip.
+    Postings are rebuilt in memory on load; keys get a fresh integer entry id on every add.
+    """
+
+    def __init__(
+        self,
+        index_file: Optional[str] = "audio_fingerprints.db",
+        max_entries: int = 5000,
+        min_matches: int = 20,
+        min_match_ratio: float = 0.05,
+        max_hashes: int = 2000,
+        merge_every: int = 64
+    ):
+        """
+        Initialize the index.
+
+        Args:
+            index_file: SQLite database used for persistence (None disables persistence)
+            max_entries: Maximum number of fingerprints kept (oldest are evicted)
+            min_matches: Minimum number of offset-aligned hashes for a match
+            min_match_ratio: Minimum fraction of the query's hashes that must align
+            max_hashes: Maximum number of hashes kept per clip
+            merge_every: Recently added clips are merged into the main postings after this many
+        """
+        self.index_file = index_file
+        self.max_entries = max_entries
+        self.min_matches = min_matches
+        self.min_match_ratio = min_match_ratio
+        self.max_hashes = max_hashes
+        self.merge_every = merge_every
+
+        # key -> (entry id, created_at), oldest first
+        self._entries: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._clips: Dict[int, np.ndarray] = {}
+        self._keys: Dict[int, str] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._next_entry = 0
+        self._main = _Postings.build([])
+        self._recent: List[Tuple[int, np.ndarray]] = []
+        self._recent_postings: Optional[_Postings] = None
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # Metrics
+        self.lookups = 0
+        self.matches = 0
+        self.adds = 0
+
+        self._load()
+
+    def cap(self, fingerprint: np.ndarray) -> np.ndarray:
+        """At most max_hashes rows, evenly spaced by anchor frame."""
+        if len(fingerprint) <= self.max_hashes:
+            return fingerprint
+        by_frame = np.argsort(fingerprint[:, 1], kind="stable")
+        keep = by_frame[np.linspace(0, len(fingerprint) - 1, self.max_hashes).astype(np.int64)]
+        return fingerprint[np.sort(keep)]
+
+    def _insert(self, key: str, fingerprint: np.ndarray, created_at: float) -> List[str]:
+        """Index a capped fingerprint in memory (lock held); returns the keys evicted to make room."""
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._drop_entry(previous[0])
+        entry = self._next_entry
+        self._next_entry += 1
+        if entry >= len(self._alive):
+            self._alive = np.concatenate([self._alive, np.zeros(max(64, len(self._alive)), dtype=bool)])
+        else:
+            self._alive = self._alive.copy()
+        self._alive[entry] = True
+        self._entries[key] = (entry, created_at)
+        self._keys[entry] = key
+        self._clips[entry] = fingerprint
+        self._recent.append((entry, fingerprint))
+        self._recent_postings = None
+
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            oldest, (oldest_entry, _) = self._entries.popitem(last=False)
+            self._drop_entry(oldest_entry)
+            evicted.append(oldest)
+        return evicted
+
+    def _drop_entry(self, entry: int):
+        # Copy-on-write: a match running outside the lock keeps the array it started with
+        self._alive = self._alive.copy()
+        self._alive[entry] = False
+        self._clips.pop(entry, None)
+        self._keys.pop(entry, None)
+
+    def _merge(self):
+        """Rebuild the main postings from the live clips and clear the recent segment."""
+        self._main = _Postings.build(sorted(self._clips.items()), self._alive)
+        self._recent = []
+        self._recent_postings = None
+
+    def add(self, key: str, fingerprint: np.ndarray):
+        """Store (or replace) the fingerprint of `key`."""
+        if len(fingerprint) == 0:
+            return
+        fingerprint = self.cap(np.asarray(fingerprint, dtype=np.int64))
+        created_at = time.time()
+        with self._lock:
+            evicted = self._insert(key, fingerprint, created_at)
+            if len(self._recent) >= self.merge_every:
+                self._merge()
+            self.adds += 1
+        self._save(key, fingerprint, created_at, evicted)
+
+    def match(self, fingerprint: np.ndarray, exclude_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Find the indexed clip that best matches `fingerprint`.
+
+        Returns:
+            {"key", "score", "ratio", "offset_frames"} or None if nothing clears the thresholds
+        """
+        with self._lock:
+            self.lookups += 1
+            if len(fingerprint) == 0:
+                return None
+            if self._recent_postings is None:
+                self._recent_postings = _Postings.build(self._recent)
+            segments = [self._main, self._recent_postings]
+            alive = self._alive
+            excluded = self._entries[exclude_key][0] if exclude_key in self._entries else -1
+
+        # Vote for (entry, time offset) pairs; a true match piles up on a single offset.
+        # The query is not capped: it covers every landmark the stored (capped) clip kept
+        query = np.asarray(fingerprint, dtype=np.int64)
+        votes = np.concatenate([segment.votes(query) for segment in segments if len(segment)] or
+                               [np.empty(0, dtype=np.int64)])
+        entries = votes >> 21
+        votes = votes[alive[entries] & (entries != excluded)]
+        if len(votes) == 0:
+            return None
+        pairs, counts = np.unique(votes, return_counts=True)
+        best = int(np.argmax(counts))
+        entry, offset = int(pairs[best] >> 21), int(pairs[best] & ((1 << 21) - 1)) - _OFFSET_BIAS
+        score = int(counts[best])
+        key, clip = self._keys.get(entry), self._clips.get(entry)
+        if key is None or clip is None:
+            return None
+        ratio = score / min(len(query), len(clip))
+        if score < self.min_matches or ratio < self.min_match_ratio:
+            return None
+        with self._lock:
+            self.matches += 1
+        return {"key": key, "score": score, "ratio": round(ratio, 4), "offset_frames": offset}
+
+    def _load(self):
+        """Open the database and index the stored fingerprints, oldest first."""
+        if not self.index_file:
+            return
+        try:
+            self._conn = sqlite3.connect(self.index_file, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT key, created_at, hashes, frames FROM fingerprints ORDER BY created_at"
+            ).fetchall()
+            for key, created_at, hashes, frames in rows:
+                fingerprint = np.stack([np.frombuffer(hashes, dtype=np.int64),
+                                        np.frombuffer(frames, dtype=np.int64)], axis=1)
+                self._insert(key, fingerprint, created_at)
+            self._merge()
+            if rows:
+                print(f"[Fingerprint] Loaded {len(self._entries)} audio fingerprints")
+        except Exception as e:
+            print(f"[Fingerprint] Failed to load index: {e}")
+            self._entries, self._clips, self._keys = OrderedDict(), {}, {}
+            self._alive = np.zeros(0, dtype=bool)
+            self._merge()
+
+    def _save(self, key: str, fingerprint: np.ndarray, created_at: float, evicted: List[str]):
+        """Write one clip (and delete the evicted ones)."""
+        if self._conn is None:
+            return
+        try:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fingerprints (key, created_at, hashes, frames) VALUES (?, ?, ?, ?)",
+                    (key, created_at, np.ascontiguousarray(fingerprint[:, 0]).tobytes(),
+                     np.ascontiguousarray(fingerprint[:, 1]).tobytes())
+                )
+                if evicted:
+                    self._conn.executemany("DELETE FROM fingerprints WHERE key = ?", [(k,) for k in evicted])
+                self._conn.commit()
+        except Exception as e:
+            print(f"[Fingerprint] Failed to save fingerprint: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get index statistics."""
+        return {
+            'entries': len(self._entries),
+            'postings': len(self._main) + sum(len(fp) for _, fp in self._recent),
+            'max_hashes_per_clip': self.max_hashes,
+            'lookups': self.lookups,
+            'matches': self.matches,
+            'adds': self.adds,
+            'match_rate': (self.matches / self.lookups) if self.lookups else 0.0
+        }
@@ -1,23 +1,46 @@
 # app.py
-import os, json, tempfile, subprocess, hashlib, re, hmac, time, urllib.parse, shutil
-from typing import List, Optional, Dict, Any, Union
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+import os, json, tempfile, subprocess, hashlib, re, hmac, time, urllib.parse, shutil, functools, random, logging
+from typing import List, Optional, Dict, Any, Union, Callable
+from fastapi import FastAPI, HTTPException, Request, Header, Depends
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 from pydantic import BaseModel, HttpUrl, ValidationError
-import yt_dlp
-from faster_whisper import WhisperModel
-from rapidfuzz import process, fuzz
 from dotenv import load_dotenv
 import asyncio
 import concurrent.futures
+import threading
 import traceback
 import requests
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from llm_cache import LLMResponseCache
+from parse_scheduler import ParseScheduler
+from parse_cache import ParseResultCache
+from playlist_ingest import PlaylistIngestor
+from segment_planner import plan_recipe_segments
+from metrics import REGISTRY as METRICS
+from tracing import Tracer, TraceExporter, bind_context
+from profiler import Profiler
+from loop_monitor import EventLoopMonitor
+from log_config import get_logger
+from media_models import LazyModel
+from warmup import WarmupManager
+from http_pool import HttpSessionPool
+from product_cache import ProductSearchCache
+from provider_orchestrator import ProviderOrchestrator
+from product_catalog import ProductCatalog
+from ingredient_normalizer import get_normalizer
+from size_parser import ProductSizeParser
+from rate_limit import BACKGROUND, RateLimitExceeded, RequestCoalescer, TokenBucket, current_priority, run_with_priority
 
 load_dotenv() 
 
+# Leveled loggers for the hot request paths (configured via LOG_LEVEL / LOG_LEVELS, see log_config.py)
+products_log = get_logger("products")
+recommend_log = get_logger("recommend")
+llm_log = get_logger("llm")
+
 app = FastAPI(title="Yorigo Backend")
 
 # Add CORS middleware to allow frontend to access the API
@@ -79,6 +102,8 @@ NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET", "")
 class ParseRequest(BaseModel):
     url: HttpUrl
     prefer_lang: Optional[str] = "ko"  # Always defaults to Korean since app primarily targets Koreans. Language settings only control UI, not recipe parsing.
+    deadline_sec: Optional[float] = None  # Latency budget for this parse (defaults to PARSE_DEADLINE_SEC)
+    force_refresh: bool = False  # Ignore a cached parse result and parse again
 
 class ProductSearchRequest(BaseModel):
     ingredient_name: str
@@ -131,6 +156,64 @@ class AdvancedProductSearchResponse(BaseModel):
     cheapest_overall: Optional[ProductSearchResult] = None  # Cheapest unit price overall
     all_products: List[ProductSearchResult] = []  # All 50 products with mapped data
 
+class BulkProductSearchRequest(BaseModel):
+    items: List[ProductSearchRequest]  # Every ingredient in the cart (duplicates across recipes allowed)
+
+class BulkSearchError(BaseModel):
+    ingredient_name: str
+    needed_unit: Optional[str] = None
+    error: str
+
+class BulkProductSearchResponse(BaseModel):
+    results: List[AdvancedProductSearchResponse]  # One per distinct (ingredient, unit), in first-seen order
+    errors: List[BulkSearchError] = []  # One per distinct (ingredient, unit) whose search failed
+
+class BasketCandidate(BaseModel):
+    product_id: str
+    product_name: str
+    product_price: int
+    product_url: str = ""
+    package_size: Optional[float] = None  # Parsed from product_name if omitted
+    package_unit: Optional[str] = None
+
+class BasketItemRequest(BaseModel):
+    ingredient_name: str
+    needed_qty: float  # Total need across the cart (items with the same name and unit are added up)
+    needed_unit: str
+    candidates: Optional[List[BasketCandidate]] = None  # Searched if omitted
+
+class BasketOptimizeRequest(BaseModel):
+    items: List[BasketItemRequest]
+    max_units_per_product: int = 10  # Max packages bought of one product
+
+class BasketPurchase(BaseModel):
+    product_id: str
+    product_name: str
+    product_price: int
+    product_url: str = ""
+    package_size: float  # Base units (g, ml, 개, ...)
+    package_unit: str
+    quantity: int
+    subtotal: int
+
+class BasketItemResult(BaseModel):
+    ingredient: str
+    needed_qty: float  # In base units
+    needed_unit: str
+    purchases: List[BasketPurchase] = []
+    cost: int = 0
+    purchased_qty: float = 0.0
+    leftover_qty: float = 0.0  # Bought beyond the need (waste)
+    covered: bool = False
+    reason: Optional[str] = None  # Why the need couldn't be covered
+
+class BasketOptimizeResponse(BaseModel):
+    items: List[BasketItemResult]
+    total_cost: int  # Sum over covered items
+    leftover: Dict[str, float] = {}  # Total leftover per base unit
+    uncovered: List[str] = []  # Ingredients no combination of candidates covers
+    errors: List[BulkSearchError] = []  # One per merged (ingredient, base unit) whose search failed
+
 class RecipeRecommendationRequest(BaseModel):
     cart_recipes: List[Dict[str, Any]]  # Recipes currently in cart
     available_recipes: List[Dict[str, Any]]  # All recipes from database to consider
@@ -218,15 +301,446 @@ class ParseResponse(BaseModel):
     nutrition: Nutrition
     debug: Dict[str, Any]
 
+class BatchParseRequest(BaseModel):
+    urls: List[HttpUrl]
+    prefer_lang: Optional[str] = "ko"
+    deadline_sec: Optional[float] = None  # Per-URL latency budget
+    wait: bool = False  # True: hold the request open and return results; False: return job IDs to poll
+
+class ParseJob(BaseModel):
+    job_id: str
+    url: str
+    status: str  # "queued", "running", "done", "failed"
+    result: Optional[ParseResponse] = None
+    error: Optional[str] = None
+
+class BatchParseResponse(BaseModel):
+    jobs: List[ParseJob]
+
+class PrefetchRequest(BaseModel):
+    url: HttpUrl
+
+class PlaylistIngestRequest(BaseModel):
+    url: HttpUrl  # YouTube playlist or channel URL
+    prefer_lang: Optional[str] = "ko"
+    max_entries: Optional[int] = None  # Only ingest the first N entries
+    restart: bool = False  # Ignore the saved cursor and start from the first entry
+
+### ---------- Admin access ----------
+# Admin/diagnostic endpoints require X-Admin-Token == ADMIN_TOKEN (open only in development if unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def is_admin_token(token: Optional[str]) -> bool:
+    if ADMIN_TOKEN:
+        return bool(token) and hmac.compare_digest(token, ADMIN_TOKEN)
+    return os.getenv("ENVIRONMENT") == "development"
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+### ---------- Tracing ----------
+# Request-scoped span trees for the hot endpoints, kept in a ring buffer (and optionally a JSONL file)
+TRACED_ROUTES = {
+    "/parse_recipe_stream": "parse_recipe_stream",
+    "/parse_recipe": "parse_recipe",
+    "/recommend_recipe": "recommend_recipe",
+    "/search_products_advanced": "search_products_advanced",
+    "/search_products_bulk": "search_products_bulk",
+    "/optimize_basket": "optimize_basket",
+}
+tracer = Tracer(
+    TraceExporter(
+        max_traces=int(os.getenv("TRACE_BUFFER_SIZE", "200")),
+        file_path=os.getenv("TRACE_FILE") or None
+    ),
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "1.0")),
+    enabled=os.getenv("TRACING_ENABLED", "true").lower() == "true"
+)
+
+def on_body_complete(response, callback: Callable[[Optional[BaseException]], None]):
+    """
+    Call `callback(error)` once the response body has been fully sent.
+    Streaming bodies (SSE parse progress) keep running after a middleware returns,
+    so per-request instrumentation has to end with the body, not with call_next.
+    """
+    body_iterator = response.body_iterator
+
+    async def wrapped_body():
+        error = None
+        try:
+            async for chunk in body_iterator:
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            callback(error)
+    response.body_iterator = wrapped_body()
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    name = TRACED_ROUTES.get(request.url.path)
+    root = tracer.start_trace(name, method=request.method, path=request.url.path) if name else None
+    if root is None:
+        return await call_next(request)
+    try:
+        response = await call_next(request)
+    except BaseException as e:
+        tracer.end_trace(root, e)
+        raise
+    finally:
+        tracer.detach(root)
+    root.set_attribute("status_code", response.status_code)
+    response.headers["X-Trace-Id"] = root.trace.trace_id
+
+    def end_trace(error: Optional[BaseException]):
+        if error is None and response.status_code >= 500:
+            error = HTTPException(status_code=response.status_code)
+        tracer.end_trace(root, error)
+    on_body_complete(response, end_trace)
+    return response
+
+### ---------- Profiling ----------
+# Statistical profiles of single requests to the traced endpoints, as collapsed stacks for flame graphs.
+# Requested per call with `X-Profile: 1` (or ?profile=1) plus a valid X-Admin-Token, or sampled at
+# PROFILE_SAMPLE_RATE (default off).
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+profiler = Profiler(
+    interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+    max_profiles=int(os.getenv("PROFILE_BUFFER_SIZE", "20")),
+    output_dir=os.getenv("PROFILE_DIR") or None
+)
+
+def should_profile(request: Request) -> bool:
+    requested = request.headers.get("X-Profile") == "1" or request.query_params.get("profile") in ("1", "true")
+    if requested and is_admin_token(request.headers.get("X-Admin-Token")):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    name = TRACED_ROUTES.get(request.url.path)
+    if name is None or not should_profile(request):
+        return await call_next(request)
+    session = profiler.start(name)
+    try:
+        response = await call_next(request)
+    except BaseException:
+        profiler.finish(session)
+        raise
+    finally:
+        profiler.detach(session)
+    response.headers["X-Profile-Id"] = session.profile_id
+    on_body_complete(response, lambda error: profiler.finish(session))
+    return response
+
+### ---------- Metrics ----------
+# Prometheus-style latency histograms and counters, scraped from /metrics
+PARSE_STAGE_SECONDS = METRICS.histogram(
+    "yorigo_parse_stage_seconds", "Time spent in each recipe parse stage", ["stage"]
+)
+PARSE_STAGE_WAIT_SECONDS = METRICS.histogram(
+    "yorigo_parse_stage_wait_seconds", "Time spent waiting for a parse stage concurrency slot", ["stage"]
+)
+PARSE_RESULTS_TOTAL = METRICS.counter(
+    "yorigo_parse_results_total", "Finished parse requests by where the result came from", ["source"]
+)
+EXTERNAL_CALL_SECONDS = METRICS.histogram(
+    "yorigo_external_call_seconds", "Latency of calls to external APIs", ["provider", "outcome"]
+)
+EXTERNAL_CALL_ERRORS_TOTAL = METRICS.counter(
+    "yorigo_external_call_errors_total", "Failed calls to external APIs", ["provider"]
+)
+HTTP_REQUEST_SECONDS = METRICS.histogram(
+    "yorigo_http_request_seconds", "HTTP request latency (until response headers for streams)",
+    ["method", "route", "status"]
+)
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the block in PARSE_STAGE_SECONDS under `stage`, as a trace span and (if active) in the request profile."""
+    with PARSE_STAGE_SECONDS.time(stage=stage), tracer.span(stage), profiler.attach():
+        yield
+
+def timed_stage(stage: str):
+    """Decorator: run every call of the function under `stage_timer(stage)`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+@contextmanager
+def external_call(provider: str):
+    """Time a call to an external API; exceptions raised in the block count as errors."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with tracer.span(f"external:{provider}"):
+            yield
+        outcome = "ok"
+    finally:
+        EXTERNAL_CALL_SECONDS.observe(time.perf_counter() - start, provider=provider, outcome=outcome)
+        if outcome == "error":
+            EXTERNAL_CALL_ERRORS_TOTAL.inc(provider=provider)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template (e.g. /parse_jobs/{job_id}) to keep label cardinality bounded
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method, route=getattr(route, "path", "unmatched"), status=str(status)
+        )
+
+### ---------- Event loop monitor ----------
+# Lag percentiles go to /metrics; callbacks that stall the loop longer than the threshold are logged with their stack
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+_loop_monitor = EventLoopMonitor(
+    interval=float(os.getenv("LOOP_MONITOR_INTERVAL_SEC", "0.25")),
+    block_threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD_SEC", "0.5")),
+    registry=METRICS
+)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    if LOOP_MONITOR_ENABLED:
+        _loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    _loop_monitor.stop()
+
+### ---------- Parse stage concurrency ----------
+# Max concurrent parses per stage, shared by every parse path (single, streaming, batch).
+# Heavy CPU stages default to 1 so concurrent parses queue instead of thrashing the cores.
+PARSE_STAGE_LIMITS = {
+    "download": int(os.getenv("PARSE_CONCURRENCY_DOWNLOAD", "4")),  # yt-dlp info/audio/video + ffmpeg
+    "asr": int(os.getenv("PARSE_CONCURRENCY_ASR", "1")),
+    "ocr": int(os.getenv("PARSE_CONCURRENCY_OCR", "1")),
+    "llm": int(os.getenv("PARSE_CONCURRENCY_LLM", "4")),
+}
+_stage_semaphores = {stage: threading.BoundedSemaphore(limit) for stage, limit in PARSE_STAGE_LIMITS.items()}
+# Background parses (playlist ingestion, run at rate_limit.BACKGROUND priority) get a smaller share of each
+# stage and only take a slot while no interactive parse is waiting for one
+PARSE_BACKGROUND_STAGE_LIMITS = {
+    stage: int(os.getenv(f"PARSE_BACKGROUND_CONCURRENCY_{stage.upper()}", str(max(1, limit // 2))))
+    for stage, limit in PARSE_STAGE_LIMITS.items()
+}
+_background_semaphores = {stage: threading.BoundedSemaphore(max(1, limit))
+                          for stage, limit in PARSE_BACKGROUND_STAGE_LIMITS.items()}
+_interactive_waiters = {stage: 0 for stage in PARSE_STAGE_LIMITS}
+_interactive_waiters_lock = threading.Lock()
+BACKGROUND_SLOT_POLL_SEC = 0.05
+
+class StageSlotTimeout(TimeoutError):
+    """No slot for a stage became free before the parse deadline."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"no free {stage} slot within the parse deadline")
+        self.stage = stage
+
+@contextmanager
+def stage_slot(stage: str, deadline: Optional["ParseDeadline"] = None, reserve: float = 0.0):
+    """
+    Hold one of the limited slots for a pipeline stage while the block runs.
+    With a deadline, waits only until `reserve` seconds of the budget are left, then raises StageSlotTimeout.
+    """
+    semaphore = _stage_semaphores[stage]
+    timeout = max(0.0, deadline.remaining() - reserve) if deadline is not None else None
+    background = current_priority() == BACKGROUND
+    with PARSE_STAGE_WAIT_SECONDS.time(stage=stage), tracer.span(f"{stage}_slot_wait"):
+        acquired = (_acquire_background_slot if background else _acquire_interactive_slot)(stage, timeout)
+    if not acquired:
+        raise StageSlotTimeout(stage)
+    try:
+        yield
+    finally:
+        semaphore.release()
+        if background:
+            _background_semaphores[stage].release()
+
+def _acquire_interactive_slot(stage: str, timeout: Optional[float]) -> bool:
+    with _interactive_waiters_lock:
+        _interactive_waiters[stage] += 1
+    try:
+        return _stage_semaphores[stage].acquire(timeout=timeout)
+    finally:
+        with _interactive_waiters_lock:
+            _interactive_waiters[stage] -= 1
+
+def _acquire_background_slot(stage: str, timeout: Optional[float]) -> bool:
+    """Background share first, then a shared slot once no interactive parse is waiting for the stage."""
+    end = time.monotonic() + timeout if timeout is not None else None
+    if not _background_semaphores[stage].acquire(timeout=timeout):
+        return False
+    while True:
+        wait = BACKGROUND_SLOT_POLL_SEC if end is None else max(0.0, min(BACKGROUND_SLOT_POLL_SEC, end - time.monotonic()))
+        if _interactive_waiters[stage]:
+            time.sleep(wait)
+        elif _stage_semaphores[stage].acquire(timeout=wait):
+            return True
+        if end is not None and time.monotonic() >= end:
+            _background_semaphores[stage].release()
+            return False
+
 ### ---------- Globals (lazy loaded) ----------
+# Media dependencies (yt-dlp, faster-whisper, EasyOCR) are imported on first use,
+# so instances that only serve product/recommendation routes start fast.
 WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "medium")  # small/medium/large-v3
-_whisper_model = None
+
+def _load_whisper():
+    from faster_whisper import WhisperModel
+    # device="cuda" if GPU available; one worker per concurrent ASR slot
+    return WhisperModel(WHISPER_MODEL_SIZE, device="auto", compute_type="auto",
+                        num_workers=PARSE_STAGE_LIMITS["asr"])
+
+def _load_ocr_reader():
+    import easyocr
+    return easyocr.Reader(["en","ko"])  # add more if needed
+
+whisper_model = LazyModel("whisper", _load_whisper)
+ocr_reader = LazyModel("ocr", _load_ocr_reader)
+
 def get_whisper():
-    global _whisper_model
-    if _whisper_model is None:
-        # device="cuda" if GPU available
-        _whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device="auto", compute_type="auto")
-    return _whisper_model
+    return whisper_model.get()
+
+def get_ocr_reader():
+    return ocr_reader.get()
+
+def youtube_dl(ydl_opts: Dict[str, Any]):
+    """yt_dlp.YoutubeDL, importing yt-dlp on first use."""
+    import yt_dlp
+    return yt_dlp.YoutubeDL(ydl_opts)
+
+### ---------- OpenAI (shared client + response cache) ----------
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+_llm_cache = LLMResponseCache(
+    cache_file=os.getenv("LLM_CACHE_FILE", "llm_cache.json"),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000")),
+    ttl_seconds=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+)
+
+_openai_client = None
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
+def cached_chat_completion(model: str, system: str, user: str, temperature: float,
+                           validate: Optional[Callable[[str], Any]] = None,
+                           request_timeout: Optional[float] = None, **kwargs) -> str:
+    """
+    Run a chat completion through the LLM response cache.
+    The cache key covers model, both prompts, temperature and any extra options (e.g. max_tokens),
+    so only byte-identical requests are served from cache.
+    If `validate` is given, it is called on a fresh completion before caching; when it raises,
+    the completion is not cached and the exception propagates to the caller.
+    `request_timeout` bounds the API call and is not part of the cache key.
+    """
+    key = LLMResponseCache.make_key(model, system, user, temperature, **kwargs)
+    if LLM_CACHE_ENABLED:
+        cached = _llm_cache.get(key)
+        tracer.add_event("llm_cache_lookup", model=model, hit=cached is not None)
+        if cached is not None:
+            llm_log.debug("LLM cache hit (model: %s)", model)
+            return cached
+
+    with external_call("openai"):
+        resp = get_openai_client().chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": user}
+            ],
+            temperature=temperature,
+            **({"timeout": request_timeout} if request_timeout else {}),
+            **kwargs
+        )
+    text = resp.choices[0].message.content or ""
+    if validate is not None:
+        validate(text)
+
+    if LLM_CACHE_ENABLED and text:
+        _llm_cache.put(key, text, model=model)
+    return text
+
+### ---------- Pooled HTTP sessions ----------
+# One keep-alive session per provider, shared across threads: a cart's ingredient lookups reuse
+# connections instead of paying a TCP+TLS handshake each. Size the pools to the concurrent callers.
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_CONNECT_TIMEOUT_SEC = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEC", "3.05"))
+HTTP_READ_TIMEOUT_SEC = float(os.getenv("HTTP_READ_TIMEOUT_SEC", "10"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+
+http_sessions = HttpSessionPool()
+for _provider in ("naver", "coupang"):
+    http_sessions.configure(_provider, pool_size=HTTP_POOL_SIZE, connect_timeout=HTTP_CONNECT_TIMEOUT_SEC,
+                            read_timeout=HTTP_READ_TIMEOUT_SEC, retries=HTTP_RETRIES)
+# Caption tracks are fetched under the parse deadline: one quick retry at most
+http_sessions.configure("youtube", pool_size=PARSE_STAGE_LIMITS["download"], connect_timeout=HTTP_CONNECT_TIMEOUT_SEC,
+                        read_timeout=HTTP_READ_TIMEOUT_SEC, retries=1, backoff_factor=0.1)
+
+@app.on_event("shutdown")
+async def close_http_sessions():
+    http_sessions.close()
+
+### ---------- Startup warm-up ----------
+# Loads the parse models and opens API connections in the background after startup, so the first
+# parse after a deploy doesn't pay for them. /ready reports per-component state; point the load
+# balancer's readiness probe at it to keep parse traffic off cold instances.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+WARMUP_COMPONENTS = {c.strip() for c in os.getenv("WARMUP_COMPONENTS", "whisper,ocr,openai,naver,coupang,ranking").split(",") if c.strip()}
+READY_REQUIRED_COMPONENTS = {c.strip() for c in os.getenv("READY_REQUIRED_COMPONENTS", "whisper,ocr").split(",") if c.strip()}
+WARMUP_HTTP_TIMEOUT_SEC = float(os.getenv("WARMUP_HTTP_TIMEOUT_SEC", "10"))
+
+def _warm_openai():
+    # Builds the shared client and completes a TLS handshake on its connection pool
+    get_openai_client().with_options(timeout=WARMUP_HTTP_TIMEOUT_SEC).models.list()
+
+def _warm_naver():
+    # Leaves an open keep-alive connection in the provider's pool
+    http_sessions.get("naver").head("https://openapi.naver.com", timeout=WARMUP_HTTP_TIMEOUT_SEC)
+
+def _warm_coupang():
+    http_sessions.get("coupang").head("https://api-gateway.coupang.com", timeout=WARMUP_HTTP_TIMEOUT_SEC)
+
+def _warm_ranking():
+    # numpy is kept off the import path; load it before the first product search needs it
+    import product_ranking
+
+_warmup = WarmupManager()
+for _name, _fn, _configured in (
+    ("openai", _warm_openai, bool(os.getenv("OPENAI_API_KEY"))),
+    ("naver", _warm_naver, bool(NAVER_CLIENT_ID and NAVER_CLIENT_SECRET)),
+    ("coupang", _warm_coupang, bool(COUPANG_ACCESS_KEY and COUPANG_SECRET_KEY)),
+    ("whisper", get_whisper, True),
+    ("ocr", get_ocr_reader, True),
+    ("ranking", _warm_ranking, True),
+):
+    _warmup.register(_name, _fn, required=_name in READY_REQUIRED_COMPONENTS,
+                     enabled=WARMUP_ENABLED and _configured and _name in WARMUP_COMPONENTS)
+# A misspelled required component would otherwise be ignored and the instance reported ready
+_unknown_required = _warmup.unknown(sorted(READY_REQUIRED_COMPONENTS))
+if _unknown_required:
+    raise ValueError(f"READY_REQUIRED_COMPONENTS has unknown components: {', '.join(_unknown_required)}")
+
+@app.on_event("startup")
+async def start_warmup():
+    if WARMUP_ENABLED:
+        _warmup.start()
 
 ### ---------- Coupang API Helpers ----------
 def generate_coupang_hmac(method: str, url: str, secret_key: str) -> str:
@@ -243,41 +757,18 @@ def generate_coupang_hmac(method: str, url: str, secret_key: str) -> str:
     
     return f"CEA algorithm=HmacSHA256, access-key={COUPANG_ACCESS_KEY}, signed-date={datetime}, signature={signature}"
 
+# Titles repeat across searches (same products for the same ingredient); parsed sizes are memoized
+_size_parser = ProductSizeParser(cache_size=int(os.getenv("SIZE_PARSER_CACHE_SIZE", "20000")))
+
 def parse_product_size(product_name: str) -> tuple[Optional[float], Optional[str]]:
-    """Extract package size and unit from product name
-    Examples: '당근 500g' -> (500.0, 'g'), '우유 1L' -> (1000.0, 'ml')
-    """
-    # Common patterns for Korean grocery products
-    patterns = [
-        r'(\d+(?:\.\d+)?)\s*(kg|킬로그램)',  # kilograms
-        r'(\d+(?:\.\d+)?)\s*(g|그램|g)',      # grams
-        r'(\d+(?:\.\d+)?)\s*(l|리터|L)',      # liters
-        r'(\d+(?:\.\d+)?)\s*(ml|밀리리터)',    # milliliters
-        r'(\d+(?:\.\d+)?)\s*(개입)',           # pieces/count
-        r'(\d+(?:\.\d+)?)\s*(봉지)',           # bags
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, product_name, re.IGNORECASE)
-        if match:
-            size = float(match.group(1))
-            unit = match.group(2).lower()
-            
-            # Normalize units to base units (g, ml)
-            if unit in ['kg', '킬로그램']:
-                return (size * 1000, 'g')
-            elif unit in ['l', '리터']:
-                return (size * 1000, 'ml')
-            elif unit in ['g', '그램']:
-                return (size, 'g')
-            elif unit in ['ml', '밀리리터']:
-                return (size, 'ml')
-            elif unit in ['개입']:
-                return (size, '개')
-            elif unit in ['봉지']:
-                return (size, '봉지')
-    
-    return (None, None)
+    """Extract total package size and unit from product name (see size_parser.py)
+    Examples: '당근 500g' -> (500.0, 'g'), '우유 1L' -> (1000.0, 'ml'), '양파 500g x 3개' -> (1500.0, 'g')
+    """
+    return _size_parser.parse(product_name or "")
+
+def parse_product_sizes(product_names: List[str]) -> List[tuple[Optional[float], Optional[str]]]:
+    """parse_product_size for a whole result page."""
+    return _size_parser.parse_many(product_names)
 
 def normalize_unit(unit: str) -> str:
     """Normalize various unit representations to standard units"""
@@ -343,7 +834,7 @@ def encode_affiliate_link(product_url: str, product_id: Optional[str] = None) ->
                 query_params = urllib.parse.parse_qs(parsed.query)
                 product_id = query_params.get('productId', [None])[0] or query_params.get('product_id', [None])[0]
         except Exception as e:
-            print(f"[WARNING] Could not extract product_id from URL: {e}")
+            products_log.warning("Could not extract product_id from URL: %s", e)
     
     # If we still don't have product_id, try to use the URL as-is
     if not product_id:
@@ -367,7 +858,7 @@ def encode_affiliate_link(product_url: str, product_id: Optional[str] = None) ->
                     pass
             return product_url
         else:
-            print("[WARNING] No product_id or valid URL provided")
+            products_log.warning("No product_id or valid URL provided")
             return ""
     
     # Construct raw Coupang product URL in standard format
@@ -377,95 +868,9 @@ def encode_affiliate_link(product_url: str, product_id: Optional[str] = None) ->
     # Add affiliate tracking parameter
     affiliate_url = f"{raw_product_url}?subId={COUPANG_PARTNER_SUBID}"
     
-    print(f"[INFO] Constructed raw Coupang product link: {affiliate_url[:100]}...")
+    products_log.debug("Constructed raw Coupang product link: %.100s", affiliate_url)
     return affiliate_url
 
-def calculate_match_score(needed_qty: Optional[float], needed_unit: Optional[str],
-                         product_size: Optional[float], product_unit: Optional[str],
-                         product_price: int, rating: Optional[float]) -> float:
-    """
-    Calculate match score for a product based on:
-    - How close the package size is to what's needed (higher weight)
-    - Unit price (lower is better)
-    - Rating (higher is better)
-    Returns a score from 0-100
-    """
-    score = 0.0
-    
-    # Unit match score (40 points max)
-    if needed_qty and needed_unit and product_size and product_unit:
-        # Convert to same base unit
-        needed_base_qty, needed_base_unit = convert_to_base_unit(needed_qty, needed_unit)
-        product_base_qty, product_base_unit = convert_to_base_unit(product_size, product_unit)
-        
-        if needed_base_unit == product_base_unit:
-            # Calculate how close the package size is to needed amount
-            ratio = product_base_qty / needed_base_qty
-            
-            # Ideal is 1.0 (exact match) or slightly more (1.0-1.5)
-            if 0.5 <= ratio <= 1.5:
-                # Best match
-                score += 40 * (1 - abs(ratio - 1.0))
-            elif 1.5 < ratio <= 3.0:
-                # Still acceptable, but less ideal
-                score += 30 * (1 - (ratio - 1.5) / 1.5)
-            elif 0.1 <= ratio < 0.5:
-                # Too small but might be useful
-                score += 20 * (ratio / 0.5)
-            else:
-                # Much too large or too small
-                score += 10
-    else:
-        # No unit info, neutral score
-        score += 20
-    
-    # Rating score (30 points max)
-    if rating:
-        score += (rating / 5.0) * 30
-    else:
-        score += 15  # Neutral if no rating
-    
-    # Price score (30 points max) - Lower unit price is better
-    # This is handled separately for comparison, but we give base points
-    score += 15  # Base points for having a price
-    
-    return min(score, 100)
-
-def calculate_amount_match_score(needed_qty: Optional[float], needed_unit: Optional[str],
-                                product_size: Optional[float], product_unit: Optional[str]) -> float:
-    """
-    Calculate how well the product amount matches the needed amount.
-    Returns a score from 0-100, where 100 is perfect match.
-    """
-    if not needed_qty or not needed_unit or not product_size or not product_unit:
-        return 0.0
-    
-    # Convert to same base unit
-    needed_base_qty, needed_base_unit = convert_to_base_unit(needed_qty, needed_unit)
-    product_base_qty, product_base_unit = convert_to_base_unit(product_size, product_unit)
-    
-    if needed_base_unit != product_base_unit:
-        return 0.0
-    
-    # Calculate ratio
-    ratio = product_base_qty / needed_base_qty
-    
-    # Perfect match (within 5%)
-    if 0.95 <= ratio <= 1.05:
-        return 100.0
-    # Very good match (within 20%)
-    elif 0.8 <= ratio <= 1.2:
-        return 90.0 - (abs(ratio - 1.0) * 200)  # 90-100 range
-    # Good match (within 50%)
-    elif 0.5 <= ratio <= 1.5:
-        return 70.0 - (abs(ratio - 1.0) * 100)  # 50-70 range
-    # Acceptable match (within 100%)
-    elif 0.25 <= ratio <= 2.0:
-        return 50.0 - (abs(ratio - 1.0) * 30)  # 20-50 range
-    # Poor match
-    else:
-        return max(0.0, 20.0 - abs(ratio - 1.0) * 5)
-
 ### ---------- Naver Shopping API ----------
 def search_naver_shopping(query: str, limit: int = 50, coupang_only: bool = False) -> List[Dict[str, Any]]:
     """
@@ -482,7 +887,7 @@ def search_naver_shopping(query: str, limit: int = 50, coupang_only: bool = Fals
     This provides real product data with actual prices from various retailers.
     """
     if not NAVER_CLIENT_ID or not NAVER_CLIENT_SECRET:
-        print("[WARN] Naver API credentials not configured. Skipping Naver search.")
+        products_log.warning("Naver API credentials not configured. Skipping Naver search.")
         return []
     
     # Naver Shopping API endpoint
@@ -499,15 +904,16 @@ def search_naver_shopping(query: str, limit: int = 50, coupang_only: bool = Fals
         "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
     }
     
-    print(f"[INFO] Calling Naver Shopping API for query: '{query}' (limit: {limit})")
+    products_log.info("Calling Naver Shopping API for query: '%s' (limit: %d)", query, limit)
     
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        with external_call("naver"):
+            response = http_sessions.get("naver").get(url, params=params, headers=headers)
+            response.raise_for_status()
+            data = response.json()
         
         items = data.get("items", [])
-        print(f"[INFO] Naver returned {len(items)} total products")
+        products_log.debug("Naver returned %d total products", len(items))
         
         # Process all products (or filter for Coupang if requested)
         products = []
@@ -581,21 +987,19 @@ def search_naver_shopping(query: str, limit: int = 50, coupang_only: bool = Fals
                     "mallName": mall_name  # Include mall name for reference
                 })
         
-        print(f"[INFO] Returning {len(products)} products from Naver Shopping")
-        if coupang_only:
-            print(f"[INFO] (Coupang-only filter was enabled)")
+        products_log.info("Returning %d products from Naver Shopping%s",
+                          len(products), " (Coupang-only filter was enabled)" if coupang_only else "")
         return products
         
     except requests.exceptions.RequestException as e:
-        print(f"[ERROR] Naver Shopping API request failed: {e}")
+        products_log.error("Naver Shopping API request failed: %s", e)
         if hasattr(e, 'response') and e.response is not None:
-            print(f"[ERROR] Response status: {e.response.status_code}")
-            print(f"[ERROR] Response body: {e.response.text[:500]}")
+            products_log.error("Naver response status: %s, body: %.500s", e.response.status_code, e.response.text)
+            if e.response.status_code == 429:
+                raise  # Throttled, not "no products": let the rate limiter back off and callers retry
         return []
     except Exception as e:
-        print(f"[ERROR] Error processing Naver Shopping results: {e}")
-        import traceback
-        traceback.print_exc()
+        products_log.exception("Error processing Naver Shopping results: %s", e)
         return []
 
 def _extract_product_id_from_url(url: str) -> str:
@@ -659,46 +1063,151 @@ def _convert_to_coupang_partners_link(original_url: str) -> str:
     
     return affiliate_url
 
+### ---------- Product search cache ----------
+# Ingredient names are searched by their canonical shopping term: "다진 마늘", "마늘 (다진 것)", "깐마늘"
+# and "garlic" all become "마늘" (one provider query, one cache entry, one catalog query).
+INGREDIENT_NORMALIZER_ENABLED = os.getenv("INGREDIENT_NORMALIZER_ENABLED", "true").lower() == "true"
+_ingredient_normalizer = get_normalizer()
+
+def product_search_query(ingredient_name: str) -> str:
+    """Shopping query for an ingredient name (canonical term if the normalizer is enabled)."""
+    if not INGREDIENT_NORMALIZER_ENABLED:
+        return ingredient_name
+    return _ingredient_normalizer.normalize(ingredient_name) or ingredient_name
+
+# Popular ingredient searches repeat constantly; serve them from a TTL'd LRU (optionally persisted),
+# returning stale entries instantly while a background refresh fetches current prices.
+PRODUCT_CACHE_ENABLED = os.getenv("PRODUCT_CACHE_ENABLED", "true").lower() == "true"
+_product_cache = ProductSearchCache(
+    cache_file=os.getenv("PRODUCT_CACHE_FILE", "product_search_cache.json") or None,
+    max_entries=int(os.getenv("PRODUCT_CACHE_MAX_ENTRIES", "5000")),
+    ttl_seconds=float(os.getenv("PRODUCT_CACHE_TTL_SECONDS", str(6 * 3600))),
+    stale_seconds=float(os.getenv("PRODUCT_CACHE_STALE_SECONDS", str(24 * 3600))),
+    normalize_query=lambda query: product_search_query(query).lower()
+)
+
+# Every fetched product also lands in a local SQLite catalog (with parsed size and unit price), which
+# search_products_advanced answers from directly while the query's results are fresh. Answering by a
+# product-name match (PRODUCT_CATALOG_FULLTEXT) is opt-in: "양파" would also return 양파링 snacks.
+PRODUCT_CATALOG_ENABLED = os.getenv("PRODUCT_CATALOG_ENABLED", "true").lower() == "true"
+PRODUCT_CATALOG_MAX_AGE_SEC = float(os.getenv("PRODUCT_CATALOG_MAX_AGE_SEC", str(6 * 3600)))
+PRODUCT_CATALOG_FULLTEXT = os.getenv("PRODUCT_CATALOG_FULLTEXT", "false").lower() == "true"
+_product_catalog = ProductCatalog(
+    db_path=os.getenv("PRODUCT_CATALOG_DB", "product_catalog.db"),
+    parse_size=parse_product_size,
+    normalize_query=lambda query: product_search_query(query).lower(),
+    retention_seconds=float(os.getenv("PRODUCT_CATALOG_RETENTION_SEC", str(30 * 24 * 3600)))
+) if PRODUCT_CATALOG_ENABLED else None
+
+# Coupang and Naver are queried hedged: the second provider starts once the first has used up its
+# adaptive head start (a high quantile of its recent latency), instead of after it times out.
+_provider_orchestrator = ProviderOrchestrator(
+    hedge_quantile=float(os.getenv("PRODUCT_HEDGE_QUANTILE", "0.9")),
+    initial_delay=float(os.getenv("PRODUCT_HEDGE_INITIAL_DELAY_SEC", "0.5")),
+    min_delay=float(os.getenv("PRODUCT_HEDGE_MIN_DELAY_SEC", "0.1")),
+    max_delay=float(os.getenv("PRODUCT_HEDGE_MAX_DELAY_SEC", "2.0")),
+    max_workers=HTTP_POOL_SIZE
+)
+
+# Client-side quotas per provider. Waiting callers are served interactive-first; background work
+# (stale cache refreshes) waits longer and yields to user requests. A 429 pauses the provider.
+RATE_LIMIT_WAIT_SEC = float(os.getenv("RATE_LIMIT_WAIT_SEC", "5"))
+RATE_LIMIT_BACKGROUND_WAIT_SEC = float(os.getenv("RATE_LIMIT_BACKGROUND_WAIT_SEC", "30"))
+_rate_limiters = {
+    "naver": TokenBucket("naver", float(os.getenv("NAVER_RATE_PER_SEC", "10")),
+                         daily_quota=int(os.getenv("NAVER_DAILY_QUOTA", "25000"))),
+    "coupang": TokenBucket("coupang", float(os.getenv("COUPANG_RATE_PER_SEC", "1")),
+                           burst=float(os.getenv("COUPANG_RATE_BURST", "3")),
+                           daily_quota=int(os.getenv("COUPANG_DAILY_QUOTA", "0"))),
+}
+# Concurrent identical searches (same cache key) share one upstream call
+_search_coalescer = RequestCoalescer()
+
+def _retry_after_seconds(response) -> float:
+    try:
+        return max(1.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return 5.0
+
+def _rate_limited(provider: str, fn: Callable[[str, int], List[Dict[str, Any]]]):
+    """Wrap a provider search with its token bucket; a 429 response pauses the bucket."""
+    def call(query: str, limit: int) -> List[Dict[str, Any]]:
+        bucket = _rate_limiters[provider]
+        bucket.acquire(timeout=RATE_LIMIT_BACKGROUND_WAIT_SEC if current_priority() == BACKGROUND else RATE_LIMIT_WAIT_SEC)
+        try:
+            return fn(query, limit)
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 429:
+                retry_after = _retry_after_seconds(e.response)
+                bucket.penalize(retry_after)
+                raise RateLimitExceeded(provider, retry_after) from e
+            raise
+    return call
+
+_provider_orchestrator.register("coupang", _rate_limited("coupang", lambda query, limit: _search_coupang_api(query, limit)))
+_provider_orchestrator.register("naver", _rate_limited("naver", lambda query, limit: search_naver_shopping(query, limit)))
+
+def product_search_provider() -> str:
+    """Which backend search_coupang_products will try first (part of the cache key)."""
+    if os.getenv("USE_MOCK_COUPANG_DATA", "false").lower() == "true":
+        return "mock"
+    if COUPANG_ACCESS_KEY and COUPANG_SECRET_KEY:
+        return "coupang"
+    if NAVER_CLIENT_ID and NAVER_CLIENT_SECRET:
+        return "naver"
+    return "none"
+
+@tracer.traced()
 def search_coupang_products(query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Product search through the product search cache (see _search_products_uncached)."""
+    query = product_search_query(query)
+    key = _product_cache.make_key(query, limit, product_search_provider(), coupang_only=False)
+    fetch = lambda: _search_coalescer.run(key, lambda: _search_products_uncached(query, limit))
+    if not PRODUCT_CACHE_ENABLED:
+        return fetch()
+    return _product_cache.get_or_fetch(key, fetch, refresh=lambda: run_with_priority(BACKGROUND, fetch))
+
+def _search_products_uncached(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     """
-    Search for products on Coupang using multiple methods in order of preference:
-    1. Coupang Partners API (if credentials available)
-    2. Naver Shopping API proxy (if Naver credentials available)
-    3. Mock data (if explicitly enabled)
+    Search for products on Coupang using the configured providers:
+    1. Mock data (if explicitly enabled)
+    2. Coupang Partners API and Naver Shopping API proxy (whichever have credentials), hedged:
+       Coupang gets an adaptive head start, then Naver runs in parallel and the first non-empty result wins
     """
     
     # MOCK MODE: Only use if explicitly enabled
     use_mock = os.getenv("USE_MOCK_COUPANG_DATA", "false").lower() == "true"
     
     if use_mock:
-        print(f"[MOCK MODE] Returning mock data for query: {query}")
+        products_log.info("[MOCK MODE] Returning mock data for query: %s", query)
         return _get_mock_coupang_products(query, limit)
     
-    # METHOD 1: Try Coupang Partners API first (if credentials available)
+    providers = []
     if COUPANG_ACCESS_KEY and COUPANG_SECRET_KEY:
+        providers.append("coupang")
+    if NAVER_CLIENT_ID and NAVER_CLIENT_SECRET:
+        providers.append("naver")
+    
+    if providers:
         try:
-            return _search_coupang_api(query, limit)
+            provider, results = _provider_orchestrator.call(providers, query, limit)
         except Exception as e:
-            print(f"[WARN] Coupang API failed: {e}")
-            print("[INFO] Falling back to Naver Shopping API proxy...")
-            # Fall through to Naver proxy
-    
-    # METHOD 2: Use Naver Shopping API as proxy (if credentials available)
-    if NAVER_CLIENT_ID and NAVER_CLIENT_SECRET:
-        print("[INFO] Using Naver Shopping API as proxy for Coupang products...")
-        naver_results = search_naver_shopping(query, limit)
-        if naver_results:
-            print(f"[INFO] Successfully retrieved {len(naver_results)} products via Naver proxy")
-            return naver_results
-        else:
-            print("[WARN] Naver proxy returned no results")
-    
-    # METHOD 3: No API access available
-    print("[ERROR] No product search method available!")
-    print("[ERROR] Options:")
-    print("[ERROR]   1. Set COUPANG_ACCESS_KEY and COUPANG_SECRET_KEY for Coupang API")
-    print("[ERROR]   2. Set NAVER_CLIENT_ID and NAVER_CLIENT_SECRET for Naver proxy")
-    print("[ERROR]   3. Set USE_MOCK_COUPANG_DATA=true for mock data")
+            products_log.warning("All product providers failed for '%s': %s", query, e)
+            raise
+        tracer.add_event("product_provider", provider=provider)
+        if provider is None:
+            products_log.warning("No provider returned products for '%s'", query)
+            return results or []
+        products_log.debug("Retrieved %d products via %s", len(results), provider)
+        if _product_catalog is not None:
+            _product_catalog.record(query, results, provider, requested=limit)
+        return results
+    
+    # No API access available
+    products_log.error(
+        "No product search method available! Set COUPANG_ACCESS_KEY and COUPANG_SECRET_KEY for Coupang API, "
+        "NAVER_CLIENT_ID and NAVER_CLIENT_SECRET for Naver proxy, or USE_MOCK_COUPANG_DATA=true for mock data"
+    )
     raise ValueError("No product search method available. Configure Coupang API, Naver API, or enable mock mode.")
 
 def _search_coupang_api(query: str, limit: int = 10) -> List[Dict[str, Any]]:
@@ -722,18 +1231,19 @@ def _search_coupang_api(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         "Content-Type": "application/json"
     }
     
-    print(f"[INFO] Calling Coupang API for query: '{query}' (limit: {limit})")
-    print(f"[INFO] Request URL: {request_url}")
-    
-    response = requests.get(request_url, headers=headers, timeout=10)
-    print(f"[INFO] API Response Status: {response.status_code}")
+    products_log.info("Calling Coupang API for query: '%s' (limit: %d)", query, limit)
+    products_log.debug("Request URL: %s", request_url)
     
-    response.raise_for_status()
-    data = response.json()
+    with external_call("coupang"):
+        response = http_sessions.get("coupang").get(request_url, headers=headers)
+        products_log.debug("Coupang API response status: %s", response.status_code)
+        
+        response.raise_for_status()
+        data = response.json()
     
-    # Debug: Log the raw API response
-    print(f"[DEBUG] Raw Coupang API Response:")
-    print(f"[DEBUG] {json.dumps(data, indent=2, ensure_ascii=False)[:1000]}...")  # First 1000 chars
+    # Debug: Log the raw API response (only serialized when DEBUG is on for this module)
+    if products_log.isEnabledFor(logging.DEBUG):
+        products_log.debug("Raw Coupang API response: %.1000s", json.dumps(data, ensure_ascii=False))
     
     # Parse response based on Coupang API structure
     products = []
@@ -751,7 +1261,7 @@ def _search_coupang_api(query: str, limit: int = 10) -> List[Dict[str, Any]]:
     elif "product" in data:
         products = [data["product"]] if isinstance(data["product"], dict) else []
     
-    print(f"[INFO] Successfully parsed {len(products)} products from Coupang API")
+    products_log.debug("Parsed %d products from Coupang API", len(products))
     
     # Normalize product data structure
     normalized_products = []
@@ -769,10 +1279,8 @@ def _search_coupang_api(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         normalized_products.append(normalized)
     
     if normalized_products:
-        print(f"[INFO] Returning {len(normalized_products)} normalized products")
-        # Debug: Log first product
-        if normalized_products:
-            print(f"[DEBUG] First product sample: {json.dumps(normalized_products[0], indent=2, ensure_ascii=False)}")
+        products_log.info("Returning %d normalized products from Coupang API", len(normalized_products))
+        products_log.debug("First product sample: %s", normalized_products[0])
     
     return normalized_products if normalized_products else []
 
@@ -825,11 +1333,220 @@ def _get_mock_coupang_products(query: str, limit: int = 10) -> List[Dict[str, An
     
     return mock_products
 
+### ---------- Parse deadline ----------
+PARSE_DEADLINE_SEC = float(os.getenv("PARSE_DEADLINE_SEC", "180"))
+# Budget always kept back for the LLM call (the one stage that cannot be skipped)
+PARSE_LLM_RESERVE_SEC = float(os.getenv("PARSE_LLM_RESERVE_SEC", "60"))
+# Minimum budget (on top of the LLM reserve) needed to start each optional stage.
+# OCR needs more headroom than ASR so it is the first stage to be dropped.
+PARSE_ASR_MIN_SEC = float(os.getenv("PARSE_ASR_MIN_SEC", "20"))
+PARSE_OCR_MIN_SEC = float(os.getenv("PARSE_OCR_MIN_SEC", "40"))
+
+class ParseDeadline:
+    """
+    Latency budget for a single parse.
+    Stages check the remaining budget before starting optional work, cap their network
+    timeouts to it, and record anything they skipped or truncated in `degraded`.
+    """
+
+    def __init__(self, budget_sec: float = PARSE_DEADLINE_SEC):
+        self.budget_sec = budget_sec
+        self.started_at = time.monotonic()
+        self.degraded: List[Dict[str, str]] = []
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return self.budget_sec - self.elapsed()
+
+    def has_budget(self, seconds: float) -> bool:
+        """True if at least `seconds` remain."""
+        return self.remaining() >= seconds
+
+    def timeout(self, default: float, reserve: float = 0.0) -> float:
+        """Timeout for a blocking call: `default`, capped to the budget left after `reserve` (min 1s)."""
+        return max(1.0, min(default, self.remaining() - reserve))
+
+    def degrade(self, stage: str, reason: str):
+        """Record that a stage was skipped or truncated to stay within the budget."""
+        self.degraded.append({"stage": stage, "reason": reason})
+        print(f"     [Deadline] Degraded {stage}: {reason} ({self.remaining():.1f}s left)")
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "deadline_sec": self.budget_sec,
+            "elapsed_sec": round(self.elapsed(), 2),
+            "degraded_stages": list(self.degraded),
+        }
+
 ### ---------- Helpers ----------
 def url_hash(url: str) -> str:
     return hashlib.sha256(url.encode()).hexdigest()[:16]
 
-def extract_with_ytdlp(url: str) -> Dict[str, Any]:
+_YOUTUBE_ID_RE = re.compile(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/|v/)|youtu\.be/)([A-Za-z0-9_-]{11})')
+_TRACKING_PARAMS = {"si", "feature", "igsh", "igshid", "t", "pp", "is_from_webapp", "sender_device"}
+
+def canonical_video_key(url: str, info: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Stable cache key for a video regardless of which URL form was pasted.
+    Uses yt-dlp's extractor + video ID when info is available, the YouTube video ID
+    parsed from the URL otherwise, and finally the URL minus tracking parameters.
+    """
+    if info and info.get("id") and info.get("extractor_key"):
+        return f"{info['extractor_key'].lower()}:{info['id']}"
+
+    match = _YOUTUBE_ID_RE.search(url)
+    if match:
+        return f"youtube:{match.group(1)}"
+
+    parsed = urllib.parse.urlparse(url.strip())
+    query = [
+        (k, v) for k, v in urllib.parse.parse_qsl(parsed.query)
+        if k not in _TRACKING_PARAMS and not k.startswith("utm_")
+    ]
+    normalized = urllib.parse.urlunparse((
+        parsed.scheme.lower(), parsed.netloc.lower().removeprefix("www.").removeprefix("m."),
+        parsed.path.rstrip("/"), "", urllib.parse.urlencode(query), ""
+    ))
+    return f"url:{url_hash(normalized)}"
+
+### ---------- Parse result cache ----------
+_parse_cache = ParseResultCache(
+    cache_dir=os.getenv("PARSE_CACHE_DIR", "parse_cache"),
+    ttl_seconds=float(os.getenv("PARSE_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+)
+
+def get_cached_parse(url: str) -> Optional[ParseResponse]:
+    """Return a cached ParseResponse for `url` (any URL form of the same video), or None."""
+    cached = _parse_cache.get(canonical_video_key(url))
+    tracer.add_event("parse_cache_lookup", hit=cached is not None)
+    if cached is None:
+        return None
+    result = ParseResponse(**cached)
+    result.source["url"] = url
+    result.debug["cache_hit"] = True
+    return result
+
+def store_parse_result(url: str, info: Dict[str, Any], result_dict: Dict[str, Any], deadline: ParseDeadline):
+    """
+    Cache a finished parse under both the URL-derived and the extractor-derived key.
+    Degraded parses are not cached so a later, unhurried parse can produce the full result.
+    """
+    if deadline.degraded:
+        return
+    for key in {canonical_video_key(url), canonical_video_key(url, info)}:
+        _parse_cache.put(key, result_dict)
+
+@timed_stage("serialization")
+def serialize_parse_response(result: ParseResponse) -> Dict[str, Any]:
+    return result.model_dump()
+
+### ---------- Audio fingerprint dedupe ----------
+# Re-uploads of the same clip on other platforms have unrelated URLs, so they are matched by audio
+# instead: a fingerprint of the first seconds, taken right after the audio download, is looked up
+# in a local index that points at parse cache entries.
+AUDIO_FINGERPRINT_ENABLED = os.getenv("AUDIO_FINGERPRINT_ENABLED", "true").lower() != "false"
+AUDIO_FINGERPRINT_SECONDS = float(os.getenv("AUDIO_FINGERPRINT_SECONDS", "30"))
+
+def _load_fingerprint_index():
+    # numpy + index file load, deferred to the first parse that downloads audio
+    from audio_fingerprint import AudioFingerprintIndex
+    return AudioFingerprintIndex(
+        index_file=os.getenv("AUDIO_FINGERPRINT_INDEX_FILE", "audio_fingerprints.db"),
+        max_entries=int(os.getenv("AUDIO_FINGERPRINT_MAX_ENTRIES", "5000")),
+        max_hashes=int(os.getenv("AUDIO_FINGERPRINT_MAX_HASHES", "2000"))
+    )
+
+fingerprint_index = LazyModel("audio_fingerprints", _load_fingerprint_index)
+
+@timed_stage("fingerprint")
+def find_audio_duplicate(url: str, info: Dict[str, Any], audio_path: str,
+                         index_only: bool = False) -> Optional[ParseResponse]:
+    """
+    Fingerprint downloaded audio and return the stored parse of a matching earlier upload, or None.
+    Unmatched audio is indexed under this video's key so later reposts can match it
+    (the entry only pays off once this parse lands in the parse cache).
+    With index_only, the audio is only indexed (the caller parses the video itself).
+    """
+    if not AUDIO_FINGERPRINT_ENABLED:
+        return None
+    from audio_fingerprint import compute_fingerprint, decode_audio
+    key = canonical_video_key(url, info)
+    try:
+        samples = decode_audio(audio_path, _find_ffmpeg(), AUDIO_FINGERPRINT_SECONDS, timeout=30)
+        fingerprint = compute_fingerprint(samples)
+    except Exception as e:
+        print(f"     [Fingerprint] Failed to fingerprint audio: {e}")
+        return None
+
+    index = fingerprint_index.get()
+    if index_only:
+        index.add(key, fingerprint)
+        return None
+    match = index.match(fingerprint, exclude_key=key)
+    cached = _parse_cache.get(match["key"]) if match else None
+    tracer.set_attribute("match", match["key"] if cached is not None else None)
+    if cached is None:
+        index.add(key, fingerprint)
+        return None
+
+    print(f"     [Fingerprint] ✓ Audio matches already parsed video {match['key']} (score {match['score']})")
+    # Keep the matched recipe, but describe the video that was actually requested
+    cached["source"].update({
+        "url": url,
+        "platform": info.get("extractor_key", "unknown").lower(),
+        "title": info.get("title") or "Untitled",
+        "duration_sec": int(info.get("duration") or 0),
+        "thumbnail": info.get("thumbnail") or "",
+        "uploader": info.get("uploader") or "",
+        "channel": info.get("channel") or "",
+        "uploader_id": info.get("uploader_id") or "",
+    })
+    cached["debug"] = {**cached.get("debug", {}), "cache_hit": True, "audio_fingerprint_match": match}
+    for cache_key in {canonical_video_key(url), key}:
+        _parse_cache.put(cache_key, cached)
+    return ParseResponse(**cached)
+
+# Captioned videos never download their audio for ASR, but their reposts (Shorts, Reels, TikTok) still
+# need a fingerprint to match against: a short audio prefix is fetched and indexed in the background.
+_fingerprint_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("AUDIO_FINGERPRINT_WORKERS", "1")), thread_name_prefix="fingerprint"
+)
+
+def download_audio_prefix(url: str, outdir: str, seconds: float) -> str:
+    """Download only the first `seconds` of a video's audio (no re-encoding)."""
+    import yt_dlp
+    ydl_opts = {
+        "format": "bestaudio/best",
+        "outtmpl": os.path.join(outdir, "prefix.%(ext)s"),
+        "quiet": True,
+        "socket_timeout": 20,
+        "download_ranges": yt_dlp.utils.download_range_func(None, [(0, seconds)]),
+    }
+    with youtube_dl(ydl_opts) as ydl:
+        ydl.download([url])
+    for fname in os.listdir(outdir):
+        if fname.startswith("prefix."):
+            return os.path.join(outdir, fname)
+    raise RuntimeError("Audio prefix download failed")
+
+def _index_audio_prefix(url: str, info: Dict[str, Any]):
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"fp_{url_hash(url)}_") as tmp:
+            with stage_slot("download"):
+                audio_path = download_audio_prefix(url, tmp, AUDIO_FINGERPRINT_SECONDS)
+            find_audio_duplicate(url, info, audio_path, index_only=True)
+    except Exception as e:
+        print(f"     [Fingerprint] Failed to index audio of {url}: {e}")
+
+def schedule_audio_fingerprint(url: str, info: Dict[str, Any]):
+    """Index the audio of a video parsed without downloading its audio (background, reduced stage share)."""
+    if AUDIO_FINGERPRINT_ENABLED:
+        _fingerprint_executor.submit(run_with_priority, BACKGROUND, _index_audio_prefix, url, info)
+
+@timed_stage("ytdlp_info")
+def extract_with_ytdlp(url: str, deadline: Optional[ParseDeadline] = None) -> Dict[str, Any]:
     print(f"     [yt-dlp] Extracting info from URL (this may take 10-20 seconds)...")
     ydl_opts = {
         "quiet": True,
@@ -841,12 +1558,15 @@ def extract_with_ytdlp(url: str) -> Dict[str, Any]:
         "forcejson": True,
         "extract_flat": False,
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    if deadline:
+        ydl_opts["socket_timeout"] = deadline.timeout(20, reserve=PARSE_LLM_RESERVE_SEC)
+    with youtube_dl(ydl_opts) as ydl:
         info = ydl.extract_info(url, download=False)
     print(f"     [yt-dlp] ✓ Info extraction complete")
     return info
 
-def download_audio(url: str, outdir: str) -> str:
+@timed_stage("audio_download")
+def download_audio(url: str, outdir: str, deadline: Optional[ParseDeadline] = None) -> str:
     print(f"     [yt-dlp] Downloading audio (this may take 10-30 seconds)...")
     target = os.path.join(outdir, "audio.m4a")
     ydl_opts = {
@@ -855,7 +1575,9 @@ def download_audio(url: str, outdir: str) -> str:
         "quiet": True,
         "postprocessors": [{"key": "FFmpegExtractAudio", "preferredcodec": "m4a"}],
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    if deadline:
+        ydl_opts["socket_timeout"] = deadline.timeout(20, reserve=PARSE_LLM_RESERVE_SEC)
+    with youtube_dl(ydl_opts) as ydl:
         ydl.download([url])
     print(f"     [yt-dlp] ✓ Audio download complete")
     # Find resulting file
@@ -864,8 +1586,13 @@ def download_audio(url: str, outdir: str) -> str:
             return os.path.join(outdir, fname)
     raise RuntimeError("Audio download failed")
 
-def get_youtube_transcript(info: Dict[str, Any]) -> Optional[str]:
-    # If yt-dlp found subtitles, try to fetch the best language track
+def get_youtube_transcript(info: Dict[str, Any], deadline: Optional[ParseDeadline] = None) -> Optional[str]:
+    vtt = get_youtube_captions_vtt(info, deadline)
+    return vtt_to_text(vtt) if vtt is not None else None
+
+@timed_stage("captions")
+def get_youtube_captions_vtt(info: Dict[str, Any], deadline: Optional[ParseDeadline] = None) -> Optional[str]:
+    # If yt-dlp found subtitles, try to fetch the best language track (raw WebVTT, with timestamps)
     print(f"     [Captions] Checking for available captions...")
     subs = info.get("subtitles") or info.get("automatic_captions") or {}
     if not subs:
@@ -883,11 +1610,11 @@ def get_youtube_transcript(info: Dict[str, Any]) -> Optional[str]:
             for tr in tracks:
                 if tr.get("ext") == "vtt":
                     try:
-                        import requests
-                        r = requests.get(tr["url"], timeout=10)
+                        timeout = deadline.timeout(10, reserve=PARSE_LLM_RESERVE_SEC) if deadline else None
+                        r = http_sessions.get("youtube").get(tr["url"], timeout=timeout)
                         if r.ok:
                             print(f"     [Captions] ✓ Successfully fetched captions")
-                            return vtt_to_text(r.text)
+                            return r.text
                     except Exception:
                         pass
     print(f"     [Captions] Failed to fetch captions")
@@ -902,11 +1629,48 @@ def vtt_to_text(vtt: str) -> str:
             lines.append(line.strip())
     return " ".join(lines)
 
-def transcribe(audio_path: str, prefer_lang: Optional[str] = "ko") -> str:
+_VTT_CUE_RE = re.compile(r"^(?:(\d+):)?(\d{2}):(\d{2})\.(\d{3}) --> (?:(\d+):)?(\d{2}):(\d{2})\.(\d{3})")
+
+def vtt_to_cues(vtt: str) -> List[Dict[str, Any]]:
+    """Parse WebVTT into timed cues: [{"start": sec, "end": sec, "text": str}, ...]"""
+    def to_sec(h, m, s, ms):
+        return int(h or 0) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
+
+    cues = []
+    current = None
+    for line in vtt.splitlines():
+        match = _VTT_CUE_RE.match(line)
+        if match:
+            g = match.groups()
+            current = {"start": to_sec(*g[:4]), "end": to_sec(*g[4:]), "text": ""}
+            cues.append(current)
+        elif current is not None and line.strip():
+            current["text"] = f"{current['text']} {re.sub(r'<[^>]+>', '', line.strip())}".strip()
+        elif not line.strip():
+            current = None
+    return [cue for cue in cues if cue["text"]]
+
+@timed_stage("whisper")
+def transcribe(audio_path: str, prefer_lang: Optional[str] = "ko", deadline: Optional[ParseDeadline] = None,
+               time_ranges: Optional[List[tuple[float, float]]] = None) -> str:
     print(f"     [Whisper] Starting transcription (this may take 20-60 seconds)...")
     model = get_whisper()
-    segments, info = model.transcribe(audio_path, language=prefer_lang, vad_filter=True)
-    result = " ".join(seg.text.strip() for seg in segments if seg.text)
+    if time_ranges:
+        # Only decode the planned recipe ranges (VAD is not applied to clipped audio)
+        clip = [t for time_range in time_ranges for t in time_range]
+        print(f"     [Whisper] Restricting ASR to {len(time_ranges)} planned range(s)")
+        segments, info = model.transcribe(audio_path, language=prefer_lang, clip_timestamps=clip)
+    else:
+        segments, info = model.transcribe(audio_path, language=prefer_lang, vad_filter=True)
+    # Segments are decoded lazily, so stopping the iteration stops the work
+    texts = []
+    for seg in segments:
+        if seg.text:
+            texts.append(seg.text.strip())
+        if deadline and not deadline.has_budget(PARSE_LLM_RESERVE_SEC):
+            deadline.degrade("asr", f"truncated at {seg.end:.0f}s of {info.duration:.0f}s audio")
+            break
+    result = " ".join(texts)
     print(f"     [Whisper] ✓ Transcription complete")
     return result
 
@@ -936,7 +1700,8 @@ def _find_ffmpeg() -> str:
         "On Railway, you may need to add FFmpeg via a buildpack or Dockerfile."
     )
 
-def sample_frames_to_tmp(video_url: str, outdir: str, fps: float = 0.3) -> List[str]:
+def sample_frames_to_tmp(video_url: str, outdir: str, fps: float = 0.3, deadline: Optional[ParseDeadline] = None,
+                         time_ranges: Optional[List[tuple[float, float]]] = None) -> List[str]:
     # yt-dlp can also give us a direct URL; but easiest path:
     # Reuse the downloaded audio's dir; also fetch a light mp4
     print(f"     [Video] Downloading video for OCR (this may take 10-30 seconds)...")
@@ -946,39 +1711,48 @@ def sample_frames_to_tmp(video_url: str, outdir: str, fps: float = 0.3) -> List[
         "outtmpl": mp4_path,
         "quiet": True,
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+    if deadline:
+        ydl_opts["socket_timeout"] = deadline.timeout(20, reserve=PARSE_LLM_RESERVE_SEC)
+    with stage_timer("video_download"), youtube_dl(ydl_opts) as ydl:
         ydl.download([video_url])
     print(f"     [Video] ✓ Video downloaded, extracting frames...")
     img_dir = os.path.join(outdir, "frames")
     os.makedirs(img_dir, exist_ok=True)
-    # Extract frames using subprocess (system ffmpeg)
-    output_pattern = os.path.join(img_dir, "frame_%05d.jpg")
-    
     # Find FFmpeg executable
     ffmpeg_path = _find_ffmpeg()
     print(f"     [Video] Using FFmpeg at: {ffmpeg_path}")
     
-    cmd = [
-        ffmpeg_path,
-        "-i", mp4_path,
-        "-vf", f"fps={fps}",
-        "-vsync", "0",
-        "-loglevel", "error",
-        output_pattern
-    ]
-    subprocess.run(cmd, check=True)
+    # Extract frames using subprocess (system ffmpeg): whole timeline, or one input-seeked pass per planned range
+    passes = [(i, ["-ss", f"{start:.2f}", "-to", f"{end:.2f}"]) for i, (start, end) in enumerate(time_ranges)] if time_ranges else [(0, [])]
+    for i, seek_args in passes:
+        output_pattern = os.path.join(img_dir, f"frame_{i:03d}_%05d.jpg")
+        cmd = [
+            ffmpeg_path,
+            *seek_args,
+            "-i", mp4_path,
+            "-vf", f"fps={fps}",
+            "-vsync", "0",
+            "-loglevel", "error",
+            output_pattern
+        ]
+        # Raises subprocess.TimeoutExpired if frame extraction would eat into the LLM reserve
+        with stage_timer("ffmpeg"):
+            subprocess.run(cmd, check=True, timeout=deadline.timeout(300, reserve=PARSE_LLM_RESERVE_SEC) if deadline else None)
     frame_list = [os.path.join(img_dir, f) for f in sorted(os.listdir(img_dir)) if f.endswith(".jpg")]
     print(f"     [Video] ✓ Extracted {len(frame_list)} frames")
     return frame_list
 
-def ocr_frames(paths: List[str]) -> str:
+@timed_stage("ocr")
+def ocr_frames(paths: List[str], deadline: Optional[ParseDeadline] = None) -> str:
     try:
         print(f"     [OCR] Initializing OCR reader...")
-        import easyocr
-        reader = easyocr.Reader(["en","ko"])  # add more if needed
+        reader = get_ocr_reader()
         print(f"     [OCR] Processing {len(paths)} frames (this may take 10-30 seconds)...")
         texts = []
         for i, p in enumerate(paths):
+            if deadline and not deadline.has_budget(PARSE_LLM_RESERVE_SEC):
+                deadline.degrade("ocr", f"truncated after {i}/{len(paths)} frames")
+                break
             if i % 5 == 0:  # Log every 5 frames
                 print(f"     [OCR] Processing frame {i+1}/{len(paths)}...")
             result = reader.readtext(p, detail=0, paragraph=True)
@@ -996,10 +1770,74 @@ def normalize_units(text: str) -> str:
             .replace("tablespoons","tbsp").replace("tablespoon","tbsp")
             .replace("teaspoons","tsp").replace("teaspoon","tsp"))
 
+### ---------- LLM: model routing ----------
+# Model tiers, cheapest first. Parses start on the tier picked by route_recipe_model() and
+# escalate one tier at a time only when the output fails schema validation.
+RECIPE_MODEL_TIERS = [
+    os.getenv("RECIPE_MODEL", "gpt-4o-mini"),
+    os.getenv("RECIPE_MODEL_STRONG", "gpt-4o"),
+]
+# ASR-only inputs longer than this (chars) go straight to the strong tier
+RECIPE_ROUTER_LONG_INPUT_CHARS = int(os.getenv("RECIPE_ROUTER_LONG_INPUT_CHARS", "12000"))
+
+def route_recipe_model(content_chars: int, used_captions: bool) -> int:
+    """
+    Pick the starting model tier for a parse.
+    Captions are clean text, so the fast tier handles them at any length.
+    Long ASR transcripts are noisy and are the inputs the fast tier most often gets wrong,
+    so they start on the strong tier instead of paying for a failed fast attempt first.
+    """
+    if not used_captions and content_chars > RECIPE_ROUTER_LONG_INPUT_CHARS:
+        return min(1, len(RECIPE_MODEL_TIERS) - 1)
+    return 0
+
+def _parse_llm_json(text: str) -> Dict[str, Any]:
+    """Extract the JSON object from an LLM response (tolerates surrounding prose/code fences)."""
+    start = text.find("{")
+    end = text.rfind("}")
+    return json.loads(text[start:end+1])
+
+def validate_structured_recipe(text: str) -> Dict[str, Any]:
+    """
+    Parse an LLM recipe response and validate it against the Recipe / Ingredient schema,
+    using the same defaults the parse endpoints apply when building the response.
+    Raises ValueError (json.JSONDecodeError) or ValidationError on invalid output.
+    """
+    js = _parse_llm_json(text)
+    if not isinstance(js, dict):
+        raise ValueError(f"expected a JSON object, got {type(js).__name__}")
+    recipe = js.get("recipe") or js
+    if not isinstance(recipe, dict):
+        raise ValueError(f"expected 'recipe' to be an object, got {type(recipe).__name__}")
+    Recipe(
+        name=recipe.get("name"),
+        servings=recipe.get("servings") or 1,
+        ingredients=recipe.get("ingredients", []),
+        steps=recipe.get("steps", []),
+        equipment=recipe.get("equipment"),
+        notes=recipe.get("notes"),
+    )
+    return js
+
+def _summarize_validation_error(e: Exception) -> str:
+    """Short description of why an LLM response was rejected (fed back into the retry prompt)."""
+    if isinstance(e, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()[:10]
+        )
+    return f"invalid JSON ({e})"
+
 ### ---------- LLM: structure the recipe ----------
 # Note: prefer_lang should always be "ko" since the app primarily targets Koreans.
 # Language settings in the UI only control the app interface, not recipe parsing.
-def call_llm_to_structure(transcript_text: str, ocr_text: str, title: str, description: str = "", prefer_lang: str = "ko") -> Dict[str, Any]:
+@timed_stage("llm")
+def call_llm_to_structure(transcript_text: str, ocr_text: str, title: str, description: str = "", prefer_lang: str = "ko",
+                          used_captions: bool = False, deadline: Optional[ParseDeadline] = None) -> Dict[str, Any]:
+    """
+    Structure the recipe with the LLM.
+    Returns the parsed JSON plus an "llm_routing" entry ({model, escalated, attempts}) describing
+    which model tier produced it; callers pop it into the response debug block.
+    """
     content = normalize_units(f"{title}\n\nDESCRIPTION:\n{description}\n\nTRANSCRIPT:\n{transcript_text}\n\nON-SCREEN TEXT:\n{ocr_text}")
     
     # Language-specific instructions
@@ -1134,27 +1972,51 @@ REQUIREMENTS:
 
 Output JSON only."""
     
-    # Example using OpenAI; replace as needed
-    print(f"     [LLM] Sending request to OpenAI (model: {os.getenv('RECIPE_MODEL','gpt-4o-mini')})...")
+    content = content[:16000]  # keep within token limits
+    tier = route_recipe_model(len(content), used_captions)
     print(f"     [LLM] Input size: transcript={len(transcript_text)} chars, ocr={len(ocr_text)} chars")
-    from openai import OpenAI
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    resp = client.chat.completions.create(
-        model=os.getenv("RECIPE_MODEL","gpt-4o-mini"),
-        messages=[
-            {"role":"system","content":system},
-            {"role":"user","content":user+"\n\n"+content[:16000]} # keep within token limits
-        ],
-        temperature=0.2
-    )
-    print(f"     [LLM] ✓ Received response from OpenAI")
-    text = resp.choices[0].message.content.strip()
-    print(f"     [LLM] Parsing JSON response...")
-    # Ensure JSON:
-    start = text.find("{")
-    end = text.rfind("}")
-    js = json.loads(text[start:end+1])
-    print(f"     [LLM] ✓ JSON parsing complete")
+
+    attempts = []
+    retry_note = ""
+    while True:
+        model = RECIPE_MODEL_TIERS[tier]
+        print(f"     [LLM] Sending request to OpenAI (model: {model})...")
+        try:
+            with stage_slot("llm", deadline):
+                text = cached_chat_completion(
+                    model=model,
+                    system=system,
+                    user=user+retry_note+"\n\n"+content,
+                    temperature=0.2,
+                    validate=validate_structured_recipe,
+                    request_timeout=deadline.timeout(120) if deadline else None
+                ).strip()
+            js = validate_structured_recipe(text)
+        except (ValueError, ValidationError) as e:
+            reason = _summarize_validation_error(e)
+            attempts.append({"model": model, "error": reason})
+            print(f"     [LLM] ✗ Response from {model} failed validation: {reason}")
+            if tier + 1 >= len(RECIPE_MODEL_TIERS):
+                raise ValueError(f"LLM output failed recipe validation after {len(attempts)} attempt(s): {reason}")
+            if deadline and not deadline.has_budget(PARSE_LLM_RESERVE_SEC / 2):
+                deadline.degrade("llm", f"escalation to {RECIPE_MODEL_TIERS[tier + 1]} skipped")
+                raise ValueError(f"LLM output failed recipe validation and no time is left to retry: {reason}")
+            # Escalate one tier and tell the model exactly what was wrong
+            tier += 1
+            retry_note = (
+                "\n\nA previous attempt was rejected for these problems, make sure to avoid them:\n"
+                + reason
+            )
+            continue
+        break
+
+    attempts.append({"model": model, "error": None})
+    print(f"     [LLM] ✓ Received valid response from OpenAI ({model})")
+    js["llm_routing"] = {
+        "model": model,
+        "escalated": len(attempts) > 1,
+        "attempts": attempts,
+    }
     return js
 
 ### ---------- Nutrition ----------
@@ -1166,6 +2028,7 @@ NUTRITION_TABLE = {
 }
 
 def match_food(name: str) -> str:
+    from rapidfuzz import process, fuzz
     choices = list(NUTRITION_TABLE.keys())
     best, score, _ = process.extractOne(name.lower(), choices, scorer=fuzz.WRatio)
     return best if score >= 70 else ""
@@ -1173,6 +2036,7 @@ def match_food(name: str) -> str:
 UNIT_TO_G = {"g": 1, "kg": 1000}
 UNIT_TO_ML = {"ml": 1, "l": 1000}
 
+@timed_stage("nutrition")
 def estimate_nutrition(ingredients: List[Dict[str, Any]], servings: int, llm_nutrition: Optional[Dict[str, float]] = None) -> Nutrition:
     """Estimate nutrition using lookup table as fallback, prioritize LLM calculation"""
     total = {"kcal":0.0,"protein_g":0.0,"fat_g":0.0,"carb_g":0.0,"sodium_mg":0.0}
@@ -1231,14 +2095,179 @@ def estimate_nutrition(ingredients: List[Dict[str, Any]], servings: int, llm_nut
         llm_estimate=llm_estimate
     )
 
+### ---------- Speculative prefetch ----------
+# Info extraction + captions started by /prefetch as soon as a URL is pasted, keyed by canonical
+# video key. The parse that follows picks up the (possibly still running) result instead of
+# starting from scratch.
+PREFETCH_TTL_SECONDS = float(os.getenv("PREFETCH_TTL_SECONDS", "600"))
+PREFETCH_MAX_ENTRIES = int(os.getenv("PREFETCH_MAX_ENTRIES", "200"))
+_prefetch_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("PREFETCH_WORKERS", "4")), thread_name_prefix="prefetch"
+)
+_prefetch_entries: Dict[str, Dict[str, Any]] = {}  # {key: {"future": Future, "created_at": float}}
+_prefetch_lock = threading.Lock()
+
+def _run_prefetch(url: str) -> Dict[str, Any]:
+    with stage_slot("download"):
+        info = extract_with_ytdlp(url)
+    platform = info.get("extractor_key", "unknown").lower()
+    captions_vtt = get_youtube_captions_vtt(info) if platform == "youtube" else None
+    print(f"[Prefetch] ✓ Warmed {url} (captions: {'yes' if captions_vtt else 'no'})")
+    return {"info": info, "captions_vtt": captions_vtt}
+
+def start_prefetch(url: str) -> str:
+    """Start prefetching `url` in the background. Returns "cached", "pending", "ready" or "started"."""
+    key = canonical_video_key(url)
+    if _parse_cache.contains(key):
+        return "cached"
+
+    now = time.time()
+    with _prefetch_lock:
+        entry = _prefetch_entries.get(key)
+        if entry and now - entry["created_at"] <= PREFETCH_TTL_SECONDS and not (
+            entry["future"].done() and entry["future"].exception()
+        ):
+            return "ready" if entry["future"].done() else "pending"
+
+        # Drop expired entries, then the oldest ones if still over the limit
+        for stale_key in [k for k, e in _prefetch_entries.items() if now - e["created_at"] > PREFETCH_TTL_SECONDS]:
+            del _prefetch_entries[stale_key]
+        while len(_prefetch_entries) >= PREFETCH_MAX_ENTRIES:
+            oldest = min(_prefetch_entries, key=lambda k: _prefetch_entries[k]["created_at"])
+            del _prefetch_entries[oldest]
+
+        _prefetch_entries[key] = {"future": _prefetch_executor.submit(_run_prefetch, url), "created_at": now}
+    return "started"
+
+def get_prefetched(url: str, deadline: Optional[ParseDeadline] = None) -> Optional[Dict[str, Any]]:
+    """
+    Return the prefetched {"info", "captions_vtt"} for `url`, waiting for an in-flight prefetch
+    (bounded by the deadline). None if there was no prefetch or it failed.
+    """
+    with _prefetch_lock:
+        entry = _prefetch_entries.get(canonical_video_key(url))
+    if not entry or time.time() - entry["created_at"] > PREFETCH_TTL_SECONDS:
+        return None
+    try:
+        timeout = deadline.timeout(30, reserve=PARSE_LLM_RESERVE_SEC) if deadline else 30
+        return entry["future"].result(timeout=timeout)
+    except Exception as e:
+        print(f"[Prefetch] Not using prefetch for {url}: {e}")
+        return None
+
+### ---------- Deadline-aware parse stages ----------
+# Videos shorter than this are always processed in full
+SEGMENT_PLANNER_MIN_DURATION_SEC = float(os.getenv("SEGMENT_PLANNER_MIN_DURATION_SEC", "600"))
+
+@profiler.attached
+def get_transcript_within_deadline(url: str, info: Dict[str, Any], platform: str, tmp: str,
+                                   prefer_lang: Optional[str], deadline: ParseDeadline
+                                   ) -> tuple[str, bool, bool, Optional[List[tuple[float, float]]], Optional[ParseResponse]]:
+    """
+    Captions first; ASR fallback if the budget allows it, otherwise rely on the description.
+    For long videos, chapters and caption timestamps are used to plan the recipe-relevant
+    time ranges; ASR (and later frame sampling) is restricted to them.
+    Returns (transcript, used_captions, used_asr, time_ranges, duplicate) - time_ranges is None for
+    the full video; duplicate is the stored parse of a re-upload with the same audio, in which case
+    the rest of the pipeline should be skipped.
+    """
+    prefetched = get_prefetched(url, deadline)
+    if prefetched is not None:
+        vtt = prefetched["captions_vtt"]
+    else:
+        vtt = get_youtube_captions_vtt(info, deadline) if platform == "youtube" else None
+    transcript = vtt_to_text(vtt) if vtt else None
+
+    time_ranges = plan_recipe_segments(
+        duration=float(info.get("duration") or 0),
+        chapters=info.get("chapters"),
+        caption_cues=vtt_to_cues(vtt) if vtt else None,
+        min_duration=SEGMENT_PLANNER_MIN_DURATION_SEC
+    )
+    if time_ranges:
+        covered = sum(end - start for start, end in time_ranges)
+        print(f"  ✓ Planned {len(time_ranges)} recipe segment(s) covering {covered:.0f}s of {info.get('duration')}s")
+
+    if transcript:
+        print(f"  ✓ Captions extracted ({len(transcript)} chars)")
+        schedule_audio_fingerprint(url, info)
+        return transcript, True, False, time_ranges, None
+
+    if not deadline.has_budget(PARSE_LLM_RESERVE_SEC + PARSE_ASR_MIN_SEC):
+        deadline.degrade("asr", "skipped, using video description instead")
+        return "", False, False, time_ranges, None
+
+    print(f"  → No captions available, downloading audio for transcription...")
+    # Queued behind other parses: give up on ASR while there is still time for it and the LLM
+    asr_reserve = PARSE_LLM_RESERVE_SEC + PARSE_ASR_MIN_SEC
+    try:
+        with stage_slot("download", deadline, reserve=asr_reserve):
+            audio_path = download_audio(url, tmp, deadline)
+        duplicate = find_audio_duplicate(url, info, audio_path)
+        if duplicate is not None:
+            return "", False, False, time_ranges, duplicate
+        print(f"  → Audio downloaded, transcribing with Whisper...")
+        with stage_slot("asr", deadline, reserve=asr_reserve):
+            transcript = transcribe(audio_path, prefer_lang, deadline, time_ranges)
+    except StageSlotTimeout as e:
+        deadline.degrade("asr", f"skipped, {e}")
+        return "", False, False, time_ranges, None
+    print(f"  ✓ Transcription complete ({len(transcript)} chars)")
+    return transcript, False, True, time_ranges, None
+
+@profiler.attached
+def get_ocr_text_within_deadline(url: str, tmp: str, deadline: ParseDeadline,
+                                 time_ranges: Optional[List[tuple[float, float]]] = None) -> str:
+    """OCR is the first optional stage to go: skipped unless the budget leaves room for it."""
+    if not deadline.has_budget(PARSE_LLM_RESERVE_SEC + PARSE_OCR_MIN_SEC):
+        deadline.degrade("ocr", "skipped")
+        return ""
+    print(f"  → Sampling frames for OCR...")
+    ocr_reserve = PARSE_LLM_RESERVE_SEC + PARSE_OCR_MIN_SEC
+    try:
+        with stage_slot("download", deadline, reserve=ocr_reserve):
+            frames = sample_frames_to_tmp(url, tmp, fps=0.3, deadline=deadline, time_ranges=time_ranges)
+    except subprocess.TimeoutExpired:
+        deadline.degrade("ocr", "frame extraction timed out")
+        return ""
+    except StageSlotTimeout as e:
+        deadline.degrade("ocr", f"skipped, {e}")
+        return ""
+    print(f"  → Running OCR on {len(frames)} frames...")
+    try:
+        with stage_slot("ocr", deadline, reserve=ocr_reserve):
+            return ocr_frames(frames, deadline)
+    except StageSlotTimeout as e:
+        deadline.degrade("ocr", f"skipped, {e}")
+        return ""
+
+@profiler.attached
+def extract_info_within_deadline(url: str, deadline: ParseDeadline) -> Dict[str, Any]:
+    prefetched = get_prefetched(url, deadline)
+    if prefetched is not None:
+        print(f"     [Prefetch] Using prefetched video info")
+        return prefetched["info"]
+    with stage_slot("download", deadline, reserve=PARSE_LLM_RESERVE_SEC):
+        return extract_with_ytdlp(url, deadline)
+
 ### ---------- Progress Streaming Helper ----------
-async def generate_progress_events(url: str, prefer_lang: str):
+async def generate_progress_events(url: str, prefer_lang: str, deadline_sec: Optional[float] = None,
+                                   force_refresh: bool = False):
     """Generator that yields SSE events for each processing stage"""
+    deadline = ParseDeadline(deadline_sec or PARSE_DEADLINE_SEC)
     try:
         print(f"\n{'='*60}")
         print(f"[PARSE START] URL: {url}")
         print(f"{'='*60}\n")
         
+        if not force_refresh:
+            cached = await asyncio.to_thread(get_cached_parse, url)
+            if cached:
+                print(f"[PARSE COMPLETE] Served from parse cache: {url}")
+                PARSE_RESULTS_TOTAL.inc(source="cache")
+                yield f"data: {json.dumps({'stage': 'result', 'progress': 100, 'data': cached.model_dump()})}\n\n"
+                return
+        
         h = url_hash(url)
         with tempfile.TemporaryDirectory(prefix=f"vr_{h}_") as tmp:
             # Stage 1: Video Analysis
@@ -1247,7 +2276,7 @@ async def generate_progress_events(url: str, prefer_lang: str):
             await asyncio.sleep(0.1)  # Small delay for UI update
             
             print(f"  → Extracting video info with yt-dlp...")
-            info = extract_with_ytdlp(url)
+            info = await asyncio.to_thread(extract_info_within_deadline, url, deadline)
             title = info.get("title") or "Untitled"
             duration = int(info.get("duration") or 0)
             platform = info.get("extractor_key","unknown").lower()
@@ -1260,22 +2289,17 @@ async def generate_progress_events(url: str, prefer_lang: str):
             
             # Get transcript
             print(f"  → Getting transcript...")
-            transcript = get_youtube_transcript(info) if platform == "youtube" else None
-            used_captions = transcript is not None
-            if not transcript:
-                print(f"  → No captions available, downloading audio for transcription...")
-                audio_path = download_audio(url, tmp)
-                print(f"  → Audio downloaded, transcribing with Whisper...")
-                transcript = transcribe(audio_path, prefer_lang)
-                print(f"  ✓ Transcription complete ({len(transcript)} chars)")
-            else:
-                print(f"  ✓ Captions extracted ({len(transcript)} chars)")
+            transcript, used_captions, used_asr, time_ranges, duplicate = await asyncio.to_thread(
+                get_transcript_within_deadline, url, info, platform, tmp, prefer_lang, deadline
+            )
+            if duplicate is not None:
+                print(f"[PARSE COMPLETE] Re-upload of an already parsed video: {url}")
+                PARSE_RESULTS_TOTAL.inc(source="audio_fingerprint")
+                yield f"data: {json.dumps({'stage': 'result', 'progress': 100, 'data': duplicate.model_dump()})}\n\n"
+                return
             
             # OCR from frames
-            print(f"  → Sampling frames for OCR...")
-            frames = sample_frames_to_tmp(url, tmp, fps=0.3)
-            print(f"  → Running OCR on {len(frames)} frames...")
-            ocr_text = ocr_frames(frames)
+            ocr_text = await asyncio.to_thread(get_ocr_text_within_deadline, url, tmp, deadline, time_ranges)
             used_ocr = bool(ocr_text.strip())
             print(f"  ✓ OCR complete ({'text found' if used_ocr else 'no text'}, {len(ocr_text)} chars)")
             print(f"[STAGE 1/7] ✓ Video analysis complete\n")
@@ -1287,7 +2311,10 @@ async def generate_progress_events(url: str, prefer_lang: str):
             
             # Call LLM to get structured data (this is the slowest part)
             print(f"  → Calling LLM with transcript ({len(transcript)} chars) and OCR ({len(ocr_text)} chars)...")
-            structured = call_llm_to_structure(transcript, ocr_text, title, description, prefer_lang or "ko")
+            structured = await asyncio.to_thread(
+                call_llm_to_structure, transcript, ocr_text, title, description, prefer_lang or "ko", used_captions, deadline
+            )
+            llm_routing = structured.pop("llm_routing", {})
             recipe = structured.get("recipe") or structured
             print(f"  ✓ LLM analysis complete")
             print(f"    - Recipe name: {recipe.get('name', 'N/A')}")
@@ -1379,7 +2406,9 @@ async def generate_progress_events(url: str, prefer_lang: str):
                     },
                     recipe=Recipe(**recipe_clean),
                     nutrition=nutrition,
-                    debug={"used_captions": used_captions, "used_asr": not used_captions, "used_ocr": used_ocr, "has_description": bool(description)}
+                    debug={"used_captions": used_captions, "used_asr": used_asr, "used_ocr": used_ocr, "has_description": bool(description),
+                           "llm_model": llm_routing.get("model"), "llm_escalated": llm_routing.get("escalated", False),
+                           "recipe_segments": time_ranges, **deadline.summary()}
                 )
                 print(f"  ✓ Response object created")
                 
@@ -1391,14 +2420,16 @@ async def generate_progress_events(url: str, prefer_lang: str):
                 print(f"  → Serializing response...")
                 loop = asyncio.get_event_loop()
                 with concurrent.futures.ThreadPoolExecutor() as pool:
-                    result_dict = await loop.run_in_executor(pool, result.model_dump)
+                    result_dict = await loop.run_in_executor(pool, bind_context(serialize_parse_response), result)
                 print(f"  ✓ Serialization complete")
+                await asyncio.to_thread(store_parse_result, url, info, result_dict, deadline)
                 
                 # Send final result
                 print(f"[STAGE 7/7] ✓ Finalization complete\n")
                 print(f"{'='*60}")
                 print(f"[PARSE COMPLETE] Successfully parsed: {title}")
                 print(f"{'='*60}\n")
+                PARSE_RESULTS_TOTAL.inc(source="pipeline")
                 yield f"data: {json.dumps({'stage': 'result', 'progress': 100, 'data': result_dict})}\n\n"
             except Exception as model_error:
                 # If model creation fails, send error with details
@@ -1429,7 +2460,7 @@ async def parse_recipe_stream(req: ParseRequest):
     print(f"[API] Language: {req.prefer_lang or 'ko'}")
     
     async def event_generator():
-        async for event in generate_progress_events(str(req.url), req.prefer_lang or "ko"):
+        async for event in generate_progress_events(str(req.url), req.prefer_lang or "ko", req.deadline_sec, req.force_refresh):
             yield event
         print(f"[API] ✓ Stream generation complete, closing connection")
     
@@ -1445,31 +2476,42 @@ async def parse_recipe_stream(req: ParseRequest):
     )
 
 ### ---------- Endpoint ----------
-@app.post("/parse_recipe", response_model=ParseResponse)
-def parse_recipe(req: ParseRequest):
-    h = url_hash(str(req.url))
+@profiler.attached
+def run_parse_pipeline(url: str, prefer_lang: Optional[str] = "ko", deadline_sec: Optional[float] = None,
+                       force_refresh: bool = False) -> ParseResponse:
+    """Run the full (blocking) parse pipeline for one URL. Shared by /parse_recipe and batch jobs."""
+    if not force_refresh:
+        cached = get_cached_parse(url)
+        if cached:
+            print(f"[Parse Cache] Hit for {url}")
+            PARSE_RESULTS_TOTAL.inc(source="cache")
+            return cached
+
+    deadline = ParseDeadline(deadline_sec or PARSE_DEADLINE_SEC)
+    h = url_hash(url)
     with tempfile.TemporaryDirectory(prefix=f"vr_{h}_") as tmp:
-        info = extract_with_ytdlp(str(req.url))
+        info = extract_info_within_deadline(url, deadline)
         title = info.get("title") or "Untitled"
         duration = int(info.get("duration") or 0)
         platform = info.get("extractor_key","unknown").lower()
         description = info.get("description") or ""  # Extract video description
         thumbnail = info.get("thumbnail") or ""  # Extract video thumbnail URL
 
-        # Captions first; ASR fallback
-        transcript = get_youtube_transcript(info) if platform == "youtube" else None
-        used_captions = transcript is not None
-        if not transcript:
-            audio_path = download_audio(str(req.url), tmp)
-            transcript = transcribe(audio_path, req.prefer_lang)
+        # Captions first; ASR fallback (skipped if the deadline is too close)
+        transcript, used_captions, used_asr, time_ranges, duplicate = get_transcript_within_deadline(
+            url, info, platform, tmp, prefer_lang, deadline
+        )
+        if duplicate is not None:
+            PARSE_RESULTS_TOTAL.inc(source="audio_fingerprint")
+            return duplicate
 
         # OCR from frames
-        frames = sample_frames_to_tmp(str(req.url), tmp, fps=0.3)
-        ocr_text = ocr_frames(frames)
+        ocr_text = get_ocr_text_within_deadline(url, tmp, deadline, time_ranges)
         used_ocr = bool(ocr_text.strip())
 
         # LLM to structure - now includes description
-        structured = call_llm_to_structure(transcript, ocr_text, title, description, req.prefer_lang or "ko")
+        structured = call_llm_to_structure(transcript, ocr_text, title, description, prefer_lang or "ko", used_captions, deadline)
+        llm_routing = structured.pop("llm_routing", {})
         recipe = structured.get("recipe") or structured  # tolerate models that skip top-level key
 
         # Nutrition - extract LLM's nutrition estimate if provided
@@ -1500,9 +2542,9 @@ def parse_recipe(req: ParseRequest):
         channel = info.get("channel") or ""
         uploader_id = info.get("uploader_id") or ""
         
-        return ParseResponse(
+        result = ParseResponse(
             source={
-                "url": str(req.url), 
+                "url": url, 
                 "platform": platform, 
                 "title": title, 
                 "duration_sec": duration, 
@@ -1516,8 +2558,202 @@ def parse_recipe(req: ParseRequest):
             },
             recipe=Recipe(**recipe),
             nutrition=nutrition,
-            debug={"used_captions": used_captions, "used_asr": not used_captions, "used_ocr": used_ocr, "has_description": bool(description)}
+            debug={"used_captions": used_captions, "used_asr": used_asr, "used_ocr": used_ocr, "has_description": bool(description),
+                   "llm_model": llm_routing.get("model"), "llm_escalated": llm_routing.get("escalated", False),
+                   "recipe_segments": time_ranges, **deadline.summary()}
+        )
+        store_parse_result(url, info, serialize_parse_response(result), deadline)
+        PARSE_RESULTS_TOTAL.inc(source="pipeline")
+        return result
+
+@app.post("/parse_recipe", response_model=ParseResponse)
+def parse_recipe(req: ParseRequest):
+    try:
+        return run_parse_pipeline(str(req.url), req.prefer_lang, req.deadline_sec, req.force_refresh)
+    except StageSlotTimeout as e:
+        # Every slot for a required stage stayed busy for the whole budget: the server is saturated
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+### ---------- Batch Parse Endpoints ----------
+# Worker count scales with cores; the per-stage limits above keep ASR/OCR from oversubscribing them
+_parse_scheduler = ParseScheduler(
+    max_workers=int(os.getenv("PARSE_BATCH_WORKERS", str(os.cpu_count() or 2))),
+    job_ttl_seconds=float(os.getenv("PARSE_JOB_TTL_SECONDS", "3600"))
+)
+PARSE_BATCH_MAX_URLS = int(os.getenv("PARSE_BATCH_MAX_URLS", "100"))
+
+def _parse_job_view(job: Dict[str, Any]) -> ParseJob:
+    return ParseJob(
+        job_id=job['job_id'],
+        url=job['url'],
+        status=job['status'],
+        result=job['result'],
+        error=job['error']
+    )
+
+@app.post("/parse_recipes_batch", response_model=BatchParseResponse)
+async def parse_recipes_batch(req: BatchParseRequest):
+    """
+    Parse many URLs in one call.
+    URLs are de-duplicated and queued on the shared parse scheduler. With wait=false the response
+    returns job IDs immediately (poll /parse_jobs/{job_id}); with wait=true it returns once every job finished.
+    """
+    urls = list(dict.fromkeys(str(u) for u in req.urls))
+    if not urls:
+        raise HTTPException(status_code=400, detail="urls cannot be empty")
+    if len(urls) > PARSE_BATCH_MAX_URLS:
+        raise HTTPException(status_code=400, detail=f"At most {PARSE_BATCH_MAX_URLS} URLs per batch")
+
+    print(f"[API] /parse_recipes_batch: queueing {len(urls)} URL(s)")
+    job_ids = [
+        _parse_scheduler.submit(
+            run_parse_pipeline, url, req.prefer_lang or "ko", req.deadline_sec,
+            metadata={'url': url}
         )
+        for url in urls
+    ]
+
+    if req.wait:
+        futures = [asyncio.wrap_future(_parse_scheduler.get_future(job_id)) for job_id in job_ids]
+        await asyncio.gather(*futures, return_exceptions=True)
+
+    return BatchParseResponse(jobs=[_parse_job_view(_parse_scheduler.get_job(job_id)) for job_id in job_ids])
+
+@app.get("/parse_jobs/{job_id}", response_model=ParseJob)
+def get_parse_job(job_id: str):
+    """Get status (and result once finished) of a batch parse job."""
+    job = _parse_scheduler.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Parse job not found")
+    return _parse_job_view(job)
+
+@app.get("/parse_jobs")
+def get_parse_scheduler_stats():
+    """Get batch parse scheduler statistics."""
+    return {
+        **_parse_scheduler.get_statistics(),
+        "stage_limits": PARSE_STAGE_LIMITS,
+        "background_stage_limits": PARSE_BACKGROUND_STAGE_LIMITS
+    }
+
+@app.get("/parse_cache/stats")
+def get_parse_cache_stats():
+    """Get parse result cache statistics (including the audio fingerprint index used for re-uploads)."""
+    # Only report the index if a parse already loaded it: loading means numpy plus the whole index
+    fingerprints = fingerprint_index.get().get_statistics() if fingerprint_index.loaded else "not loaded"
+    return {**_parse_cache.get_statistics(), "audio_fingerprints": fingerprints}
+
+@app.post("/prefetch")
+def prefetch(req: PrefetchRequest):
+    """
+    Warm up a URL the user is about to parse: starts yt-dlp info extraction and caption
+    retrieval in the background and returns immediately.
+    """
+    status = start_prefetch(str(req.url))
+    print(f"[API] /prefetch {req.url}: {status}")
+    return {"status": status, "key": canonical_video_key(str(req.url))}
+
+### ---------- Playlist / Channel Ingestion ----------
+def enumerate_playlist_entries(playlist_url: str) -> List[Dict[str, Any]]:
+    """
+    List the videos of a playlist or channel with yt-dlp flat extraction (no per-video requests).
+    Channel URLs resolve to tabs (Videos, Shorts, ...), which are expanded one level.
+    """
+    ydl_opts = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True,
+        "extract_flat": "in_playlist",
+    }
+    entries = []
+    with youtube_dl(ydl_opts) as ydl:
+        info = ydl.extract_info(playlist_url, download=False)
+        for entry in info.get("entries") or []:
+            if not entry:
+                continue
+            if entry.get("_type") == "playlist" or entry.get("ie_key") == "YoutubeTab":
+                tab = ydl.extract_info(entry.get("url") or entry.get("webpage_url"), download=False)
+                entries.extend(e for e in (tab.get("entries") or []) if e)
+            else:
+                entries.append(entry)
+
+    videos = []
+    for entry in entries:
+        video_url = entry.get("url") or entry.get("webpage_url")
+        if entry.get("id") and not (video_url or "").startswith("http"):
+            video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+        if video_url:
+            videos.append({"url": video_url, "id": entry.get("id"), "title": entry.get("title")})
+    return list({v["url"]: v for v in videos}.values())
+
+def _ingest_parse(url: str, prefer_lang: str) -> None:
+    # Results land in the parse cache via run_parse_pipeline; nothing to return.
+    # BACKGROUND priority keeps ingestion to its reduced stage share (see stage_slot)
+    run_with_priority(BACKGROUND, run_parse_pipeline, url, prefer_lang)
+
+_playlist_ingestor = PlaylistIngestor(
+    scheduler=_parse_scheduler,
+    parse_fn=_ingest_parse,
+    is_cached_fn=lambda url: _parse_cache.contains(canonical_video_key(url)),
+    enumerate_fn=enumerate_playlist_entries,
+    cursor_file=os.getenv("INGEST_CURSOR_FILE", "ingest_cursors.json"),
+    priority=int(os.getenv("INGEST_PRIORITY", "10"))
+)
+
+@app.post("/ingest_playlist")
+def ingest_playlist(req: PlaylistIngestRequest):
+    """
+    Start (or resume) background ingestion of a playlist/channel into the parse cache.
+    Entries already cached are skipped; progress is tracked by a resumable cursor.
+    """
+    print(f"[API] /ingest_playlist: {req.url}")
+    return _playlist_ingestor.start(
+        str(req.url),
+        prefer_lang=req.prefer_lang or "ko",
+        max_entries=req.max_entries,
+        restart=req.restart
+    )
+
+@app.get("/ingest_playlist/{ingest_id}")
+def get_ingest_status(ingest_id: str):
+    """Get the cursor/progress of a playlist ingestion run."""
+    cursor = _playlist_ingestor.get_cursor(ingest_id)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Ingestion run not found")
+    return cursor
+
+def search_products_or_503(query: str, limit: int) -> List[Dict[str, Any]]:
+    """search_coupang_products for endpoints: throttled providers become a 503 with Retry-After, not an empty list."""
+    try:
+        return search_coupang_products(query, limit)
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(int(e.retry_after + 0.999))})
+
+def _product_fields(raw_product: Dict[str, Any], size: tuple) -> Dict[str, Any]:
+    """Response fields of one raw provider product (CoupangProduct / ProductSearchResult)."""
+    product_price = int(raw_product.get("productPrice", raw_product.get("price", 0)))
+    rating = raw_product.get("rating")
+    if rating:
+        rating = float(rating)
+    review_count = raw_product.get("reviewCount", raw_product.get("reviews"))
+    if review_count:
+        review_count = int(review_count)
+    product_url = raw_product.get("productUrl", raw_product.get("url", ""))
+    package_size, package_unit = size
+    return {
+        "product_id": str(raw_product.get("productId", raw_product.get("id", ""))),
+        "product_name": raw_product.get("productName", raw_product.get("name", "")),
+        "product_price": product_price,
+        "product_image": raw_product.get("productImage", raw_product.get("imageUrl", "")),
+        # Accept URLs from all shopping malls (Coupang, Naver, etc.)
+        "product_url": product_url if product_url and product_url.startswith('http') else "",
+        "rating": rating,
+        "review_count": review_count,
+        "package_size": package_size,
+        "package_unit": package_unit,
+        # Price per base unit
+        "unit_price": product_price / package_size if package_size and package_size > 0 else None,
+    }
 
 ### ---------- Product Recommendation Endpoint ----------
 @app.post("/recommend_products", response_model=ProductRecommendationResponse)
@@ -1527,7 +2763,7 @@ def recommend_products(req: ProductSearchRequest):
     based on unit match, price per unit, and ratings.
     """
     # Search Coupang for products
-    raw_products = search_coupang_products(req.ingredient_name, req.limit or 10)
+    raw_products = search_products_or_503(req.ingredient_name, req.limit or 10)
     
     if not raw_products:
         return ProductRecommendationResponse(
@@ -1539,101 +2775,44 @@ def recommend_products(req: ProductSearchRequest):
             all_products=[]
         )
     
-    # Parse and enrich products with size/unit information
-    products: List[CoupangProduct] = []
-    
-    for raw_product in raw_products:
-        # Extract product info from Coupang API response
-        # The exact field names may vary based on Coupang's API structure
-        product_id = str(raw_product.get("productId", raw_product.get("id", "")))
-        product_name = raw_product.get("productName", raw_product.get("name", ""))
-        product_price = int(raw_product.get("productPrice", raw_product.get("price", 0)))
-        product_image = raw_product.get("productImage", raw_product.get("imageUrl", ""))
-        product_url = raw_product.get("productUrl", raw_product.get("url", ""))
-        rating = raw_product.get("rating")
-        if rating:
-            rating = float(rating)
-        review_count = raw_product.get("reviewCount", raw_product.get("reviews"))
-        if review_count:
-            review_count = int(review_count)
-        
-        # Use raw product URL from API
-        # Accept URLs from all shopping malls (Coupang, Naver, etc.)
-        final_product_url = product_url if product_url and product_url.startswith('http') else ""
-        
-        # Parse size from product name
-        package_size, package_unit = parse_product_size(product_name)
-        
-        # Calculate unit price (price per base unit)
-        unit_price = None
-        if package_size and package_size > 0:
-            unit_price = product_price / package_size
-        
-        # Calculate match score
-        match_score = calculate_match_score(
-            req.needed_qty,
-            req.needed_unit,
-            package_size,
-            package_unit,
-            product_price,
-            rating
-        )
-        
-        products.append(CoupangProduct(
-            product_id=product_id,
-            product_name=product_name,
-            product_price=product_price,
-            product_image=product_image,
-            product_url=final_product_url,  # Use raw URL from API
-            rating=rating,
-            review_count=review_count,
-            unit_price=unit_price,
-            package_size=package_size,
-            package_unit=package_unit,
-            match_score=match_score
-        ))
-    
-    # Sort by match score (best match first)
-    products.sort(key=lambda p: p.match_score or 0, reverse=True)
-    
-    # Find best match (highest match score with good rating)
-    best_match = None
-    for product in products:
-        if product.match_score and product.match_score > 50:
-            # Ensure decent rating if available
-            if product.rating is None or product.rating >= 3.5:
-                best_match = product
-                break
-    
-    # If no good match, just take the top one
-    if not best_match and products:
-        best_match = products[0]
-    
-    # Find budget option (lowest unit price)
-    budget_option = None
-    products_with_unit_price = [p for p in products if p.unit_price is not None]
-    if products_with_unit_price:
-        products_with_unit_price.sort(key=lambda p: p.unit_price or float('inf'))
-        # Prefer products with decent ratings for budget option too
-        for product in products_with_unit_price:
-            if product.rating is None or product.rating >= 3.0:
-                budget_option = product
-                break
-        # If no decent rating, just take the cheapest
-        if not budget_option:
-            budget_option = products_with_unit_price[0]
-    
-        return ProductRecommendationResponse(
-            ingredient=req.ingredient_name,
-            needed_qty=req.needed_qty,
-            needed_unit=req.needed_unit,
-            best_match=best_match,
-            budget_option=budget_option,
-            all_products=products[:10]  # Limit to top 10
-        )
+    # Score the whole page at once; models are only built for the returned products
+    from product_ranking import ProductPage
+    sizes = parse_product_sizes([raw_product.get("productName", raw_product.get("name", "")) for raw_product in raw_products])
+    page = ProductPage(raw_products, sizes, req.needed_qty, req.needed_unit, convert_to_base_unit)
+    ranking = page.rank_recommendation()
+    scores = ranking["match_scores"]
+    
+    built: Dict[int, CoupangProduct] = {}
+    def product_at(index: Optional[int]) -> Optional[CoupangProduct]:
+        if index is None:
+            return None
+        if index not in built:
+            built[index] = CoupangProduct(**_product_fields(raw_products[index], sizes[index]),
+                                          match_score=float(scores[index]))
+        return built[index]
+    
+    return ProductRecommendationResponse(
+        ingredient=req.ingredient_name,
+        needed_qty=req.needed_qty,
+        needed_unit=req.needed_unit,
+        best_match=product_at(ranking["best_match"]),  # Best unit match with decent rating
+        budget_option=product_at(ranking["budget_option"]),  # Lowest unit price with decent rating
+        all_products=[product_at(int(index)) for index in ranking["order"][:10]]  # Limit to top 10
+    )
 
 ### ---------- Advanced Product Search Endpoint ----------
+def search_product_page(ingredient_name: str, limit: int) -> List[Dict[str, Any]]:
+    """Raw products for an ingredient: from the local catalog while fresh, else from the providers."""
+    if _product_catalog is not None:
+        raw_products = _product_catalog.lookup(ingredient_name, limit, PRODUCT_CATALOG_MAX_AGE_SEC,
+                                               fulltext_fallback=PRODUCT_CATALOG_FULLTEXT)
+        tracer.add_event("catalog_lookup", hit=raw_products is not None)
+        if raw_products is not None:
+            return raw_products
+    return search_products_or_503(ingredient_name, limit)
+
 @app.post("/search_products_advanced", response_model=AdvancedProductSearchResponse)
+@profiler.attached
 def search_products_advanced(req: ProductSearchRequest):
     """
     Advanced product search that:
@@ -1645,7 +2824,8 @@ def search_products_advanced(req: ProductSearchRequest):
     """
     # Search for 50 products
     limit = min(req.limit or 50, 50)  # Cap at 50
-    raw_products = search_coupang_products(req.ingredient_name, limit)
+    raw_products = search_product_page(req.ingredient_name, limit)
+    tracer.set_attribute("raw_products", len(raw_products))
     
     if not raw_products:
         return AdvancedProductSearchResponse(
@@ -1658,136 +2838,59 @@ def search_products_advanced(req: ProductSearchRequest):
             all_products=[]
         )
     
-    # Parse and map all products
-    products: List[ProductSearchResult] = []
+    # Score the whole page at once (see product_ranking.py)
+    from product_ranking import ProductPage
+    sizes = parse_product_sizes([raw_product.get("productName", raw_product.get("name", "")) for raw_product in raw_products])
+    page = ProductPage(raw_products, sizes, req.needed_qty, req.needed_unit, convert_to_base_unit)
+    ranking = page.rank_advanced()
+    amount_scores, total_scores = ranking["amount_match_scores"], ranking["match_scores"]
     
-    for raw_product in raw_products:
-        # Extract product info
-        product_id = str(raw_product.get("productId", raw_product.get("id", "")))
-        product_name = raw_product.get("productName", raw_product.get("name", ""))
-        product_price = int(raw_product.get("productPrice", raw_product.get("price", 0)))
-        product_image = raw_product.get("productImage", raw_product.get("imageUrl", ""))
-        product_url = raw_product.get("productUrl", raw_product.get("url", ""))
-        rating = raw_product.get("rating")
-        if rating:
-            rating = float(rating)
-        review_count = raw_product.get("reviewCount", raw_product.get("reviews"))
-        if review_count:
-            review_count = int(review_count)
-        
-        # Use raw product URL from API
-        # Accept URLs from all shopping malls (Coupang, Naver, etc.)
-        final_product_url = product_url if product_url and product_url.startswith('http') else ""
-        
-        # Parse size from product name
-        package_size, package_unit = parse_product_size(product_name)
-        
-        # Calculate unit price (price per base unit)
-        unit_price = None
-        if package_size and package_size > 0:
-            unit_price = product_price / package_size
-        
-        # Calculate amount match score
-        amount_match_score = calculate_amount_match_score(
-            req.needed_qty,
-            req.needed_unit,
-            package_size,
-            package_unit
-        )
-        
-        # Calculate total match score (amount + rating + price)
-        total_match_score = calculate_match_score(
-            req.needed_qty,
-            req.needed_unit,
-            package_size,
-            package_unit,
-            product_price,
-            rating
-        )
-        
+    # All products are returned, sorted by amount match score (best match first)
+    products: List[ProductSearchResult] = []
+    position: Dict[int, int] = {}
+    for index in ranking["order"].tolist():
+        position[index] = len(products)
         products.append(ProductSearchResult(
-            product_id=product_id,
-            product_name=product_name,
-            product_price=product_price,
-            product_image=product_image,
-            product_url=final_product_url,  # Use raw URL from API
-            rating=rating,
-            review_count=review_count,
-            package_size=package_size,
-            package_unit=package_unit,
-            unit_price=unit_price,
-            amount_match_score=amount_match_score,
-            total_match_score=total_match_score
+            **_product_fields(raw_products[index], sizes[index]),
+            amount_match_score=float(amount_scores[index]),
+            total_match_score=float(total_scores[index])
         ))
-    
-    # Sort by amount match score (best match first)
-    products.sort(key=lambda p: p.amount_match_score or 0, reverse=True)
-    
-    # Find best amount match
-    best_amount_match = None
-    if products:
-        # Get product with highest amount match score
-        best_amount_match = products[0]
-    
-    # Find cheapest option with same amount (if needed amount is specified)
-    cheapest_same_amount = None
-    if req.needed_qty and req.needed_unit:
-        needed_base_qty, needed_base_unit = convert_to_base_unit(req.needed_qty, req.needed_unit)
-        
-        # Find products with same amount (within 5% tolerance)
-        same_amount_products = []
-        for product in products:
-            if product.package_size and product.package_unit:
-                product_base_qty, product_base_unit = convert_to_base_unit(
-                    product.package_size, product.package_unit
-                )
-                if product_base_unit == needed_base_unit:
-                    ratio = product_base_qty / needed_base_qty
-                    if 0.95 <= ratio <= 1.05:  # Within 5% of needed amount
-                        same_amount_products.append(product)
-        
-        # If multiple products have same amount, pick cheapest unit price
-        if same_amount_products:
-            same_amount_products.sort(
-                key=lambda p: p.unit_price if p.unit_price else float('inf')
-            )
-            cheapest_same_amount = same_amount_products[0]
-    
-    # Find cheapest overall (by unit price)
-    cheapest_overall = None
-    products_with_unit_price = [p for p in products if p.unit_price is not None]
-    if products_with_unit_price:
-        products_with_unit_price.sort(
-            key=lambda p: p.unit_price if p.unit_price else float('inf')
+    tracer.add_event("products_mapped", count=len(products))
+    
+    def product_at(index: Optional[int]) -> Optional[ProductSearchResult]:
+        return products[position[index]] if index is not None else None
+    
+    best_amount_match = product_at(ranking["best_amount_match"])
+    cheapest_same_amount = product_at(ranking["cheapest_same_amount"])  # Within 5% of the needed amount
+    cheapest_overall = product_at(ranking["cheapest_overall"])  # Lowest unit price overall
+    
+    tracer.add_event("best_products_selected")
+    
+    # Debug: Log the response summary (the selection dicts are only built when DEBUG is on)
+    if products_log.isEnabledFor(logging.DEBUG):
+        products_log.debug(
+            "Advanced product search for '%s': %s", req.ingredient_name,
+            json.dumps({
+                "needed_qty": req.needed_qty,
+                "needed_unit": req.needed_unit,
+                "best_amount_match": best_amount_match.model_dump() if best_amount_match else None,
+                "cheapest_same_amount": cheapest_same_amount.model_dump() if cheapest_same_amount else None,
+                "cheapest_overall": cheapest_overall.model_dump() if cheapest_overall else None,
+                "all_products_count": len(products)
+            }, ensure_ascii=False)
         )
-        cheapest_overall = products_with_unit_price[0]
-    
-    # Debug: Log the response JSON
-    response_data = {
-        "ingredient": req.ingredient_name,
-        "needed_qty": req.needed_qty,
-        "needed_unit": req.needed_unit,
-        "best_amount_match": best_amount_match.dict() if best_amount_match else None,
-        "cheapest_same_amount": cheapest_same_amount.dict() if cheapest_same_amount else None,
-        "cheapest_overall": cheapest_overall.dict() if cheapest_overall else None,
-        "all_products_count": len(products)
-    }
-    print(f"[DEBUG] Advanced Product Search Response for '{req.ingredient_name}':")
-    print(f"[DEBUG] {json.dumps(response_data, indent=2, ensure_ascii=False)}")
     
     # Log the most efficient product details
     most_efficient = cheapest_same_amount or best_amount_match or cheapest_overall
     if most_efficient:
-        print(f"[DEBUG] Most Efficient Product Selected:")
-        print(f"[DEBUG]   - Name: {most_efficient.product_name}")
-        print(f"[DEBUG]   - Price: {most_efficient.product_price}")
-        print(f"[DEBUG]   - URL: {most_efficient.product_url}")
-        print(f"[DEBUG]   - Package: {most_efficient.package_size} {most_efficient.package_unit}")
-        print(f"[DEBUG]   - Unit Price: {most_efficient.unit_price}")
-        print(f"[DEBUG]   - Amount Match Score: {most_efficient.amount_match_score}")
-        print(f"[DEBUG]   - Total Match Score: {most_efficient.total_match_score}")
+        products_log.info(
+            "Most efficient product for '%s': %s (%s원, %s %s, unit price %s, amount match %s, total match %s)",
+            req.ingredient_name, most_efficient.product_name, most_efficient.product_price,
+            most_efficient.package_size, most_efficient.package_unit, most_efficient.unit_price,
+            most_efficient.amount_match_score, most_efficient.total_match_score
+        )
     else:
-        print(f"[DEBUG] No efficient product found for '{req.ingredient_name}'")
+        products_log.info("No efficient product found for '%s'", req.ingredient_name)
     
     return AdvancedProductSearchResponse(
         ingredient=req.ingredient_name,
@@ -1799,8 +2902,221 @@ def search_products_advanced(req: ProductSearchRequest):
         all_products=products  # All 50 products with mapped data
     )
 
+### ---------- Bulk Product Search Endpoint ----------
+# One call for the whole cart instead of one /search_products_advanced round-trip per ingredient
+BULK_SEARCH_CONCURRENCY = int(os.getenv("BULK_SEARCH_CONCURRENCY", "6"))
+BULK_SEARCH_MAX_ITEMS = int(os.getenv("BULK_SEARCH_MAX_ITEMS", "100"))
+
+def merge_cart_items(items: List[ProductSearchRequest]) -> List[ProductSearchRequest]:
+    """
+    De-duplicate cart ingredients: items with the same name (case/whitespace-insensitive) and unit
+    are merged into one, summing their needed quantities. First-seen order is kept.
+    """
+    merged: Dict[tuple, ProductSearchRequest] = {}
+    for item in items:
+        name = " ".join(item.ingredient_name.split())
+        key = (name.lower(), (item.needed_unit or "").strip().lower())
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = item.model_copy(update={"ingredient_name": name})
+            continue
+        if item.needed_qty is not None:
+            existing.needed_qty = (existing.needed_qty or 0) + item.needed_qty
+        existing.limit = max(existing.limit or 0, item.limit or 0) or None
+    return list(merged.values())
+
+@app.post("/search_products_bulk", response_model=BulkProductSearchResponse)
+async def search_products_bulk(req: BulkProductSearchRequest):
+    """
+    Advanced product search for a whole cart.
+    Ingredients are de-duplicated, each distinct name is searched once, and the searches fan out
+    concurrently (at most BULK_SEARCH_CONCURRENCY at a time). A failed ingredient is reported in
+    `errors` instead of failing the whole request.
+    """
+    if not req.items:
+        raise HTTPException(status_code=400, detail="items cannot be empty")
+    if len(req.items) > BULK_SEARCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_SEARCH_MAX_ITEMS} items per request")
+
+    items = merge_cart_items(req.items)
+    tracer.set_attribute("items", len(req.items))
+    tracer.set_attribute("distinct_items", len(items))
+    semaphore = asyncio.Semaphore(max(1, BULK_SEARCH_CONCURRENCY))
+
+    # Same name with different units shares one provider search: run the searches first
+    # (filling the product search cache), then rank per item
+    names = {}
+    for item in items:
+        names.setdefault(product_search_query(item.ingredient_name).lower(), item)
+
+    async def prefetch(item: ProductSearchRequest):
+        async with semaphore:
+            try:
+                await asyncio.to_thread(search_coupang_products, item.ingredient_name, min(item.limit or 50, 50))
+            except Exception:
+                pass  # reported by the per-item search below
+
+    async def search(item: ProductSearchRequest):
+        async with semaphore:
+            return await asyncio.to_thread(search_products_advanced, item)
+
+    if PRODUCT_CACHE_ENABLED:
+        await asyncio.gather(*(prefetch(item) for item in names.values()))
+    outcomes = await asyncio.gather(*(search(item) for item in items), return_exceptions=True)
+
+    results, errors = [], []
+    for item, outcome in zip(items, outcomes):
+        if isinstance(outcome, BaseException):
+            products_log.warning("Bulk search failed for '%s' (%s): %s", item.ingredient_name, item.needed_unit, outcome)
+            # Items are distinct per (name, unit), so "간장" in ml and in g report separately
+            errors.append(BulkSearchError(
+                ingredient_name=item.ingredient_name,
+                needed_unit=item.needed_unit,
+                error=str(outcome.detail if isinstance(outcome, HTTPException) else outcome)
+            ))
+        else:
+            results.append(outcome)
+    products_log.info("Bulk product search: %d items, %d distinct, %d failed", len(req.items), len(items), len(errors))
+    return BulkProductSearchResponse(results=results, errors=errors)
+
+### ---------- Basket Optimizer Endpoint ----------
+# Buys each ingredient's total cart need at the lowest total price across package sizes and multiples
+# (bounded knapsack over package counts, see basket_optimizer.py) instead of one greedy pick per product.
+BASKET_CANDIDATES_PER_ITEM = int(os.getenv("BASKET_CANDIDATES_PER_ITEM", "50"))
+BASKET_MAX_ITEMS = int(os.getenv("BASKET_MAX_ITEMS", "50"))
+BASKET_DP_MAX_STATES = int(os.getenv("BASKET_DP_MAX_STATES", "2000"))
+
+def optimize_basket_item(ingredient: str, needed_qty: float, needed_unit: str,
+                         candidates: List[BasketCandidate], max_units: int) -> BasketItemResult:
+    """Cheapest packages (with multiples) covering one ingredient's need."""
+    from basket_optimizer import solve_package_cover
+    need, base_unit = convert_to_base_unit(needed_qty, needed_unit)
+    result = BasketItemResult(ingredient=ingredient, needed_qty=need, needed_unit=base_unit)
+    if need <= 0:
+        result.covered, result.reason = True, "nothing needed"
+        return result
+
+    # Only packages measured in the needed base unit can cover it
+    parsed = iter(parse_product_sizes([c.product_name for c in candidates if c.package_size is None]))
+    comparable: List[tuple] = []
+    for candidate in candidates:
+        size, unit = (candidate.package_size, candidate.package_unit) if candidate.package_size is not None else next(parsed)
+        if not size or not unit or candidate.product_price <= 0:
+            continue
+        base_size, package_base_unit = convert_to_base_unit(size, unit)
+        if package_base_unit == base_unit:
+            comparable.append((candidate, base_size))
+    if not comparable:
+        result.reason = f"no candidate sold in {base_unit}"
+        return result
+
+    solution = solve_package_cover(need, [size for _, size in comparable], [c.product_price for c, _ in comparable],
+                                   max_units=max_units, max_states=BASKET_DP_MAX_STATES)
+    if solution is None:
+        result.reason = f"candidates can't cover {need:g}{base_unit} within {max_units} packages each"
+        return result
+
+    for index, quantity in sorted(solution["quantities"].items(), key=lambda item: -comparable[item[0]][1]):
+        candidate, size = comparable[index]
+        result.purchases.append(BasketPurchase(
+            product_id=candidate.product_id,
+            product_name=candidate.product_name,
+            product_price=candidate.product_price,
+            product_url=candidate.product_url,
+            package_size=size,
+            package_unit=base_unit,
+            quantity=quantity,
+            subtotal=candidate.product_price * quantity
+        ))
+    result.cost = int(solution["cost"])
+    result.purchased_qty = solution["purchased"]
+    result.leftover_qty = solution["leftover"]
+    result.covered = True
+    return result
+
+def _basket_candidates(raw_products: List[Dict[str, Any]]) -> List[BasketCandidate]:
+    return [
+        BasketCandidate(
+            product_id=fields["product_id"],
+            product_name=fields["product_name"],
+            product_price=fields["product_price"],
+            product_url=fields["product_url"],
+            package_size=fields["package_size"],
+            package_unit=fields["package_unit"],
+        )
+        for fields in (_product_fields(raw, size) for raw, size in
+                       zip(raw_products, parse_product_sizes([r.get("productName", r.get("name", "")) for r in raw_products])))
+    ]
+
+@app.post("/optimize_basket", response_model=BasketOptimizeResponse)
+async def optimize_basket(req: BasketOptimizeRequest):
+    """
+    Cheapest way to buy a whole cart.
+    Items with the same ingredient and base unit are merged and their needs added up. Candidates are
+    searched (catalog first) for items that don't bring their own. Each ingredient is then solved for
+    the cheapest combination of packages and multiples covering its need, reporting cost and leftover.
+    """
+    if not req.items:
+        raise HTTPException(status_code=400, detail="items cannot be empty")
+    if len(req.items) > BASKET_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BASKET_MAX_ITEMS} items per request")
+    max_units = max(1, min(req.max_units_per_product, 100))
+
+    # Aggregate the cart: one need per (canonical ingredient, base unit)
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for item in req.items:
+        qty, base_unit = convert_to_base_unit(item.needed_qty, item.needed_unit)
+        key = (product_search_query(" ".join(item.ingredient_name.split())).lower(), base_unit)
+        entry = merged.setdefault(key, {"name": item.ingredient_name, "qty": 0.0, "unit": base_unit, "candidates": None})
+        entry["qty"] += qty
+        if item.candidates is not None:
+            entry["candidates"] = (entry["candidates"] or []) + item.candidates
+    tracer.set_attribute("items", len(req.items))
+    tracer.set_attribute("distinct_items", len(merged))
+
+    semaphore = asyncio.Semaphore(max(1, BULK_SEARCH_CONCURRENCY))
+    errors: List[BulkSearchError] = []
+
+    async def fetch(entry: Dict[str, Any]):
+        if entry["candidates"] is not None:
+            return
+        async with semaphore:
+            try:
+                raw_products = await asyncio.to_thread(search_product_page, entry["name"], min(BASKET_CANDIDATES_PER_ITEM, 50))
+                entry["candidates"] = _basket_candidates(raw_products)
+            except Exception as e:
+                products_log.warning("Basket candidate search failed for '%s' (%s): %s", entry["name"], entry["unit"], e)
+                # Entries are distinct per (canonical name, base unit), so each failure is reported separately
+                errors.append(BulkSearchError(
+                    ingredient_name=entry["name"],
+                    needed_unit=entry["unit"],
+                    error=str(e.detail if isinstance(e, HTTPException) else e)
+                ))
+
+    await asyncio.gather(*(fetch(entry) for entry in merged.values()))
+
+    def solve() -> List[BasketItemResult]:
+        return [optimize_basket_item(entry["name"], entry["qty"], entry["unit"], entry["candidates"], max_units)
+                for entry in merged.values() if entry["candidates"] is not None]
+
+    start = time.perf_counter()
+    results = await asyncio.to_thread(solve)
+    tracer.add_event("basket_solved", seconds=round(time.perf_counter() - start, 4))
+
+    leftover: Dict[str, float] = {}
+    for result in results:
+        if result.covered and result.leftover_qty:
+            leftover[result.needed_unit] = leftover.get(result.needed_unit, 0.0) + result.leftover_qty
+    uncovered = [result.ingredient for result in results if not result.covered]
+    total_cost = sum(result.cost for result in results)
+    products_log.info("Basket optimized: %d items, %d distinct, total %d원, %d uncovered, %d failed",
+                      len(req.items), len(merged), total_cost, len(uncovered), len(errors))
+    return BasketOptimizeResponse(items=results, total_cost=total_cost, leftover=leftover,
+                                  uncovered=uncovered, errors=errors)
+
 ### ---------- Recipe Recommendation Endpoint ----------
 @app.post("/recommend_recipe", response_model=RecipeRecommendationResponse)
+@profiler.attached
 def recommend_recipe(req: RecipeRecommendationRequest):
     """
     Recommend a recipe that:
@@ -1811,10 +3127,9 @@ def recommend_recipe(req: RecipeRecommendationRequest):
     Returns numerical evidence for why the recipe is recommended.
     """
     try:
-        print(f"[DEBUG] Received recommendation request:")
-        print(f"[DEBUG]   - Cart recipes count: {len(req.cart_recipes)}")
-        print(f"[DEBUG]   - Available recipes count: {len(req.available_recipes)}")
-        print(f"[DEBUG]   - User preferences: {req.user_preferences}")
+        recommend_log.info("Recommendation request: %d cart recipes, %d available recipes",
+                           len(req.cart_recipes), len(req.available_recipes))
+        recommend_log.debug("User preferences: %s", req.user_preferences)
         
         # Validate input
         if not req.cart_recipes:
@@ -1833,7 +3148,8 @@ def recommend_recipe(req: RecipeRecommendationRequest):
         cart_main_ingredients = _extract_main_ingredients(req.cart_recipes)
         
         if not cart_main_ingredients:
-            print(f"[ERROR] No main ingredients found. Cart recipes: {req.cart_recipes}")
+            recommend_log.warning("No main ingredients found in %d cart recipes", len(req.cart_recipes))
+            recommend_log.debug("Cart recipes: %s", req.cart_recipes)
             raise HTTPException(
                 status_code=400,
                 detail="No main ingredients found in cart recipes. Please ensure your recipes have ingredients with quantities."
@@ -1860,9 +3176,10 @@ def recommend_recipe(req: RecipeRecommendationRequest):
         available_actions = []
         selected_action = None
         
-        if _personalized_q_agent and req.user_id:
+        _, personalized_q_agent = get_q_agents() if req.user_id else (None, None)
+        if personalized_q_agent and req.user_id:
             try:
-                state_hash = _personalized_q_agent.get_user_agent(req.user_id or "default").hash_state(
+                state_hash = personalized_q_agent.get_user_agent(req.user_id or "default").hash_state(
                     cart_ingredients=list(cart_main_ingredients.keys()),
                     user_preferences=user_preferences,
                     available_recipes_count=len(candidate_recipes)
@@ -1875,15 +3192,15 @@ def recommend_recipe(req: RecipeRecommendationRequest):
                 ]
                 
                 # Q-Learning: Select action (recipe) using epsilon-greedy policy
-                selected_action = _personalized_q_agent.select_action_for_user(
+                selected_action = personalized_q_agent.select_action_for_user(
                     user_id=req.user_id,
                     state=state_hash,
                     available_actions=available_actions,
                     use_epsilon=True  # Use exploration
                 )
-                print(f"[RL] Q-Learning selected action: {selected_action}")
+                recommend_log.debug("Q-Learning selected action: %s", selected_action)
             except Exception as e:
-                print(f"[WARNING] Q-Learning selection failed: {e}")
+                recommend_log.warning("Q-Learning selection failed: %s", e)
                 state_hash = None
                 selected_action = None
         
@@ -1902,7 +3219,7 @@ def recommend_recipe(req: RecipeRecommendationRequest):
                     'recipe': selected_recipe,
                     'reasoning': 'Q-Learning 기반 개인화 추천입니다.'
                 }
-                print(f"[RL] Using Q-Learning recommendation: {selected_recipe.get('recipe', {}).get('name', 'Unknown')}")
+                recommend_log.info("Using Q-Learning recommendation: %s", selected_recipe.get('recipe', {}).get('name', 'Unknown'))
             else:
                 # Fallback to LLM if selected recipe not found
                 recommendation = _get_llm_recommendation(
@@ -1937,7 +3254,7 @@ def recommend_recipe(req: RecipeRecommendationRequest):
         user_weights = None
         if req.user_id:
             user_weights = _get_user_weights(req.user_id)
-            print(f"[DEBUG] Using personalized weights for user {req.user_id}: {user_weights}")
+            recommend_log.debug("Using personalized weights for user %s: %s", req.user_id, user_weights)
         
         # Generate recommendation ID for tracking feedback
         recommendation_id = str(uuid.uuid4())
@@ -1983,11 +3300,99 @@ def recommend_recipe(req: RecipeRecommendationRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ERROR] Recipe recommendation failed: {e}")
-        import traceback
-        traceback.print_exc()
+        recommend_log.exception("Recipe recommendation failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus scrape endpoint: per-stage and external call latency histograms, counters."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/admin/traces", dependencies=[Depends(require_admin)])
+def list_traces(limit: int = 50, min_duration_ms: float = 0.0, name: Optional[str] = None):
+    """Most recent request traces (newest first); filter by endpoint name or minimum duration."""
+    return {
+        **tracer.get_statistics(),
+        "traces": tracer.exporter.recent(limit=limit, min_duration_ms=min_duration_ms, name=name)
+    }
+
+@app.get("/admin/traces/{trace_id}", dependencies=[Depends(require_admin)])
+def get_trace(trace_id: str):
+    """Full span tree of one request (trace IDs are returned in the X-Trace-Id response header)."""
+    trace = tracer.exporter.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found (expired from the buffer or not sampled)")
+    return trace
+
+@app.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """Stored request profiles, newest first (profile IDs are returned in the X-Profile-Id response header)."""
+    return {"sample_rate": PROFILE_SAMPLE_RATE, "profiles": profiler.recent()}
+
+@app.get("/admin/profiles/{profile_id}", dependencies=[Depends(require_admin)], response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """Collapsed stacks of one profile - feed to flamegraph.pl, inferno or speedscope."""
+    session = profiler.get(profile_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(session.folded())
+
+@app.get("/event_loop/stats")
+def get_event_loop_stats():
+    """Event loop lag percentiles and blocking episodes seen by the loop monitor."""
+    return _loop_monitor.get_statistics()
+
+@app.get("/http_pool/stats")
+def http_pool_stats():
+    """Pooled HTTP session settings per provider."""
+    return http_sessions.get_statistics()
+
+@app.get("/ready")
+def ready(components: Optional[str] = None):
+    """
+    Readiness probe: 200 once the required components (READY_REQUIRED_COMPONENTS) are warm, else 503.
+    `?components=whisper,openai` checks a specific set instead (400 for names that are not components).
+    """
+    status = _warmup.get_status()
+    if components:
+        names = [c.strip() for c in components.split(",") if c.strip()]
+        unknown = _warmup.unknown(names)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown components: {', '.join(unknown)}")
+        status["ready"] = _warmup.is_ready(names)
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/product_cache/stats")
+def product_cache_stats():
+    """Product search cache statistics (with the ingredient normalizer's and size parser's hit rates)."""
+    return {
+        **_product_cache.get_statistics(),
+        "normalizer": _ingredient_normalizer.get_statistics(),
+        "size_parser": _size_parser.get_statistics(),
+    }
+
+@app.get("/product_catalog/stats")
+def product_catalog_stats():
+    """Local product catalog statistics."""
+    return _product_catalog.get_statistics() if _product_catalog is not None else {"enabled": False}
+
+@app.get("/product_search/providers")
+def product_provider_stats():
+    """Per-provider latency, hedging and win statistics of product search."""
+    return {
+        **_provider_orchestrator.get_statistics(),
+        "rate_limits": {name: bucket.get_statistics() for name, bucket in _rate_limiters.items()},
+        "coalescing": _search_coalescer.get_statistics(),
+    }
+
+@app.get("/llm_cache/stats")
+def get_llm_cache_stats():
+    """Get LLM response cache statistics (hit/miss counts, size, evictions)."""
+    return {
+        "enabled": LLM_CACHE_ENABLED,
+        **_llm_cache.get_statistics()
+    }
+
 ### ---------- RL Feedback Endpoints ----------
 
 @app.post("/recommendation_feedback")
@@ -1997,7 +3402,8 @@ def record_feedback(req: RecommendationFeedbackRequest):
     Updates personalized weights using RL algorithm and Q-learning.
     """
     try:
-        print(f"[DEBUG] Received feedback: user={req.user_id}, recommendation={req.recommendation_id}, feedback={req.feedback}")
+        recommend_log.info("Received feedback: user=%s, recommendation=%s, feedback=%s",
+                           req.user_id, req.recommendation_id, req.feedback)
         
         # Get recommendation context
         context = _get_recommendation_context(req.recommendation_id)
@@ -2024,7 +3430,8 @@ def record_feedback(req: RecommendationFeedbackRequest):
         _update_user_weights(req.user_id, updated_weights, req.feedback)
         
         # Q-Learning: Learn from feedback
-        if _personalized_q_agent:
+        _, personalized_q_agent = get_q_agents()
+        if personalized_q_agent:
             state = context.get('state_hash')
             action = context.get('recipe_id') or context.get('action')
             next_state = context.get('next_state')
@@ -2032,7 +3439,7 @@ def record_feedback(req: RecommendationFeedbackRequest):
             
             if state and action:
                 try:
-                    _personalized_q_agent.learn_from_feedback_for_user(
+                    personalized_q_agent.learn_from_feedback_for_user(
                         user_id=req.user_id,
                         state=state,
                         action=str(action),
@@ -2040,11 +3447,11 @@ def record_feedback(req: RecommendationFeedbackRequest):
                         next_state=next_state,
                         next_available_actions=next_available_actions
                     )
-                    print(f"[RL] Q-Learning update completed for user {req.user_id}")
+                    recommend_log.debug("Q-Learning update completed for user %s", req.user_id)
                 except Exception as e:
-                    print(f"[WARNING] Q-Learning update failed: {e}")
+                    recommend_log.warning("Q-Learning update failed: %s", e)
         
-        print(f"[DEBUG] Updated weights for user {req.user_id}: {updated_weights}")
+        recommend_log.debug("Updated weights for user %s: %s", req.user_id, updated_weights)
         
         return {
             "success": True,
@@ -2056,9 +3463,7 @@ def record_feedback(req: RecommendationFeedbackRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"[ERROR] Failed to record feedback: {e}")
-        import traceback
-        traceback.print_exc()
+        recommend_log.exception("Failed to record feedback: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to record feedback: {str(e)}")
 
 @app.get("/user_weights/{user_id}")
@@ -2073,11 +3478,12 @@ def get_user_weights(user_id: str):
         
         # Get Q-learning statistics
         q_stats = None
-        if _personalized_q_agent:
+        _, personalized_q_agent = get_q_agents()
+        if personalized_q_agent:
             try:
-                q_stats = _personalized_q_agent.get_user_statistics(user_id)
+                q_stats = personalized_q_agent.get_user_statistics(user_id)
             except Exception as e:
-                print(f"[WARNING] Failed to get Q-learning stats: {e}")
+                recommend_log.warning("Failed to get Q-learning stats: %s", e)
         
         return {
             "user_id": user_id,
@@ -2089,17 +3495,18 @@ def get_user_weights(user_id: str):
             "q_learning_stats": q_stats
         }
     except Exception as e:
-        print(f"[ERROR] Failed to get user weights: {e}")
+        recommend_log.error("Failed to get user weights: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get user weights: {str(e)}")
 
 @app.get("/rl_agent/stats")
 def get_rl_agent_stats():
     """Get Q-learning agent statistics."""
     try:
-        if _q_learning_agent and _personalized_q_agent:
+        q_learning_agent, personalized_q_agent = get_q_agents()
+        if q_learning_agent and personalized_q_agent:
             return {
-                "base_agent": _q_learning_agent.get_statistics(),
-                "total_users": len(_personalized_q_agent.user_agents)
+                "base_agent": q_learning_agent.get_statistics(),
+                "total_users": len(personalized_q_agent.user_agents)
             }
         else:
             return {
@@ -2108,9 +3515,10 @@ def get_rl_agent_stats():
                 "total_users": 0
             }
     except Exception as e:
-        print(f"[ERROR] Failed to get RL agent stats: {e}")
+        recommend_log.error("Failed to get RL agent stats: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to get RL agent stats: {str(e)}")
 
+@tracer.traced()
 def _extract_main_ingredients(cart_recipes: List[Dict[str, Any]]) -> Dict[str, float]:
     """
     Extract main ingredients from cart recipes and aggregate quantities.
@@ -2132,7 +3540,9 @@ def _extract_main_ingredients(cart_recipes: List[Dict[str, Any]]) -> Dict[str, f
         if has_any_categories:
             break
     
-    print(f"[DEBUG] Has categorized ingredients: {has_any_categories}")
+    debug = recommend_log.isEnabledFor(logging.DEBUG)
+    if debug:
+        recommend_log.debug("Has categorized ingredients: %s", has_any_categories)
     
     for cart_recipe in cart_recipes:
         recipe_data = cart_recipe.get('recipe', {})
@@ -2141,7 +3551,8 @@ def _extract_main_ingredients(cart_recipes: List[Dict[str, Any]]) -> Dict[str, f
         base_servings = recipe_data.get('servings', 1)
         scale_factor = servings / base_servings if base_servings > 0 else 1
         
-        print(f"[DEBUG] Processing recipe: {recipe_data.get('name', 'Unknown')}, ingredients: {len(ingredients)}")
+        if debug:
+            recommend_log.debug("Processing recipe: %s, ingredients: %d", recipe_data.get('name', 'Unknown'), len(ingredients))
         
         for ingredient in ingredients:
             category = ingredient.get('category', '')
@@ -2152,7 +3563,8 @@ def _extract_main_ingredients(cart_recipes: List[Dict[str, Any]]) -> Dict[str, f
                 item = ingredient.get('item', '').strip()
                 qty = ingredient.get('qty', 0) or 0
                 
-                print(f"[DEBUG]   - Main ingredient: {item}, qty: {qty}, category: '{category}'")
+                if debug:
+                    recommend_log.debug("  - Main ingredient: %s, qty: %s, category: '%s'", item, qty, category)
                 
                 if item:
                     scaled_qty = qty * scale_factor
@@ -2161,9 +3573,11 @@ def _extract_main_ingredients(cart_recipes: List[Dict[str, Any]]) -> Dict[str, f
                     else:
                         main_ingredients[item] = scaled_qty
     
-    print(f"[DEBUG] Extracted main ingredients: {list(main_ingredients.keys())}")
+    if debug:
+        recommend_log.debug("Extracted main ingredients: %s", list(main_ingredients))
     return main_ingredients
 
+@tracer.traced()
 def _extract_user_preferences(
     cart_recipes: List[Dict[str, Any]],
     explicit_preferences: Optional[Dict[str, Any]]
@@ -2289,6 +3703,7 @@ def _are_ingredients_similar(ing1: str, ing2: str) -> bool:
     
     return False
 
+@tracer.traced()
 def _find_candidate_recipes(
     cart_main_ingredients: Dict[str, float],
     available_recipes: List[Dict[str, Any]],
@@ -2303,8 +3718,11 @@ def _find_candidate_recipes(
     cart_recipe_names = {r.get('recipe', {}).get('name', '') for r in cart_recipes}
     cart_recipe_ids = {r.get('recipeId', '') for r in cart_recipes if r.get('recipeId')}
     
-    print(f"[DEBUG] Finding candidates. Cart main ingredients: {list(cart_main_ingredients.keys())}")
-    print(f"[DEBUG] Available recipes count: {len(available_recipes)}")
+    # Per-recipe logging below runs inside the candidate loop: check the level once
+    debug = recommend_log.isEnabledFor(logging.DEBUG)
+    if debug:
+        recommend_log.debug("Finding candidates. Cart main ingredients: %s, available recipes: %d",
+                            list(cart_main_ingredients), len(available_recipes))
     
     candidates = []
     
@@ -2319,7 +3737,8 @@ def _find_candidate_recipes(
         if has_any_categories:
             break
     
-    print(f"[DEBUG] Recipes have categories: {has_any_categories}")
+    if debug:
+        recommend_log.debug("Recipes have categories: %s", has_any_categories)
     
     for recipe_data in available_recipes:
         # Skip if already in cart
@@ -2327,7 +3746,8 @@ def _find_candidate_recipes(
         recipe_id = recipe_data.get('id', '') or recipe_data.get('recipeId', '')
         
         if recipe_name in cart_recipe_names or recipe_id in cart_recipe_ids:
-            print(f"[DEBUG] Skipping {recipe_name} - already in cart")
+            if debug:
+                recommend_log.debug("Skipping %s - already in cart", recipe_name)
             continue
         
         # Check if recipe shares main ingredients
@@ -2346,7 +3766,8 @@ def _find_candidate_recipes(
                 if item:
                     recipe_main_ingredients[item] = qty
         
-        print(f"[DEBUG] Recipe '{recipe_name}' main ingredients: {list(recipe_main_ingredients.keys())}")
+        if debug:
+            recommend_log.debug("Recipe '%s' main ingredients: %s", recipe_name, list(recipe_main_ingredients))
         
         # Check for shared main ingredients using improved matching
         shared = []
@@ -2356,23 +3777,26 @@ def _find_candidate_recipes(
                     # Use the cart ingredient name for consistency
                     if cart_ing not in shared:
                         shared.append(cart_ing)
-                        print(f"[DEBUG]   Matched: '{cart_ing}' <-> '{recipe_ing}'")
+                        if debug:
+                            recommend_log.debug("  Matched: '%s' <-> '%s'", cart_ing, recipe_ing)
         
         if shared:
-            print(f"[DEBUG] Found match! Recipe '{recipe_name}' shares: {shared}")
+            if debug:
+                recommend_log.debug("Found match! Recipe '%s' shares: %s", recipe_name, shared)
             candidates.append({
                 **recipe_data,
                 'shared_main_ingredients': shared,
                 'shared_count': len(shared)
             })
     
-    print(f"[DEBUG] Found {len(candidates)} candidate recipes")
+    recommend_log.info("Found %d candidate recipes", len(candidates))
     
     # Sort by number of shared ingredients (descending)
     candidates.sort(key=lambda x: x.get('shared_count', 0), reverse=True)
     
     return candidates
 
+@tracer.traced()
 def _get_llm_recommendation(
     cart_recipes: List[Dict[str, Any]],
     candidate_recipes: List[Dict[str, Any]],
@@ -2384,9 +3808,6 @@ def _get_llm_recommendation(
     1. Efficiency (shared ingredients, bulk buying)
     2. Taste preferences (tags, categories)
     """
-    from openai import OpenAI
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    
     # Prepare cart summary
     cart_summary = []
     for recipe in cart_recipes[:5]:  # Limit to 5 recipes
@@ -2436,16 +3857,12 @@ Candidate Recipes:
 Recommend the BEST recipe that maximizes efficiency and matches preferences. Return JSON only."""
     
     try:
-        resp = client.chat.completions.create(
+        text = cached_chat_completion(
             model=os.getenv("RECIPE_MODEL", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user}
-            ],
+            system=system,
+            user=user,
             temperature=0.3
-        )
-        
-        text = resp.choices[0].message.content.strip()
+        ).strip()
         start = text.find("{")
         end = text.rfind("}")
         result = json.loads(text[start:end+1])
@@ -2466,13 +3883,14 @@ Recommend the BEST recipe that maximizes efficiency and matches preferences. Ret
             }
             
     except Exception as e:
-        print(f"[ERROR] LLM recommendation failed: {e}")
+        recommend_log.error("LLM recommendation failed: %s", e)
         # Fallback to first candidate
         return {
             'recipe': candidate_recipes[0],
             'reasoning': '공유된 주재료를 활용하여 음식 낭비를 줄이고 효율적인 구매를 도와줍니다.'
         }
 
+@tracer.traced()
 def _calculate_efficiency_metrics(
     cart_recipes: List[Dict[str, Any]],
     recommended_recipe: Dict[str, Any],
@@ -2513,25 +3931,37 @@ def _calculate_efficiency_metrics(
     )
 
 ### ---------- RL Agent for Personalized Recommendations ----------
-# Import Q-Learning agent (lazy import to avoid circular dependencies)
-try:
-    from rl_agent import QLearningAgent, PersonalizedQLearningAgent
-    
-    # Initialize Q-Learning agent (global instance)
-    _q_learning_agent = QLearningAgent(
-        learning_rate=0.1,
-        discount_factor=0.95,
-        epsilon=0.1,
-        epsilon_decay=0.995,
-        epsilon_min=0.01
-    )
-    
-    # Initialize personalized Q-Learning agent
-    _personalized_q_agent = PersonalizedQLearningAgent(_q_learning_agent)
-except ImportError as e:
-    print(f"[WARNING] Failed to import Q-Learning agent: {e}")
-    _q_learning_agent = None
-    _personalized_q_agent = None
+# The Q-Learning agents (numpy + Q-table file I/O) are created on first use,
+# not at import time, so they stay off the cold-start path.
+_q_learning_agent = None
+_personalized_q_agent = None
+_q_agent_lock = threading.Lock()
+_q_agent_failed = False
+
+def get_q_agents():
+    """Return (base agent, personalized agent), or (None, None) if rl_agent is unavailable."""
+    global _q_learning_agent, _personalized_q_agent, _q_agent_failed
+    if _personalized_q_agent is None and not _q_agent_failed:
+        with _q_agent_lock:
+            if _personalized_q_agent is None and not _q_agent_failed:
+                try:
+                    from rl_agent import QLearningAgent, PersonalizedQLearningAgent
+                except ImportError as e:
+                    recommend_log.warning("Failed to import Q-Learning agent: %s", e)
+                    _q_agent_failed = True
+                    return None, None
+                # Initialize Q-Learning agent (global instance)
+                base_agent = QLearningAgent(
+                    learning_rate=0.1,
+                    discount_factor=0.95,
+                    epsilon=0.1,
+                    epsilon_decay=0.995,
+                    epsilon_min=0.01
+                )
+                _q_learning_agent = base_agent
+                # Initialize personalized Q-Learning agent
+                _personalized_q_agent = PersonalizedQLearningAgent(base_agent)
+    return _q_learning_agent, _personalized_q_agent
 
 class RLAgent:
     """
@@ -2659,7 +4089,7 @@ def _load_user_weights() -> Dict[str, Dict[str, Any]]:
             with open(USER_WEIGHTS_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"[ERROR] Failed to load user weights: {e}")
+            recommend_log.error("Failed to load user weights: %s", e)
             return {}
     return {}
 
@@ -2669,8 +4099,9 @@ def _save_user_weights(weights: Dict[str, Dict[str, Any]]):
         with open(USER_WEIGHTS_FILE, 'w', encoding='utf-8') as f:
             json.dump(weights, f, indent=2, ensure_ascii=False)
     except Exception as e:
-        print(f"[ERROR] Failed to save user weights: {e}")
+        recommend_log.error("Failed to save user weights: %s", e)
 
+@tracer.traced()
 def _get_user_weights(user_id: str) -> Dict[str, float]:
     """Get personalized weights for a user."""
     all_weights = _load_user_weights()
@@ -2709,7 +4140,7 @@ def _load_recommendation_context() -> Dict[str, Dict[str, Any]]:
             with open(RECOMMENDATION_CONTEXT_FILE, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"[ERROR] Failed to load recommendation context: {e}")
+            recommend_log.error("Failed to load recommendation context: %s", e)
             return {}
     return {}
 
@@ -2719,8 +4150,9 @@ def _save_recommendation_context(context: Dict[str, Dict[str, Any]]):
         with open(RECOMMENDATION_CONTEXT_FILE, 'w', encoding='utf-8') as f:
             json.dump(context, f, indent=2, ensure_ascii=False)
     except Exception as e:
-        print(f"[ERROR] Failed to save recommendation context: {e}")
+        recommend_log.error("Failed to save recommendation context: %s", e)
 
+@tracer.traced()
 def _store_recommendation_context(recommendation_id: str, context: Dict[str, Any]):
     """Store context for a recommendation (for feedback)."""
     all_context = _load_recommendation_context()
@@ -2732,6 +4164,7 @@ def _get_recommendation_context(recommendation_id: str) -> Optional[Dict[str, An
     all_context = _load_recommendation_context()
     return all_context.get(recommendation_id)
 
+@tracer.traced()
 def _calculate_taste_match_score(
     recommended_recipe: Dict[str, Any],
     user_preferences: Dict[str, Any]
@@ -2820,9 +4253,6 @@ def categorize_ingredient(req: CategorizeIngredientRequest):
     
     # If pattern matching didn't work, use LLM
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
         system = """You are a Korean ingredient categorization system. Categorize ingredients into one of these four categories:
 - "육류/단백질": Meat, poultry, fish, seafood, eggs, tofu, beans (protein sources)
 - "채소": Vegetables, leafy greens, roots, mushrooms
@@ -2835,17 +4265,13 @@ Return ONLY the category name in Korean (one of the four above), nothing else.""
         if original_category:
             user += f"\nOriginal category from recipe: {original_category}"
         
-        resp = client.chat.completions.create(
+        result = cached_chat_completion(
             model=os.getenv("RECIPE_MODEL", "gpt-4o-mini"),
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content": user}
-            ],
+            system=system,
+            user=user,
             temperature=0.1,
             max_tokens=20
-        )
-        
-        result = resp.choices[0].message.content.strip()
+        ).strip()
         
         # Validate the result
         valid_categories = ["육류/단백질", "채소", "곡류/쌀", "양념/소스"]
@@ -0,0 +1,191 @@
+"""
+Size Parser Benchmark
+
+Compares the compiled, cached title parser (size_parser.py) with the original
+regex-loop `parse_product_size` on a corpus of product titles: time per
+title (uncached, cached, batch) and every title where the two disagree.
+
+    python bench_size_parser.py                          # built-in corpus
+    python bench_size_parser.py --catalog product_catalog.db
+    python bench_size_parser.py --titles titles.txt --rounds 50
+
+`--catalog` reads the titles stored in the local product catalog (real
+provider results); `--titles` reads one title per line.
+"""
+
+import argparse
+import re
+import sqlite3
+import sys
+import time
+from typing import Callable, List, Optional
+
+from size_parser import ProductSizeParser
+
+# Titles as they come back from Coupang Partners / Naver Shopping
+CORPUS = [
+    "곰곰 양파, 1.5kg, 1개",
+    "국내산 햇양파 3kg (중)",
+    "양파 500g x 3개",
+    "깐양파 1kg",
+    "곰곰 깐마늘, 500g, 1개",
+    "의성 다진마늘 1kg 냉동",
+    "국산 마늘 200g (통마늘)",
+    "햇감자 1.5kg(3팩)",
+    "강원도 감자 5kg 특",
+    "흙당근 1kg",
+    "세척당근 500g x 2봉",
+    "대파 1단 (약 700g)",
+    "손질 쪽파 300g",
+    "청양고추 200g",
+    "애호박 1개",
+    "무 1개 (1.5kg 내외)",
+    "곰곰 무항생제 계란 대란, 30구, 1개",
+    "동물복지 유정란 15구 x 2판",
+    "풀무원 국산콩 두부 300g x 3개",
+    "CJ 행복한콩 두부 부침용 550g",
+    "한돈 삼겹살 구이용 (냉장) 500g",
+    "한우 1등급 불고기용 300g",
+    "하림 닭가슴살 1kg",
+    "샘표 진간장 금F3, 1.7L, 1개",
+    "몽고 송표 간장 900ml",
+    "해찬들 태양초 고추장 1kg",
+    "CJ 해찬들 재래식 된장 500g*2",
+    "청정원 순창 고추장 3kg",
+    "국산 고춧가루 500g",
+    "백설 하얀설탕 3kg",
+    "CJ 백설 꽃소금 1kg",
+    "오뚜기 순후추 50g",
+    "오뚜기 옛날 참기름 320ml",
+    "CJ 백설 들기름 160ml x 2병",
+    "백설 식용유 1.8L",
+    "올리브유 엑스트라버진 500ml",
+    "볶음참깨 100g",
+    "이천쌀 10kg",
+    "종가 포기김치 3.3kg",
+    "비비고 썰은배추김치 900g",
+    "양배추 1통",
+    "표고버섯 200g 1팩",
+    "팽이버섯 150g x 3봉",
+    "서울우유 1L x 2개",
+    "매일우유 200ml*24",
+    "남양 맛있는우유GT 2.3L",
+    "앵커 무염버터 454g",
+    "서울우유 체다 슬라이스 치즈 200g, 10개입",
+    "덴마크 모짜렐라 치즈 1kg",
+    "스팸 클래식 200g x 10캔",
+    "동원참치 라이트스탠다드 150g*10",
+    "국물용 멸치 1.5kg",
+    "국산 콩나물 300g",
+    "시금치 1단",
+    "오이 3입",
+    "대추방울토마토 1kg",
+    "칠레산 레몬 10 lemons 특대",
+    "냉동 새우 흰다리 40/50 900g",
+    "부산어묵 사각 1,000g",
+    "떡볶이떡 밀떡 1kg",
+    "오뚜기 옛날당면 500g",
+    "청정원 올리고당 1.2kg",
+    "롯데 미림 900ml",
+    "오뚜기 사과식초 500ml",
+    "곰표 밀가루 중력분 2.5kg",
+    "감자전분 1kg",
+    "농심 신라면 120g 5개입 x 4",
+    "오뚜기 진라면 매운맛 5개입",
+    "양반 김 20봉지",
+    "삼다수 2L x 6병",
+    "코카콜라 355ml 24캔",
+    "제주 감귤 5kg 로얄과",
+    "우유 1L",
+    "당근 500g",
+]
+
+
+def legacy_parse_product_size(product_name: str):
+    """parse_product_size as it was before size_parser.py (kept for comparison)."""
+    patterns = [
+        r'(\d+(?:\.\d+)?)\s*(kg|킬로그램)',
+        r'(\d+(?:\.\d+)?)\s*(g|그램|g)',
+        r'(\d+(?:\.\d+)?)\s*(l|리터|L)',
+        r'(\d+(?:\.\d+)?)\s*(ml|밀리리터)',
+        r'(\d+(?:\.\d+)?)\s*(개입)',
+        r'(\d+(?:\.\d+)?)\s*(봉지)',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, product_name, re.IGNORECASE)
+        if match:
+            size = float(match.group(1))
+            unit = match.group(2).lower()
+            if unit in ['kg', '킬로그램']:
+                return (size * 1000, 'g')
+            elif unit in ['l', '리터']:
+                return (size * 1000, 'ml')
+            elif unit in ['g', '그램']:
+                return (size, 'g')
+            elif unit in ['ml', '밀리리터']:
+                return (size, 'ml')
+            elif unit in ['개입']:
+                return (size, '개')
+            elif unit in ['봉지']:
+                return (size, '봉지')
+    return (None, None)
+
+
+def load_titles(catalog: Optional[str], titles_file: Optional[str]) -> List[str]:
+    if catalog:
+        with sqlite3.connect(catalog) as conn:
+            titles = [row[0] for row in conn.execute("SELECT name FROM products")]
+        if not titles:
+            raise SystemExit(f"No products in {catalog}")
+        return titles
+    if titles_file:
+        with open(titles_file, encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()]
+    return list(CORPUS)
+
+
+def time_per_title(fn: Callable[[], object], titles: int, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / (titles * rounds) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the product title size parser")
+    parser.add_argument("--catalog", help="Read titles from a product catalog database")
+    parser.add_argument("--titles", help="Read titles from a text file (one per line)")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    titles = load_titles(args.catalog, args.titles)
+    uncached = ProductSizeParser(cache_size=0)
+    cached = ProductSizeParser(cache_size=max(1024, len(titles)))
+    cached.parse_many(titles)
+
+    results = {
+        "legacy (regex loop)": time_per_title(lambda: [legacy_parse_product_size(t) for t in titles], len(titles), args.rounds),
+        "compiled, uncached": time_per_title(lambda: [uncached.parse(t) for t in titles], len(titles), args.rounds),
+        "compiled, LRU warm": time_per_title(lambda: [cached.parse(t) for t in titles], len(titles), args.rounds),
+        "batch (parse_many)": time_per_title(lambda: cached.parse_many(titles), len(titles), args.rounds),
+    }
+    print(f"{len(titles)} titles, {args.rounds} rounds")
+    baseline = results["legacy (regex loop)"]
+    for name, micros in results.items():
+        print(f"  {name:<22} {micros:8.2f} µs/title  ({baseline / micros:5.1f}x)")
+
+    legacy_parsed = sum(1 for t in titles if legacy_parse_product_size(t)[0] is not None)
+    new_parsed = sum(1 for t in titles if uncached.parse(t)[0] is not None)
+    print(f"sizes found: legacy {legacy_parsed}/{len(titles)}, compiled {new_parsed}/{len(titles)}")
+
+    differences = [(t, legacy_parse_product_size(t), uncached.parse(t)) for t in titles
+                   if legacy_parse_product_size(t) != uncached.parse(t)]
+    if differences:
+        print(f"{len(differences)} titles parsed differently (legacy -> compiled):")
+        for title, old, new in differences:
+            print(f"  {title}: {old} -> {new}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Startup Benchmark
+
+Measures time-to-first-request of the backend in fresh interpreters (import of
+`backend` plus app startup and one cheap request) and fails if it exceeds the
+budget or if a heavy media dependency was imported on the way. Run it before
+deploying changes that touch imports:
+
+    python bench_startup.py                 # 5 runs, 2.5s budget
+    python bench_startup.py --runs 10 --budget 1.5
+
+Exit code 1 means the guard failed.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must only load when the parse pipeline / RL agent is first used
+LAZY_MODULES = ("yt_dlp", "faster_whisper", "ctranslate2", "easyocr", "torch", "rapidfuzz", "rl_agent", "numpy")
+
+_CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+import backend
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(backend.app) as client:
+    status = client.get("/metrics").status_code
+first_request = time.perf_counter()
+print(json.dumps({
+    "import_sec": imported - start,
+    "first_request_sec": first_request - start,
+    "status": status,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+"""
+
+
+def run_once(backend_dir: str) -> dict:
+    # Warm-up loads the models on purpose; keep it out of the import-path measurement
+    env = {**os.environ, "LOOP_MONITOR_ENABLED": os.getenv("LOOP_MONITOR_ENABLED", "false"), "WARMUP_ENABLED": "false"}
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD % (LAZY_MODULES,)],
+        cwd=backend_dir, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup run failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Guard backend time-to-first-request")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=float(os.getenv("STARTUP_BUDGET_SEC", "2.5")),
+                        help="Max median seconds from interpreter start of the import to the first response")
+    args = parser.parse_args()
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    runs = [run_once(backend_dir) for _ in range(args.runs)]
+    import_median = statistics.median(run["import_sec"] for run in runs)
+    first_request_median = statistics.median(run["first_request_sec"] for run in runs)
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+
+    print(f"import backend:      median {import_median:.3f}s over {args.runs} runs")
+    print(f"first request (200): median {first_request_median:.3f}s (budget {args.budget:.3f}s)")
+
+    failed = False
+    if any(run["status"] != 200 for run in runs):
+        print("FAIL: first request did not return 200")
+        failed = True
+    if loaded:
+        print(f"FAIL: heavy modules imported at startup: {', '.join(loaded)}")
+        failed = True
+    if first_request_median > args.budget:
+        print("FAIL: time-to-first-request over budget")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Pooled HTTP Sessions
+
+One requests.Session per external provider (Naver Shopping, Coupang Partners,
+YouTube caption tracks), shared by all threads, so repeated lookups reuse
+keep-alive connections instead of paying a TCP + TLS handshake per call.
+
+Each session mounts an HTTPAdapter sized for the number of threads that call
+the provider concurrently, retries idempotent requests on connection errors
+and 502/503/504 with exponential backoff, and applies default (connect, read)
+timeouts when the caller doesn't pass one.
+"""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that fills in a default timeout."""
+
+    def __init__(self, timeout: Tuple[float, float], *args, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class HttpSessionPool:
+    """Lazily creates and caches one configured session per provider."""
+
+    def __init__(self):
+        self._configs: Dict[str, Dict[str, Any]] = {}
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        provider: str,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        retries: int = 2,
+        backoff_factor: float = 0.3,
+        status_forcelist: Tuple[int, ...] = (502, 503, 504),
+        headers: Optional[Dict[str, str]] = None
+    ):
+        """
+        Register a provider's session settings (takes effect when the session is first used).
+
+        Args:
+            provider: Provider name, e.g. "naver"
+            pool_size: Max keep-alive connections kept per host (size to the concurrent callers)
+            connect_timeout: Default connect timeout in seconds
+            read_timeout: Default read timeout in seconds
+            retries: Retries for GET/HEAD on connection errors and `status_forcelist` responses
+            backoff_factor: Exponential backoff base between retries
+            status_forcelist: Response statuses that are retried
+            headers: Default headers sent with every request
+        """
+        self._configs[provider] = {
+            'pool_size': pool_size,
+            'timeout': (connect_timeout, read_timeout),
+            'retries': retries,
+            'backoff_factor': backoff_factor,
+            'status_forcelist': status_forcelist,
+            'headers': headers or {},
+        }
+
+    def _build(self, config: Dict[str, Any]) -> requests.Session:
+        retry = Retry(
+            total=config['retries'],
+            connect=config['retries'],
+            read=config['retries'],
+            status=config['retries'],
+            backoff_factor=config['backoff_factor'],
+            status_forcelist=config['status_forcelist'],
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,  # hand the final response back; callers use raise_for_status()
+        )
+        adapter = _TimeoutHTTPAdapter(
+            config['timeout'],
+            pool_connections=config['pool_size'],
+            pool_maxsize=config['pool_size'],
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update(config['headers'])
+        return session
+
+    def get(self, provider: str) -> requests.Session:
+        """Return the shared session for `provider` (default settings if it was never configured)."""
+        session = self._sessions.get(provider)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(provider)
+                if session is None:
+                    if provider not in self._configs:
+                        self.configure(provider)
+                    session = self._build(self._configs[provider])
+                    self._sessions[provider] = session
+        return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-provider pool settings and open connection pools."""
+        stats = {}
+        for provider, config in self._configs.items():
+            session = self._sessions.get(provider)
+            adapter = session.get_adapter("https://") if session else None
+            stats[provider] = {
+                'active': session is not None,
+                'pool_size': config['pool_size'],
+                'connect_timeout_sec': config['timeout'][0],
+                'read_timeout_sec': config['timeout'][1],
+                'retries': config['retries'],
+                'open_pools': len(adapter.poolmanager.pools) if adapter else 0,
+            }
+        return stats
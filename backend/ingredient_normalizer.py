@@ -0,0 +1,254 @@
+"""
+Ingredient-to-Query Normalizer
+
+Recipe ingredients reach product search in many spellings of the same thing:
+"다진 마늘", "마늘 (다진 것)", "깐마늘", "garlic". Each one used to become its
+own provider query and its own cache key. The normalizer maps all of them to
+one canonical Korean shopping term ("마늘"):
+
+1. Parenthesized remarks are dropped: "마늘 (다진 것)" -> "마늘".
+2. Preparation words are removed: the Korean/English forms the LLM puts in
+   ingredient `notes` ("다진", "썬", "chopped", "minced", ...), plus amount
+   and origin filler ("약간", "국내산").
+3. Preparation prefixes glued to a known term are removed: "깐마늘",
+   "다진마늘". This only happens when the remainder is a known term, so
+   "생강" keeps its "생".
+4. Synonyms and English names map to the canonical term: "달걀"/"eggs" ->
+   "계란", "scallion" -> "쪽파".
+5. A multi-word name maps to a known term only when every other word is a
+   usage or origin qualifier ("국물용 멸치" -> "멸치", "호주산 소고기" ->
+   "소고기"). Any other extra word makes it a different product: "bell
+   pepper" is not 후추, "coconut milk" is not 우유, "소고기 육수" is not
+   소고기. Those names are only cleaned and searched as they are.
+
+Patterns are compiled once and results are memoized, so a lookup is a dict hit
+after the first call. Statistics report how many queries mapped to a known
+canonical term (hit rate) versus passing through unchanged.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Canonical shopping term -> aliases (Korean variants and English names, lowercase)
+DEFAULT_SYNONYMS: Dict[str, List[str]] = {
+    "마늘": ["garlic", "통마늘", "garlic cloves"],
+    "양파": ["onion", "onions", "white onion", "yellow onion"],
+    "적양파": ["red onion", "purple onion"],
+    "대파": ["파", "green onion", "green onions", "leek"],
+    "쪽파": ["scallion", "scallions", "spring onion", "spring onions", "chives"],
+    "생강": ["ginger"],
+    "감자": ["potato", "potatoes"],
+    "고구마": ["sweet potato", "sweet potatoes"],
+    "당근": ["carrot", "carrots"],
+    "계란": ["달걀", "egg", "eggs", "계란 노른자", "계란 흰자", "egg yolk", "egg white"],
+    "두부": ["tofu", "bean curd"],
+    "삼겹살": ["pork belly"],
+    "돼지고기": ["pork", "돼지 고기"],
+    "소고기": ["쇠고기", "beef", "소 고기"],
+    "닭고기": ["chicken", "닭", "닭 고기"],
+    "닭가슴살": ["chicken breast"],
+    "간장": ["soy sauce", "진간장", "양조간장"],
+    "고추장": ["gochujang", "red pepper paste"],
+    "된장": ["doenjang", "soybean paste"],
+    "고춧가루": ["gochugaru", "red pepper flakes", "chili flakes", "chili powder"],
+    "고추": ["chili", "chili pepper", "chilies", "풋고추"],
+    "청양고추": ["cheongyang pepper", "korean green chili"],
+    "설탕": ["sugar", "백설탕", "white sugar"],
+    "소금": ["salt", "굵은소금", "꽃소금"],
+    "후추": ["pepper", "black pepper", "후춧가루"],
+    "참기름": ["sesame oil"],
+    "들기름": ["perilla oil"],
+    "식용유": ["cooking oil", "vegetable oil", "oil"],
+    "올리브유": ["olive oil", "올리브 오일"],
+    "참깨": ["sesame seeds", "sesame", "깨", "통깨"],
+    "쌀": ["rice", "백미"],
+    "김치": ["kimchi", "배추김치"],
+    "애호박": ["zucchini", "courgette", "호박"],
+    "양배추": ["cabbage"],
+    "배추": ["napa cabbage", "chinese cabbage"],
+    "버섯": ["mushroom", "mushrooms"],
+    "표고버섯": ["shiitake", "shiitake mushroom", "shiitake mushrooms"],
+    "팽이버섯": ["enoki", "enoki mushroom", "enoki mushrooms"],
+    "느타리버섯": ["oyster mushroom", "oyster mushrooms"],
+    "우유": ["milk"],
+    "버터": ["butter"],
+    "치즈": ["cheese"],
+    "모짜렐라 치즈": ["mozzarella", "mozzarella cheese", "모짜렐라", "모차렐라 치즈"],
+    "스팸": ["spam"],
+    "참치": ["tuna", "참치캔", "canned tuna"],
+    "멸치": ["anchovy", "anchovies"],
+    "무": ["radish", "daikon", "korean radish"],
+    "콩나물": ["bean sprouts", "soybean sprouts"],
+    "숙주": ["mung bean sprouts", "숙주나물"],
+    "시금치": ["spinach"],
+    "오이": ["cucumber", "cucumbers"],
+    "토마토": ["tomato", "tomatoes"],
+    "레몬": ["lemon", "lemons"],
+    "새우": ["shrimp", "prawn", "prawns"],
+    "오징어": ["squid"],
+    "어묵": ["fish cake", "fishcake", "오뎅"],
+    "떡": ["rice cake", "떡볶이떡", "떡볶이 떡"],
+    "당면": ["glass noodles", "sweet potato noodles"],
+    "물엿": ["corn syrup", "올리고당", "oligosaccharide syrup"],
+    "맛술": ["mirin", "미림"],
+    "식초": ["vinegar"],
+    "밀가루": ["flour", "all-purpose flour", "중력분"],
+    "전분": ["starch", "corn starch", "cornstarch", "감자전분"],
+}
+
+# Preparation / amount / origin words (the conventions of ingredient `notes` in call_llm_to_structure)
+DEFAULT_PREP_WORDS: List[str] = [
+    # Korean cutting / preparation
+    "다진", "다져진", "곱게 다진", "굵게 다진", "깐", "썬", "채 썬", "채썬", "송송 썬", "어슷 썬", "어슷썬",
+    "깍둑 썬", "깍둑썬", "얇게 썬", "잘게 썬", "큼직하게 썬", "으깬", "간", "갈은", "손질한", "손질된",
+    "삶은", "데친", "볶은", "구운", "불린", "껍질 벗긴", "껍질 깐", "씨 뺀", "해동한", "다진 것", "썬 것",
+    # Amount / origin filler
+    "약간", "적당량", "조금", "국내산", "국산", "신선한",
+    # English
+    "chopped", "finely chopped", "roughly chopped", "minced", "diced", "sliced", "thinly sliced", "julienned",
+    "peeled", "crushed", "grated", "shredded", "mashed", "boiled", "blanched", "fresh", "finely", "roughly",
+    "thinly", "to taste", "optional",
+]
+
+# Prefixes that are stripped when glued to a known term ("깐마늘", "다진마늘")
+DEFAULT_GLUED_PREFIXES: List[str] = ["다진", "깐", "채썬", "으깬", "생", "통", "햇", "냉동", "간"]
+
+# Suffixes of qualifier words that may accompany a known term: usage ("국물용", "구이용") and origin ("호주산")
+DEFAULT_QUALIFIER_SUFFIXES: List[str] = ["용", "산"]
+
+
+class IngredientNormalizer:
+    """Maps ingredient names to canonical shopping queries (memoized)."""
+
+    def __init__(
+        self,
+        synonyms: Optional[Dict[str, Iterable[str]]] = None,
+        prep_words: Optional[Iterable[str]] = None,
+        glued_prefixes: Optional[Iterable[str]] = None,
+        qualifier_suffixes: Optional[Iterable[str]] = None,
+        cache_size: int = 8192
+    ):
+        """
+        Initialize the normalizer.
+
+        Args:
+            synonyms: Canonical term -> aliases (defaults to DEFAULT_SYNONYMS)
+            prep_words: Words removed wherever they appear as separate words
+            glued_prefixes: Prefixes removed when the rest is a known term
+            qualifier_suffixes: Suffixes of words that may accompany a known term in a multi-word name
+            cache_size: Number of memoized normalizations kept
+        """
+        synonyms = DEFAULT_SYNONYMS if synonyms is None else synonyms
+        self._canonical: Dict[str, str] = {}
+        for canonical, aliases in synonyms.items():
+            self._canonical[canonical.lower()] = canonical
+            for alias in aliases:
+                self._canonical[alias.lower()] = canonical
+
+        words = sorted(DEFAULT_PREP_WORDS if prep_words is None else prep_words, key=len, reverse=True)
+        # Whole words only: "간" must not eat into "간장"
+        self._prep_pattern = re.compile(
+            r"(?<![\w])(?:" + "|".join(re.escape(word) for word in words) + r")(?![\w])", re.IGNORECASE
+        )
+        self._parenthetical = re.compile(r"[\(\[\{][^\)\]\}]*[\)\]\}]")
+        self._noise = re.compile(r"[^\w\s-]")
+        self._whitespace = re.compile(r"\s+")
+        self._glued_prefixes = sorted(DEFAULT_GLUED_PREFIXES if glued_prefixes is None else glued_prefixes,
+                                      key=len, reverse=True)
+        self._qualifier_suffixes = tuple(DEFAULT_QUALIFIER_SUFFIXES if qualifier_suffixes is None
+                                         else qualifier_suffixes)
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.cache_hits = 0
+        self.canonical_hits = 0  # mapped to a known canonical term
+        self.passthrough = 0  # unknown term, only cleaned
+
+    def _lookup_term(self, text: str) -> Optional[str]:
+        canonical = self._canonical.get(text)
+        if canonical is not None:
+            return canonical
+        for prefix in self._glued_prefixes:
+            if text.startswith(prefix) and len(text) > len(prefix):
+                canonical = self._canonical.get(text[len(prefix):].strip())
+                if canonical is not None:
+                    return canonical
+        # English plurals not listed explicitly
+        if text.endswith("es") and text[:-2] in self._canonical:
+            return self._canonical[text[:-2]]
+        if text.endswith("s") and text[:-1] in self._canonical:
+            return self._canonical[text[:-1]]
+        return None
+
+    def _is_qualifier(self, word: str) -> bool:
+        return any(word.endswith(suffix) and len(word) > len(suffix) for suffix in self._qualifier_suffixes)
+
+    def _normalize(self, name: str) -> Tuple[str, bool]:
+        text = name.lower()
+        canonical = self._lookup_term(self._whitespace.sub(" ", text).strip())
+        if canonical is not None:
+            return canonical, True
+        text = self._parenthetical.sub(" ", text)
+        text = self._noise.sub(" ", text)
+        text = self._prep_pattern.sub(" ", text)
+        text = self._whitespace.sub(" ", text).strip()
+        canonical = self._lookup_term(text)
+        if canonical is not None:
+            return canonical, True
+        # Multi-word leftovers: a known word decides only next to qualifiers ("국물용 멸치" -> "멸치"),
+        # never next to another noun ("bell pepper", "소고기 육수")
+        words = text.split(" ")
+        known = {self._canonical[word] for word in words if word in self._canonical}
+        if len(known) == 1 and all(word in self._canonical or self._is_qualifier(word) for word in words):
+            return known.pop(), True
+        return text or self._whitespace.sub(" ", name).strip(), False
+
+    def normalize(self, name: str) -> str:
+        """Canonical shopping query for an ingredient name."""
+        with self._lock:
+            self.calls += 1
+            cached = self._cache.get(name)
+            if cached is not None:
+                self._cache.move_to_end(name)
+                self.cache_hits += 1
+                return cached
+        result, known = self._normalize(name or "")
+        with self._lock:
+            if known:
+                self.canonical_hits += 1
+            else:
+                self.passthrough += 1
+            self._cache[name] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Normalization statistics (hit rate = share of distinct names mapped to a canonical term)."""
+        resolved = self.canonical_hits + self.passthrough
+        return {
+            'vocabulary': len(self._canonical),
+            'calls': self.calls,
+            'memo_hits': self.cache_hits,
+            'memo_hit_rate': (self.cache_hits / self.calls) if self.calls else 0.0,
+            'canonical_hits': self.canonical_hits,
+            'passthrough': self.passthrough,
+            'canonical_hit_rate': (self.canonical_hits / resolved) if resolved else 0.0,
+        }
+
+
+_default_normalizer: Optional[IngredientNormalizer] = None
+
+
+def get_normalizer() -> IngredientNormalizer:
+    """Shared normalizer with the default vocabulary."""
+    global _default_normalizer
+    if _default_normalizer is None:
+        _default_normalizer = IngredientNormalizer()
+    return _default_normalizer
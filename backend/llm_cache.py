@@ -0,0 +1,199 @@
+"""
+Persistent LLM Response Cache
+
+Stores OpenAI chat completions keyed by a hash of the prompt that produced them
+(model, system prompt, user prompt, temperature and any extra request options),
+so identical prompts are answered locally instead of paying the API latency
+and cost again.
+
+The cache is an LRU bounded by entry count, entries expire after a TTL, and the
+contents are persisted to a JSON file so they survive restarts.
+"""
+
+import json
+import os
+import hashlib
+import threading
+import time
+import atexit
+from collections import OrderedDict
+from typing import Dict, Optional, Any
+
+from log_config import get_logger
+
+llm_log = get_logger("llm")
+
+
+class LLMResponseCache:
+    """
+    Size-bounded, TTL-aware cache of LLM completions.
+
+    Entries: {key: {"value": completion_text, "model": model, "created_at": epoch_seconds}}
+
+    Writes are flushed to disk by a background thread at most once per
+    `flush_interval` seconds (and at interpreter exit), never on the request
+    thread, so a burst of misses doesn't rewrite the file on every call.
+    """
+
+    def __init__(
+        self,
+        cache_file: str = "llm_cache.json",
+        max_entries: int = 2000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        flush_interval: float = 5.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_file: JSON file used for persistence (None disables persistence)
+            max_entries: Maximum number of completions kept (least recently used are evicted)
+            ttl_seconds: Lifetime of an entry before it is treated as a miss
+            flush_interval: Minimum seconds between writes to the cache file
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.flush_interval = flush_interval
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()  # one writer at a time, so an older snapshot never lands last
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.writes = 0
+
+        self._load()
+        if self.cache_file:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="llm-cache-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def close(self):
+        """Stop the background flusher and write pending changes."""
+        self._stop.set()
+        self.flush()
+
+    @staticmethod
+    def make_key(model: str, system: str, user: str, temperature: float, **extra: Any) -> str:
+        """Create a stable cache key for a chat completion request."""
+        payload = json.dumps(
+            {
+                "model": model,
+                "system": system,
+                "user": user,
+                "temperature": round(float(temperature), 4),
+                "extra": extra,
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for `key`, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+                del self._entries[key]
+                self._dirty = True
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.get("value")
+
+    def put(self, key: str, value: str, model: Optional[str] = None):
+        """Store a completion and evict the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._entries[key] = {
+                "value": value,
+                "model": model,
+                "created_at": time.time()
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self.writes += 1
+            self._dirty = True
+
+    def clear(self):
+        """Remove all entries (metrics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.flush()
+
+    def _load(self):
+        """Load cache entries from file, dropping anything already expired."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            entries = sorted(
+                (item for item in data.get('entries', {}).items()
+                 if now - item[1].get("created_at", 0) <= self.ttl_seconds),
+                key=lambda item: item[1].get("created_at", 0)
+            )
+            self._entries = OrderedDict(entries[-self.max_entries:])
+            llm_log.info("LLM cache loaded %d cached responses", len(self._entries))
+        except Exception as e:
+            llm_log.warning("LLM cache failed to load %s: %s", self.cache_file, e)
+            self._entries = OrderedDict()
+
+    def flush(self):
+        """Write the cache to disk if it changed since the last flush."""
+        if not self.cache_file:
+            return
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = dict(self._entries)
+                self._dirty = False
+                self._last_flush = time.time()
+            try:
+                tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'entries': snapshot}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True  # retry on the next flush
+                llm_log.warning("LLM cache failed to save %s: %s", self.cache_file, e)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'writes': self.writes,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0
+        }
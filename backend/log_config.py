@@ -0,0 +1,130 @@
+"""
+Logging Configuration
+
+Leveled, per-module logging for the hot request paths (product search,
+recommendations, LLM calls), replacing unconditional print() calls.
+
+Environment:
+    LOG_LEVEL             Root level for all "yorigo.*" loggers (default INFO)
+    LOG_LEVELS            Per-module overrides, e.g. "products=DEBUG,recommend=WARNING"
+    LOG_FORMAT            "text" (default) or "json" (one JSON object per line)
+    LOG_DEBUG_SAMPLE_RATE Fraction of DEBUG records kept (default 1.0)
+    LOG_RATE_LIMIT        Max records per message template per logger per minute (default 120, 0 = off)
+
+Messages use lazy %-formatting (logger.debug("found %d items", n)), so
+arguments of suppressed records are never formatted; expensive arguments
+(e.g. JSON dumps) should additionally be guarded with isEnabledFor().
+"""
+
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from typing import Dict, Tuple
+
+ROOT_LOGGER = "yorigo"
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a random fraction of DEBUG records (other levels always pass)."""
+
+    def __init__(self, debug_sample_rate: float = 1.0):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.debug_sample_rate >= 1.0:
+            return True
+        return random.random() < self.debug_sample_rate
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Allow at most `per_minute` records per (logger, message template) per minute.
+    The first record after a suppressed stretch reports how many were dropped.
+    WARNING and above are never dropped.
+    """
+
+    def __init__(self, per_minute: int = 120):
+        super().__init__()
+        self.per_minute = per_minute
+        self._windows: Dict[Tuple[str, str], list] = {}  # key -> [window_start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.per_minute <= 0 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= 60.0:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 4096:
+                    self._windows = {key: self._windows[key]}
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if window[1] >= self.per_minute:
+                window[2] += 1
+                return False
+            window[1] += 1
+            return True
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (+{suppressed} similar suppressed)" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra={...}` fields are included as top-level keys."""
+
+    _RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        payload.update({k: v for k, v in vars(record).items() if k not in self._RESERVED})
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def configure_logging():
+    """Configure the "yorigo" logger tree from the environment (idempotent)."""
+    root = logging.getLogger(ROOT_LOGGER)
+    if getattr(root, "_yorigo_configured", False):
+        return
+    root._yorigo_configured = True
+
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for override in filter(None, (part.strip() for part in os.getenv("LOG_LEVELS", "").split(","))):
+        module, _, level = override.partition("=")
+        logging.getLogger(f"{ROOT_LOGGER}.{module.strip()}").setLevel(level.strip().upper())
+
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+    handler.addFilter(SamplingFilter(float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))))
+    handler.addFilter(RateLimitFilter(int(os.getenv("LOG_RATE_LIMIT", "120"))))
+    root.addHandler(handler)
+    root.propagate = False
+
+
+def get_logger(module: str) -> logging.Logger:
+    """Logger for one backend module, e.g. get_logger("products") -> "yorigo.products"."""
+    configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{module}")
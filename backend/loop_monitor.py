@@ -0,0 +1,173 @@
+"""
+Event Loop Lag Monitor
+
+Continuously measures how late the asyncio event loop wakes up from a short
+sleep (its "lag"), and detects callbacks that block the loop: a watchdog
+thread notices when the loop stops heartbeating and logs the stack the loop
+thread is stuck in, which points straight at the blocking call (a sync
+request, file I/O or CPU work in an `async def`).
+
+Cost is one timer callback per probe interval plus a sleeping thread, cheap
+enough to leave on in production.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class EventLoopMonitor:
+    """
+    Lag probe + blocking-call watchdog for one event loop.
+
+    Lag percentiles are computed over the last `window` probes; if a metrics
+    registry is given, they are exported as gauges along with a lag histogram
+    and a counter of blocking episodes.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.25,
+        block_threshold: float = 0.5,
+        window: int = 1200,
+        stack_log_interval: float = 60.0,
+        registry: Any = None
+    ):
+        """
+        Initialize the monitor (call `start()` from inside the running loop).
+
+        Args:
+            interval: Seconds between lag probes
+            block_threshold: Loop stalls longer than this are logged with the blocking stack
+            window: Number of recent probes used for percentiles
+            stack_log_interval: Minimum seconds between logs of the same blocking stack
+            registry: Optional metrics.MetricsRegistry to export lag metrics to
+        """
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.stack_log_interval = stack_log_interval
+
+        self._lags: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_beat = time.monotonic()
+        self._stack_logged_at: Dict[str, float] = {}
+
+        # Metrics
+        self.max_lag = 0.0
+        self.blocked_episodes = 0
+        self.longest_block = 0.0
+
+        self._lag_histogram = self._lag_gauge = self._blocked_counter = None
+        if registry is not None:
+            self._lag_histogram = registry.histogram(
+                "yorigo_event_loop_lag_seconds", "Event loop wake-up lag per probe",
+                buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+            )
+            self._lag_gauge = registry.gauge(
+                "yorigo_event_loop_lag_quantile_seconds", "Event loop lag percentiles over the recent window",
+                ["quantile"]
+            )
+            self._blocked_counter = registry.counter(
+                "yorigo_event_loop_blocked_total", "Times the event loop was blocked longer than the threshold"
+            )
+
+    def start(self):
+        """Start the probe task on the running loop and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _probe(self):
+        probes = 0
+        while not self._stop.is_set():
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - start - self.interval)
+            with self._lock:
+                self._lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+            if self._lag_histogram is not None:
+                self._lag_histogram.observe(lag)
+                probes += 1
+                if probes % 20 == 0:
+                    for quantile, value in self.percentiles().items():
+                        self._lag_gauge.set(value, quantile=quantile)
+
+    def _watch(self):
+        blocked_since: Optional[float] = None
+        while not self._stop.wait(self.block_threshold / 2):
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.block_threshold:
+                if blocked_since is not None:
+                    # Episode over: record how long the loop was stuck
+                    duration = time.monotonic() - blocked_since + self.block_threshold
+                    with self._lock:
+                        self.longest_block = max(self.longest_block, duration)
+                    blocked_since = None
+                continue
+            if blocked_since is not None:
+                continue
+            blocked_since = time.monotonic()
+            with self._lock:
+                self.blocked_episodes += 1
+            if self._blocked_counter is not None:
+                self._blocked_counter.inc()
+            self._log_blocking_stack(stalled)
+
+    def _log_blocking_stack(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame, limit=20))  # innermost frames hold the blocking call
+        # Same blocking site again soon after: count it, don't flood the logs
+        now = time.monotonic()
+        if now - self._stack_logged_at.get(stack, float("-inf")) < self.stack_log_interval:
+            return
+        self._stack_logged_at[stack] = now
+        if len(self._stack_logged_at) > 256:
+            self._stack_logged_at.clear()
+        print(f"[Loop Monitor] Event loop blocked for >{stalled:.2f}s, loop thread stack:\n{stack}")
+
+    def percentiles(self) -> Dict[str, float]:
+        with self._lock:
+            lags = sorted(self._lags)
+        if not lags:
+            return {}
+        pick = lambda q: lags[min(len(lags) - 1, int(q * len(lags)))]
+        return {"0.5": pick(0.5), "0.9": pick(0.9), "0.99": pick(0.99), "1": lags[-1]}
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get lag statistics."""
+        return {
+            'running': self._task is not None,
+            'interval_sec': self.interval,
+            'block_threshold_sec': self.block_threshold,
+            'samples': len(self._lags),
+            'lag_percentiles_sec': {q: round(v, 6) for q, v in self.percentiles().items()},
+            'max_lag_sec': round(self.max_lag, 6),
+            'blocked_episodes': self.blocked_episodes,
+            'longest_block_sec': round(self.longest_block, 6),
+        }
@@ -0,0 +1,69 @@
+"""
+Lazily Loaded Media Models
+
+faster-whisper and EasyOCR pull in large native libraries and load model
+weights from disk (or download them), which costs seconds. Importing them at
+module load made every cold start pay for the parse pipeline, even on
+instances that only serve product search and recommendations.
+
+A LazyModel runs its loader (which does the heavy imports) on first use,
+once per process and thread-safely. It also records whether and how fast the
+model loaded, so a warm-up routine or a readiness check can inspect it.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class LazyModel:
+    """Loads a model on first `get()` and keeps it for the life of the process."""
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        """
+        Initialize the lazy model.
+
+        Args:
+            name: Component name used in status reports (e.g. "whisper")
+            loader: Zero-argument function that imports and builds the model
+        """
+        self.name = name
+        self._loader = loader
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+        # Status
+        self.load_seconds: Optional[float] = None
+        self.loaded_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> Any:
+        """Return the model, loading it first if needed (raises if loading fails)."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    try:
+                        model = self._loader()
+                    except Exception as e:
+                        self.error = f"{type(e).__name__}: {e}"
+                        raise
+                    self.load_seconds = round(time.perf_counter() - start, 3)
+                    self.loaded_at = time.time()
+                    self.error = None
+                    self._model = model
+                    print(f"[Models] Loaded {self.name} in {self.load_seconds}s")
+        return self._model
+
+    def get_status(self) -> Dict[str, Any]:
+        """Load state for readiness/statistics endpoints."""
+        return {
+            'loaded': self.loaded,
+            'load_seconds': self.load_seconds,
+            'loaded_at': self.loaded_at,
+            'error': self.error,
+        }
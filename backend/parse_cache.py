@@ -0,0 +1,106 @@
+"""
+Parse Result Cache
+
+Stores finished ParseResponse payloads on disk, keyed by canonical video key
+(e.g. "youtube:dQw4w9WgXcQ"), so a video that was already parsed - by a user,
+a batch import or the playlist warmer - is answered without re-running
+yt-dlp, Whisper, OCR and the LLM.
+
+Each entry is one JSON file in `cache_dir`, so large recipes don't force a
+rewrite of the whole cache on every store.
+"""
+
+import json
+import os
+import hashlib
+import threading
+import time
+from typing import Dict, Optional, Any
+
+
+class ParseResultCache:
+    """
+    Disk-backed cache of parse results with a TTL.
+
+    Entry file: {"key": key, "created_at": epoch_seconds, "result": parse_response_dict}
+    """
+
+    def __init__(self, cache_dir: str = "parse_cache", ttl_seconds: float = 30 * 24 * 3600):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one JSON file per cached video
+            ttl_seconds: Lifetime of an entry before it is treated as a miss
+        """
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Keys contain ":" and arbitrary IDs, so hash them into safe file names
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + ".json")
+
+    def contains(self, key: str) -> bool:
+        """True if a fresh entry exists for `key` (does not count as a lookup)."""
+        return self._read(key) is not None
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except Exception as e:
+            print(f"[Parse Cache] Failed to read entry for {key}: {e}")
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            return None
+        return entry.get("result")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parse result dict for `key`, or None."""
+        result = self._read(key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a parse result dict under `key`."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "created_at": time.time(), "result": result}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self.writes += 1
+        except Exception as e:
+            print(f"[Parse Cache] Failed to store entry for {key}: {e}")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        try:
+            entries = sum(1 for name in os.listdir(self.cache_dir) if name.endswith(".json"))
+        except OSError:
+            entries = 0
+        return {
+            'entries': entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0
+        }
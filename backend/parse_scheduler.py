@@ -0,0 +1,157 @@
+"""
+Background Job Scheduler for Recipe Parsing
+
+Runs parse jobs on a fixed pool of worker threads fed from a priority queue,
+and keeps a registry of job status/results so clients can submit many URLs at
+once and poll for them later.
+
+Lower priority values run first; jobs with the same priority run in submission order.
+"""
+
+import itertools
+import queue
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class ParseScheduler:
+    """
+    Priority job scheduler backed by worker threads.
+
+    Job records: {job_id, status, priority, created_at, started_at, finished_at, result, error, **metadata}
+    Status is one of "queued", "running", "done", "failed".
+    """
+
+    def __init__(self, max_workers: int = 4, job_ttl_seconds: float = 3600, max_jobs: int = 1000):
+        """
+        Initialize the scheduler (worker threads start on first submit).
+
+        Args:
+            max_workers: Number of jobs that run concurrently
+            job_ttl_seconds: How long finished jobs are kept for polling
+            max_jobs: Maximum number of job records kept (oldest finished jobs are dropped first)
+        """
+        self.max_workers = max_workers
+        self.job_ttl_seconds = job_ttl_seconds
+        self.max_jobs = max_jobs
+
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._workers: List[threading.Thread] = []
+
+    def _ensure_workers(self):
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"parse-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: int = 0,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any
+    ) -> str:
+        """
+        Queue `fn(*args, **kwargs)` and return its job ID.
+
+        Args:
+            fn: Callable to run on a worker thread
+            priority: Lower runs first (interactive work should use lower values than background work)
+            metadata: Extra fields stored on the job record (e.g. the URL)
+        """
+        self._ensure_workers()
+        self._prune()
+
+        job_id = str(uuid.uuid4())
+        job = {
+            **(metadata or {}),
+            'job_id': job_id,
+            'status': 'queued',
+            'priority': priority,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            self._futures[job_id] = Future()
+        self._queue.put((priority, next(self._seq), job_id, fn, args, kwargs))
+        return job_id
+
+    def _worker_loop(self):
+        while True:
+            _, _, job_id, fn, args, kwargs = self._queue.get()
+            with self._lock:
+                job = self._jobs.get(job_id)
+                future = self._futures.get(job_id)
+            if job is None:
+                continue
+
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+            try:
+                result = fn(*args, **kwargs)
+                job['result'] = result
+                job['status'] = 'done'
+                if future is not None:
+                    future.set_result(result)
+            except Exception as e:
+                print(f"[Scheduler] Job {job_id} failed: {e}")
+                traceback.print_exc()
+                job['error'] = str(e)
+                job['status'] = 'failed'
+                if future is not None:
+                    future.set_exception(e)
+            finally:
+                job['finished_at'] = time.time()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record (None if unknown or already pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_future(self, job_id: str) -> Optional[Future]:
+        """Get a Future that resolves with the job's result (for callers that want to wait)."""
+        with self._lock:
+            return self._futures.get(job_id)
+
+    def _prune(self):
+        """Drop expired finished jobs, then the oldest finished jobs if over `max_jobs`."""
+        now = time.time()
+        with self._lock:
+            finished = sorted(
+                (job for job in self._jobs.values() if job['finished_at'] is not None),
+                key=lambda job: job['finished_at']
+            )
+            overflow = len(self._jobs) - self.max_jobs
+            for job in finished:
+                if now - job['finished_at'] > self.job_ttl_seconds or overflow > 0:
+                    self._jobs.pop(job['job_id'], None)
+                    self._futures.pop(job['job_id'], None)
+                    overflow -= 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {
+            'max_workers': self.max_workers,
+            'queued': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+        }
@@ -0,0 +1,228 @@
+"""
+Playlist / Channel Ingestion
+
+Pre-warms the parse result cache from a YouTube playlist or channel URL:
+entries are enumerated with yt-dlp flat extraction and parsed one at a time
+as low-priority jobs on the shared parse scheduler, so interactive parses
+always run first.
+
+Runs are incremental (entries already in the parse cache are skipped) and
+resumable: a cursor per playlist records the IDs of the videos that are in
+the parse cache and is persisted after every entry, so a run interrupted by a
+restart continues where it stopped. The cursor is keyed by video ID, not by
+position, because channels list their newest uploads first: uploads published
+between two runs shift every position, and must not be skipped. Entries whose
+parse failed or was degraded (and therefore not cached) are kept in
+`retry_ids` and parsed again by the next run.
+"""
+
+import json
+import os
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class PlaylistIngestor:
+    """
+    Background ingestion of playlist/channel entries into the parse cache.
+
+    Cursor record: {ingest_id, url, status, processed_ids, retry_ids, entry_count, parsed, skipped_cached,
+                    failed, uncached, started_at, updated_at, error}
+    `uncached` counts parses that finished without a cache entry (degraded results are not stored).
+    Status is one of "running", "done", "failed".
+    """
+
+    def __init__(
+        self,
+        scheduler: Any,
+        parse_fn: Callable[[str, str], Any],
+        is_cached_fn: Callable[[str], bool],
+        enumerate_fn: Callable[[str], List[Dict[str, Any]]],
+        cursor_file: str = "ingest_cursors.json",
+        priority: int = 10
+    ):
+        """
+        Initialize the ingestor.
+
+        Args:
+            scheduler: ParseScheduler that runs the parse jobs
+            parse_fn: parse_fn(url, prefer_lang) parses a video and stores it in the parse cache
+            is_cached_fn: is_cached_fn(url) tells whether a video is already cached
+            enumerate_fn: enumerate_fn(playlist_url) returns [{url, id, title}, ...]
+            cursor_file: JSON file for persisted cursors
+            priority: Scheduler priority for ingestion jobs (higher = runs after interactive work)
+        """
+        self.scheduler = scheduler
+        self.parse_fn = parse_fn
+        self.is_cached_fn = is_cached_fn
+        self.enumerate_fn = enumerate_fn
+        self.cursor_file = cursor_file
+        self.priority = priority
+
+        self._lock = threading.Lock()
+        self._running: Dict[str, threading.Thread] = {}
+        self._cursors: Dict[str, Dict[str, Any]] = self._load_cursors()
+
+    @staticmethod
+    def make_ingest_id(playlist_url: str) -> str:
+        return hashlib.sha256(playlist_url.strip().encode('utf-8')).hexdigest()[:16]
+
+    def _load_cursors(self) -> Dict[str, Dict[str, Any]]:
+        """Load cursors from file."""
+        if os.path.exists(self.cursor_file):
+            try:
+                with open(self.cursor_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"[Ingest] Failed to load cursors: {e}")
+        return {}
+
+    def _save_cursors(self):
+        """Save cursors to file."""
+        with self._lock:
+            snapshot = json.loads(json.dumps(self._cursors))
+        try:
+            # Several ingest threads save concurrently: each writes its own temp file, then swaps it in
+            tmp_path = f"{self.cursor_file}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.cursor_file)
+        except Exception as e:
+            print(f"[Ingest] Failed to save cursors: {e}")
+
+    def get_cursor(self, ingest_id: str) -> Optional[Dict[str, Any]]:
+        """Get the cursor for an ingestion run."""
+        with self._lock:
+            cursor = self._cursors.get(ingest_id)
+            return dict(cursor) if cursor else None
+
+    def start(
+        self,
+        playlist_url: str,
+        prefer_lang: str = "ko",
+        max_entries: Optional[int] = None,
+        restart: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Start (or resume) ingesting a playlist in the background.
+        If a run for the same playlist is already in progress, its cursor is returned unchanged.
+
+        Args:
+            playlist_url: YouTube playlist or channel URL
+            prefer_lang: Language passed to each parse
+            max_entries: Only consider the first N entries of the playlist
+            restart: Ignore a saved cursor and start from the first entry
+        """
+        ingest_id = self.make_ingest_id(playlist_url)
+        with self._lock:
+            running = self._running.get(ingest_id)
+            if running and running.is_alive():
+                return dict(self._cursors[ingest_id])
+
+            cursor = self._cursors.get(ingest_id)
+            resume = cursor is not None and cursor.get('status') != 'done' and not restart
+            now = time.time()
+            self._cursors[ingest_id] = {
+                'ingest_id': ingest_id,
+                'url': playlist_url,
+                'status': 'running',
+                'processed_ids': list(cursor.get('processed_ids', [])) if resume else [],
+                'retry_ids': list(cursor.get('retry_ids', [])) if resume else [],
+                'entry_count': cursor.get('entry_count', 0) if resume else 0,
+                'parsed': cursor.get('parsed', 0) if resume else 0,
+                'skipped_cached': cursor.get('skipped_cached', 0) if resume else 0,
+                'failed': cursor.get('failed', 0) if resume else 0,
+                'uncached': cursor.get('uncached', 0) if resume else 0,
+                'started_at': cursor.get('started_at', now) if resume else now,
+                'updated_at': now,
+                'error': None,
+            }
+
+            thread = threading.Thread(
+                target=self._run,
+                args=(ingest_id, playlist_url, prefer_lang, max_entries),
+                name=f"ingest-{ingest_id}",
+                daemon=True
+            )
+            self._running[ingest_id] = thread
+        self._save_cursors()
+        thread.start()
+        return self.get_cursor(ingest_id)
+
+    def _update(self, ingest_id: str, **fields: Any):
+        with self._lock:
+            self._cursors[ingest_id].update(fields, updated_at=time.time())
+        self._save_cursors()
+
+    def _finish_entry(self, ingest_id: str, entry_id: str, counter: str, cached: bool):
+        """
+        Count an entry under `counter` (parsed / skipped_cached / failed / uncached).
+        Only cached entries are marked processed; the others go to retry_ids for the next run.
+        """
+        with self._lock:
+            cursor = self._cursors[ingest_id]
+            retry_ids = [i for i in cursor.get('retry_ids', []) if i != entry_id]
+            if cached:
+                cursor['processed_ids'] = cursor['processed_ids'] + [entry_id]
+            else:
+                retry_ids.append(entry_id)
+            cursor['retry_ids'] = retry_ids
+            cursor[counter] = cursor.get(counter, 0) + 1
+            cursor['updated_at'] = time.time()
+        self._save_cursors()
+
+    def _run(self, ingest_id: str, playlist_url: str, prefer_lang: str, max_entries: Optional[int]):
+        try:
+            entries = self.enumerate_fn(playlist_url)
+            if max_entries:
+                entries = entries[:max_entries]
+            self._update(ingest_id, entry_count=len(entries))
+            print(f"[Ingest] {playlist_url}: {len(entries)} entries")
+
+            processed = set(self.get_cursor(ingest_id)['processed_ids'])
+            for entry in entries:
+                entry_url = entry['url']
+                entry_id = entry.get('id') or entry_url
+                if entry_id in processed:
+                    continue
+
+                if self.is_cached_fn(entry_url):
+                    self._finish_entry(ingest_id, entry_id, 'skipped_cached', cached=True)
+                    continue
+
+                # One entry in flight per playlist, queued behind interactive work
+                job_id = self.scheduler.submit(
+                    self.parse_fn, entry_url, prefer_lang,
+                    priority=self.priority,
+                    metadata={'url': entry_url, 'ingest_id': ingest_id}
+                )
+                try:
+                    self.scheduler.get_future(job_id).result()
+                except Exception as e:
+                    print(f"[Ingest] Failed to parse {entry_url}: {e}")
+                    self._finish_entry(ingest_id, entry_id, 'failed', cached=False)
+                    continue
+                # A degraded parse finishes normally but is not stored in the parse cache
+                if self.is_cached_fn(entry_url):
+                    self._finish_entry(ingest_id, entry_id, 'parsed', cached=True)
+                else:
+                    self._finish_entry(ingest_id, entry_id, 'uncached', cached=False)
+
+            self._update(ingest_id, status='done')
+            print(f"[Ingest] ✓ Finished {playlist_url}")
+        except Exception as e:
+            print(f"[Ingest] Ingestion of {playlist_url} failed: {e}")
+            self._update(ingest_id, status='failed', error=str(e))
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get ingestion statistics."""
+        with self._lock:
+            statuses = [cursor.get('status') for cursor in self._cursors.values()]
+        return {
+            'playlists': len(statuses),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+        }
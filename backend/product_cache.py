@@ -0,0 +1,236 @@
+"""
+Product Search Cache
+
+Caches product search results (Coupang Partners / Naver Shopping) keyed by
+(normalized query, limit, provider, coupang_only), so the same popular
+ingredient searches ("양파", "마늘", ...) don't hit the shopping APIs on every
+cart lookup.
+
+Entries are fresh for `ttl_seconds` (short enough to follow price changes).
+After that they are stale: for another `stale_seconds` a stale entry is still
+returned immediately, and a background refresh fetches new results
+(stale-while-revalidate). Entries older than that are misses and are fetched
+inline.
+
+The cache is an LRU bounded by entry count. It can optionally be persisted to
+a JSON file so it survives restarts.
+"""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from log_config import get_logger
+
+products_log = get_logger("products")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class ProductSearchCache:
+    """
+    Size-bounded product search cache with TTL and stale-while-revalidate.
+
+    Entries: {key: {"products": [product_dict, ...], "created_at": epoch_seconds}}
+    """
+
+    def __init__(
+        self,
+        cache_file: Optional[str] = "product_search_cache.json",
+        max_entries: int = 5000,
+        ttl_seconds: float = 6 * 3600,
+        stale_seconds: float = 24 * 3600,
+        flush_interval: float = 10.0,
+        refresh_workers: int = 2,
+        normalize_query: Callable[[str], str] = normalize_query
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_file: JSON file used for persistence (None disables persistence)
+            max_entries: Maximum number of searches kept (least recently used are evicted)
+            ttl_seconds: Age until which an entry is served as fresh
+            stale_seconds: Extra time a stale entry is still served while it is refreshed
+            flush_interval: Minimum seconds between writes to the cache file
+            refresh_workers: Threads running background refreshes
+            normalize_query: Query normalizer used in cache keys (e.g. the ingredient normalizer,
+                so "다진 마늘" and "깐마늘" share an entry)
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.flush_interval = flush_interval
+        self.normalize_query = normalize_query
+
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="product-cache-refresh")
+        self._dirty = False
+        self._last_flush = 0.0
+
+        # Metrics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.evictions = 0
+
+        self._load()
+        if self.cache_file:
+            atexit.register(self.flush)
+
+    def make_key(self, query: str, limit: int, provider: str, coupang_only: bool = False) -> str:
+        """Cache key for one search."""
+        return json.dumps([self.normalize_query(query), int(limit), provider, bool(coupang_only)], ensure_ascii=False)
+
+    def _lookup(self, key: str) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+        """Return (products, is_stale), or (None, False) on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            age = time.time() - entry["created_at"]
+            if age > self.ttl_seconds + self.stale_seconds:
+                del self._entries[key]
+                self._dirty = True
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            if age > self.ttl_seconds:
+                self.stale_hits += 1
+                return entry["products"], True
+            self.hits += 1
+            return entry["products"], False
+
+    def put(self, key: str, products: List[Dict[str, Any]]):
+        """Store a search result and evict the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._entries[key] = {"products": products, "created_at": time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+
+        if time.time() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], List[Dict[str, Any]]],
+                     refresh: Optional[Callable[[], List[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """
+        Return cached products for `key`, calling `fetch()` on a miss.
+        A stale entry is returned as-is and refreshed in the background with `refresh()`
+        (defaults to `fetch`). Empty results are not cached (they usually mean a provider hiccup).
+        """
+        products, stale = self._lookup(key)
+        if products is not None:
+            if stale:
+                self._schedule_refresh(key, refresh or fetch)
+            return list(products)
+
+        products = fetch()
+        if products:
+            self.put(key, products)
+        return products
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], List[Dict[str, Any]]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._refresher.submit(self._refresh, key, fetch)
+
+    def _refresh(self, key: str, fetch: Callable[[], List[Dict[str, Any]]]):
+        try:
+            products = fetch()
+            if products:
+                self.put(key, products)
+            with self._lock:
+                self.refreshes += 1
+        except Exception as e:
+            # Keep serving the stale entry; the next stale hit retries
+            with self._lock:
+                self.refresh_failures += 1
+            products_log.warning("Product cache background refresh failed for %s: %s", key, e)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self):
+        """Remove all entries (metrics are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+        self.flush()
+
+    def _load(self):
+        """Load entries from file, dropping anything past the stale window."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            now = time.time()
+            max_age = self.ttl_seconds + self.stale_seconds
+            entries = sorted(
+                (item for item in data.get('entries', {}).items()
+                 if now - item[1].get("created_at", 0) <= max_age),
+                key=lambda item: item[1].get("created_at", 0)
+            )
+            self._entries = OrderedDict(entries[-self.max_entries:])
+            products_log.info("Product cache loaded %d cached searches", len(self._entries))
+        except Exception as e:
+            products_log.warning("Product cache failed to load %s: %s", self.cache_file, e)
+            self._entries = OrderedDict()
+
+    def flush(self):
+        """Write the cache to disk if it changed since the last flush."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._entries)
+            self._dirty = False
+            self._last_flush = time.time()
+        try:
+            tmp_path = f"{self.cache_file}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'entries': snapshot}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+        except Exception as e:
+            products_log.warning("Product cache failed to save %s: %s", self.cache_file, e)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'stale_seconds': self.stale_seconds,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'refreshing': len(self._refreshing),
+            'evictions': self.evictions,
+            'hit_rate': ((self.hits + self.stale_hits) / lookups) if lookups else 0.0
+        }
@@ -0,0 +1,333 @@
+"""
+Local Product Catalog
+
+Persists every normalized product returned by the shopping providers (Naver
+Shopping, Coupang Partners) in SQLite, together with its parsed package size,
+unit price and when it was last seen, and remembers which products each
+search query returned.
+
+`lookup()` answers a product search locally when the catalog has fresh enough
+data for it:
+
+1. The same (normalized) query was fetched recently with at least `limit`
+   results, or with all the results the provider had (it returned fewer
+   than it was asked for): those products are returned in their original
+   order. A shorter fetch (a smaller limit) only replaces the head of a
+   query's stored list; the tail stays, with its own fetch time.
+2. Only with `fulltext_fallback=True`: an FTS5 full-text match over product
+   names is used if it finds `limit` recently seen products. The index uses
+   the trigram tokenizer when SQLite supports it, which handles Korean
+   compounds ("햇양파"). Queries shorter than three characters fall back to a
+   substring scan. This is off by default because a name match is not a
+   search result: "양파" also matches 양파링 snacks and "간장" matches
+   간장게장, which the provider would have ranked far below the real thing.
+
+Both paths are indexed reads, well under a millisecond for typical catalog
+sizes, and use no provider quota.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from log_config import get_logger
+
+products_log = get_logger("products")
+
+_WHITESPACE = re.compile(r"\s+")
+_FTS_QUOTE = re.compile(r'"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    provider TEXT NOT NULL,
+    product_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    price INTEGER NOT NULL,
+    image TEXT,
+    url TEXT,
+    rating REAL,
+    review_count INTEGER,
+    package_size REAL,
+    package_unit TEXT,
+    unit_price REAL,
+    last_seen REAL NOT NULL,
+    UNIQUE (provider, product_id)
+);
+CREATE INDEX IF NOT EXISTS products_last_seen ON products (last_seen);
+CREATE TABLE IF NOT EXISTS query_results (
+    query TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    product_rowid INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, position)
+);
+CREATE TABLE IF NOT EXISTS query_fetches (
+    query TEXT PRIMARY KEY,
+    returned INTEGER NOT NULL,
+    exhausted INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+def _default_normalize(query: str) -> str:
+    return _WHITESPACE.sub(" ", query).strip().lower()
+
+
+class ProductCatalog:
+    """SQLite product catalog with an FTS5 name index."""
+
+    def __init__(
+        self,
+        db_path: str = "product_catalog.db",
+        parse_size: Optional[Callable[[str], Tuple[Optional[float], Optional[str]]]] = None,
+        normalize_query: Callable[[str], str] = _default_normalize,
+        retention_seconds: float = 30 * 24 * 3600
+    ):
+        """
+        Initialize the catalog (creates the database and schema if needed).
+
+        Args:
+            db_path: SQLite database file (":memory:" for a throwaway catalog)
+            parse_size: Title -> (package_size, package_unit) for products that come without them
+            normalize_query: Query normalizer shared with the product search cache
+            retention_seconds: Products not seen for this long are pruned
+        """
+        self.db_path = db_path
+        self.parse_size = parse_size
+        self.normalize_query = normalize_query
+        self.retention_seconds = retention_seconds
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.tokenizer = self._create_fts()
+        self._conn.commit()
+        self._records_since_prune = 0
+
+        # Metrics
+        self.query_hits = 0
+        self.fts_hits = 0
+        self.misses = 0
+        self.products_recorded = 0
+
+    def _create_fts(self) -> str:
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                self._conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5("
+                    f"name, content='products', content_rowid='id', tokenize='{tokenizer}')"
+                )
+            except sqlite3.OperationalError:
+                continue
+            # Keep the external-content index in sync with the products table
+            self._conn.executescript("""
+                CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+                    INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+                    INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS products_au AFTER UPDATE OF name ON products BEGIN
+                    INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+                    INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name);
+                END;
+            """)
+            return tokenizer
+        raise RuntimeError("SQLite build has no FTS5 support")
+
+    def record(self, query: str, products: List[Dict[str, Any]], provider: str, requested: Optional[int] = None):
+        """
+        Upsert fetched products and remember them as the results of `query`.
+
+        Args:
+            query: Search query the products were fetched for
+            products: Provider results, best first
+            provider: Provider name
+            requested: Limit the fetch asked for; fewer results mean the provider has no more
+        """
+        if not products:
+            return
+        now = time.time()
+        key = self.normalize_query(query)
+        rows = [self._to_row(product, provider, now) for product in products]
+        with self._lock:
+            try:
+                rowids = []
+                for row in rows:
+                    self._conn.execute("""
+                        INSERT INTO products (provider, product_id, name, price, image, url, rating, review_count,
+                                              package_size, package_unit, unit_price, last_seen)
+                        VALUES (:provider, :product_id, :name, :price, :image, :url, :rating, :review_count,
+                                :package_size, :package_unit, :unit_price, :last_seen)
+                        ON CONFLICT (provider, product_id) DO UPDATE SET
+                            name = excluded.name, price = excluded.price, image = excluded.image, url = excluded.url,
+                            rating = excluded.rating, review_count = excluded.review_count,
+                            package_size = excluded.package_size, package_unit = excluded.package_unit,
+                            unit_price = excluded.unit_price, last_seen = excluded.last_seen
+                    """, row)
+                    rowids.append(self._conn.execute(
+                        "SELECT id FROM products WHERE provider = ? AND product_id = ?",
+                        (row['provider'], row['product_id'])
+                    ).fetchone()[0])
+                exhausted = requested is not None and len(rows) < requested
+                if exhausted:
+                    self._conn.execute("DELETE FROM query_results WHERE query = ?", (key,))
+                else:
+                    # Only the head is known to be current: keep the tail of a longer stored list
+                    self._conn.execute(
+                        f"DELETE FROM query_results WHERE query = ? AND (position < ? OR product_rowid IN "
+                        f"({','.join('?' * len(rowids))}))",
+                        (key, len(rowids), *rowids)
+                    )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO query_results (query, position, product_rowid, fetched_at) VALUES (?, ?, ?, ?)",
+                    [(key, position, rowid, now) for position, rowid in enumerate(rowids)]
+                )
+                previous = self._conn.execute(
+                    "SELECT returned, exhausted FROM query_fetches WHERE query = ?", (key,)
+                ).fetchone()
+                # A truncated fetch no longer than an exhausted one says nothing new about the total
+                if exhausted or previous is None or not previous["exhausted"] or len(rows) > previous["returned"]:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO query_fetches (query, returned, exhausted, fetched_at) VALUES (?, ?, ?, ?)",
+                        (key, len(rows), int(exhausted), now)
+                    )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                products_log.warning("Catalog failed to record products for '%s': %s", query, e)
+                return
+            self.products_recorded += len(rows)
+            self._records_since_prune += 1
+            if self._records_since_prune >= 500:
+                self._records_since_prune = 0
+                self._prune(now)
+
+    def _to_row(self, product: Dict[str, Any], provider: str, now: float) -> Dict[str, Any]:
+        name = str(product.get("productName") or "")
+        price = int(product.get("productPrice") or 0)
+        size, unit = product.get("packageSize"), product.get("packageUnit")
+        if size is None and self.parse_size is not None:
+            size, unit = self.parse_size(name)
+        unit_price = product.get("unitPrice")
+        if unit_price is None and size:
+            unit_price = price / size
+        return {
+            'provider': provider,
+            'product_id': str(product.get("productId") or name),
+            'name': name,
+            'price': price,
+            'image': product.get("productImage") or "",
+            'url': product.get("productUrl") or "",
+            'rating': product.get("rating"),
+            'review_count': product.get("reviewCount"),
+            'package_size': size,
+            'package_unit': unit,
+            'unit_price': unit_price,
+            'last_seen': now,
+        }
+
+    @staticmethod
+    def _to_product(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "productId": row["product_id"],
+            "productName": row["name"],
+            "productPrice": row["price"],
+            "productImage": row["image"],
+            "productUrl": row["url"],
+            "rating": row["rating"],
+            "reviewCount": row["review_count"],
+            "packageSize": row["package_size"],
+            "packageUnit": row["package_unit"],
+            "unitPrice": row["unit_price"],
+            "lastSeen": row["last_seen"],
+            "provider": row["provider"],
+        }
+
+    def lookup(self, query: str, limit: int, max_age_seconds: float,
+               fulltext_fallback: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """Return up to `limit` fresh products for `query`, or None if the catalog can't answer it."""
+        key = self.normalize_query(query)
+        min_seen = time.time() - max_age_seconds
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT p.* FROM query_results q JOIN products p ON p.id = q.product_rowid
+                WHERE q.query = ? AND q.fetched_at >= ?
+                ORDER BY q.position LIMIT ?
+            """, (key, min_seen, limit)).fetchall()
+            if len(rows) >= limit:
+                self.query_hits += 1
+                return [self._to_product(row) for row in rows]
+            # Fewer rows than asked for are a complete answer when the provider had no more
+            fetch = self._conn.execute(
+                "SELECT returned, exhausted FROM query_fetches WHERE query = ? AND fetched_at >= ?", (key, min_seen)
+            ).fetchone()
+            if rows and fetch is not None and fetch["exhausted"] and len(rows) >= fetch["returned"]:
+                self.query_hits += 1
+                return [self._to_product(row) for row in rows]
+
+            # Single-character queries ("파", "무") match too much unrelated text to answer by name
+            rows = self._match(key, min_seen, limit) if fulltext_fallback and len(key) >= 2 else []
+            if len(rows) >= limit:
+                self.fts_hits += 1
+                return [self._to_product(row) for row in rows]
+            self.misses += 1
+            return None
+
+    def search(self, text: str, limit: int = 20, max_age_seconds: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Full-text search over product names (best matches first)."""
+        min_seen = time.time() - max_age_seconds if max_age_seconds is not None else 0.0
+        with self._lock:
+            rows = self._match(self.normalize_query(text), min_seen, limit)
+        return [self._to_product(row) for row in rows]
+
+    def _match(self, text: str, min_seen: float, limit: int) -> List[sqlite3.Row]:
+        if not text:
+            return []
+        if self.tokenizer == "trigram" and len(text) < 3:
+            # Trigram index can't match 1-2 character terms
+            return self._conn.execute(
+                "SELECT * FROM products WHERE name LIKE ? AND last_seen >= ? ORDER BY unit_price IS NULL, last_seen DESC LIMIT ?",
+                (f"%{text}%", min_seen, limit)
+            ).fetchall()
+        phrase = '"' + _FTS_QUOTE.sub('""', text) + '"'
+        try:
+            return self._conn.execute("""
+                SELECT p.* FROM products_fts f JOIN products p ON p.id = f.rowid
+                WHERE products_fts MATCH ? AND p.last_seen >= ?
+                ORDER BY f.rank LIMIT ?
+            """, (phrase, min_seen, limit)).fetchall()
+        except sqlite3.OperationalError:
+            return []
+
+    def _prune(self, now: float):
+        cutoff = now - self.retention_seconds
+        self._conn.execute("DELETE FROM query_results WHERE fetched_at < ?", (cutoff,))
+        self._conn.execute("DELETE FROM query_fetches WHERE fetched_at < ?", (cutoff,))
+        self._conn.execute("DELETE FROM products WHERE last_seen < ?", (cutoff,))
+        self._conn.commit()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get catalog statistics."""
+        with self._lock:
+            products = self._conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            queries = self._conn.execute("SELECT COUNT(DISTINCT query) FROM query_results").fetchone()[0]
+        lookups = self.query_hits + self.fts_hits + self.misses
+        return {
+            'db_path': self.db_path,
+            'tokenizer': self.tokenizer,
+            'products': products,
+            'queries': queries,
+            'products_recorded': self.products_recorded,
+            'query_hits': self.query_hits,
+            'fts_hits': self.fts_hits,
+            'misses': self.misses,
+            'hit_rate': ((self.query_hits + self.fts_hits) / lookups) if lookups else 0.0
+        }
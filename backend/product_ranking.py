@@ -0,0 +1,171 @@
+"""
+Columnar Product Ranking
+
+Scores a page of product search results with NumPy instead of one Python call
+per product. The page is loaded once into arrays (price, rating, unit price,
+and package size relative to the needed amount in the same base unit). Then
+each score and each pick is one vectorized pass:
+
+- amount match score: 100 within 5% of the needed amount, lower in bands as
+  the package/need ratio moves away from 1
+- total match score: amount fit (up to 40) + rating (up to 30) + 15 base
+  points for the price
+- best amount match / best match: stable descending order of the score
+- cheapest same amount: cheapest unit price among packages within 5% of the
+  needed amount
+- cheapest overall / budget option: cheapest unit price
+
+Ties are broken the way the list-sorting code did: by score rank, then by
+original position. The endpoints only build response models for the products
+they return.
+
+Unit conversion is injected (`to_base_unit`, i.e. backend.convert_to_base_unit)
+and applied once per distinct unit on the page, not once per product.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+SizeResult = Tuple[Optional[float], Optional[str]]
+
+
+class ProductPage:
+    """One page of raw search results as NumPy columns, scored against the needed amount."""
+
+    def __init__(
+        self,
+        raw_products: List[Dict[str, Any]],
+        sizes: List[SizeResult],
+        needed_qty: Optional[float],
+        needed_unit: Optional[str],
+        to_base_unit: Callable[[float, str], Tuple[float, str]]
+    ):
+        """
+        Load a page.
+
+        Args:
+            raw_products: Provider product dicts (productPrice/price, rating, ...)
+            sizes: (package_size, package_unit) per product, as parsed from the titles
+            needed_qty: Amount the recipe needs (None/0 = unknown)
+            needed_unit: Unit of needed_qty
+            to_base_unit: (qty, unit) -> (qty in base unit, base unit)
+        """
+        self.raw_products = raw_products
+        self.sizes = sizes
+        n = len(raw_products)
+
+        self.price = np.array([int(p.get("productPrice", p.get("price", 0))) for p in raw_products], dtype=np.float64)
+        # None -> NaN; other falsy ratings (0) stay 0 (no rating bonus, but not "unrated" either)
+        self.rating = np.array([np.nan if p.get("rating") is None else (float(p["rating"]) if p["rating"] else 0.0)
+                                for p in raw_products], dtype=np.float64)
+        self.unrated = np.isnan(self.rating)
+        self.size = np.array([size or 0.0 for size, _ in sizes], dtype=np.float64)
+        has_size = self.size > 0
+        # Matches `unit_price = price / size if size > 0` (None -> NaN)
+        self.unit_price = np.divide(self.price, self.size, out=np.full(n, np.nan), where=has_size)
+        self.has_unit_price = has_size
+
+        self.has_need = bool(needed_qty and needed_unit)
+        # Product and need both have amount information (the `needed_qty and ... and product_unit` guard)
+        self.has_info = has_size & np.array([bool(unit) for _, unit in sizes], dtype=bool) & self.has_need
+        self.same_unit = np.zeros(n, dtype=bool)
+        # Package size / needed amount in the same base unit (0 where not comparable)
+        self.ratio = np.zeros(n)
+        if self.has_need:
+            needed_base_qty, needed_base_unit = to_base_unit(needed_qty, needed_unit)
+            # Convert each distinct unit once
+            factor_by_unit: Dict[Optional[str], float] = {}
+            for _, unit in sizes:
+                if unit and unit not in factor_by_unit:
+                    factor, base_unit = to_base_unit(1.0, unit)
+                    factor_by_unit[unit] = factor if base_unit == needed_base_unit else 0.0
+            factors = np.array([factor_by_unit.get(unit, 0.0) for _, unit in sizes], dtype=np.float64)
+            self.same_unit = self.has_info & (factors > 0)
+            self.ratio = np.where(self.same_unit, self.size * factors / needed_base_qty, 0.0)
+        self._match_scores: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.raw_products)
+
+    def amount_match_scores(self) -> np.ndarray:
+        """Amount match score for every product (0-100, 0 without comparable amounts)."""
+        r = self.ratio
+        deviation = np.abs(r - 1.0)
+        # Bands from the widest to the narrowest, each overriding the previous one
+        scores = np.maximum(0.0, 20.0 - deviation * 5)
+        scores = np.where((0.25 <= r) & (r <= 2.0), 50.0 - deviation * 30, scores)
+        scores = np.where(deviation <= 0.5, 70.0 - deviation * 100, scores)
+        scores = np.where((0.8 <= r) & (r <= 1.2), 90.0 - deviation * 200, scores)
+        scores = np.where((0.95 <= r) & (r <= 1.05), 100.0, scores)
+        return np.where(self.same_unit, scores, 0.0)
+
+    def match_scores(self) -> np.ndarray:
+        """Total match score for every product (0-100): amount fit + rating + base price points."""
+        if self._match_scores is not None:
+            return self._match_scores
+        r = self.ratio
+        unit_scores = np.where((0.1 <= r) & (r < 0.5), 20 * (r / 0.5), 10.0)
+        unit_scores = np.where((1.5 < r) & (r <= 3.0), 30 * (1 - (r - 1.5) / 1.5), unit_scores)
+        unit_scores = np.where((0.5 <= r) & (r <= 1.5), 40 * (1 - np.abs(r - 1.0)), unit_scores)
+        # Different base units score 0 for the amount part; missing amount information is neutral (20)
+        unit_scores = np.where(self.has_info, np.where(self.same_unit, unit_scores, 0.0), 20.0)
+        rating_scores = np.where(self.unrated | (self.rating == 0), 15.0, self.rating / 5.0 * 30)
+        self._match_scores = np.minimum(unit_scores + rating_scores + 15.0, 100.0)
+        return self._match_scores
+
+    @staticmethod
+    def order_by(scores: np.ndarray) -> np.ndarray:
+        """Indices by descending score, original order among ties (like a stable reverse sort)."""
+        return np.argsort(-scores, kind="stable")
+
+    def _cheapest(self, candidates: np.ndarray, order: np.ndarray) -> np.ndarray:
+        """Candidate indices by unit price (0 counts as unknown), ties by position in `order`."""
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        price = np.where(self.has_unit_price & (self.price > 0), self.unit_price, np.inf)
+        indices = np.flatnonzero(candidates)
+        return indices[np.lexsort((rank[indices], price[indices]))]
+
+    def rank_advanced(self) -> Dict[str, Any]:
+        """
+        Scores and picks for /search_products_advanced:
+        order (by amount match), best_amount_match, cheapest_same_amount, cheapest_overall (indices or None).
+        """
+        amount_scores = self.amount_match_scores()
+        order = self.order_by(amount_scores)
+        same_amount = self.same_unit & (0.95 <= self.ratio) & (self.ratio <= 1.05)
+        cheapest_same = self._cheapest(same_amount, order)
+        cheapest = self._cheapest(self.has_unit_price, order)
+        return {
+            'amount_match_scores': amount_scores,
+            'match_scores': self.match_scores(),
+            'order': order,
+            'best_amount_match': int(order[0]) if len(order) else None,
+            'cheapest_same_amount': int(cheapest_same[0]) if len(cheapest_same) else None,
+            'cheapest_overall': int(cheapest[0]) if len(cheapest) else None,
+        }
+
+    def rank_recommendation(self, min_score: float = 50.0, min_match_rating: float = 3.5,
+                            min_budget_rating: float = 3.0) -> Dict[str, Any]:
+        """
+        Scores and picks for /recommend_products:
+        order (by match score), best_match (good score and rating, else the top product),
+        budget_option (cheapest unit price with a decent rating, else the cheapest).
+        """
+        scores = self.match_scores()
+        order = self.order_by(scores)
+        rating = np.where(self.unrated, np.inf, self.rating)  # unrated products pass the rating checks
+        good = (scores > min_score) & (rating >= min_match_rating)
+        good_in_order = np.flatnonzero(good[order])
+        best_match = int(order[good_in_order[0]]) if len(good_in_order) else (int(order[0]) if len(order) else None)
+
+        cheapest = self._cheapest(self.has_unit_price, order)
+        decent = np.flatnonzero(rating[cheapest] >= min_budget_rating)
+        budget_option = int(cheapest[decent[0]]) if len(decent) else (int(cheapest[0]) if len(cheapest) else None)
+        return {
+            'match_scores': scores,
+            'order': order,
+            'best_match': best_match,
+            'budget_option': budget_option,
+        }
@@ -0,0 +1,181 @@
+"""
+On-demand Sampling Profiler
+
+Statistical profiler for single requests: while a profile session is active, a
+background thread samples the Python stacks of the threads doing that
+request's work every few milliseconds and aggregates them as collapsed
+("folded") stacks - one `frame;frame;frame count` line per distinct stack -
+which flamegraph.pl, inferno and speedscope render directly.
+
+A session is bound to the request through a contextvar; code that does the
+request's work wraps itself in `attach()` (or the `attached` decorator) so the
+sampler knows which threads to look at. Outside an active session `attach()`
+is a no-op, so instrumented functions cost nothing when profiling is off.
+"""
+
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+_active_session: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar(
+    "yorigo_profile_session", default=None
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+class ProfileSession:
+    """Samples the attached threads until stopped."""
+
+    def __init__(self, name: str, interval: float, max_depth: int = 128):
+        self.profile_id = uuid.uuid4().hex
+        self.name = name
+        self.interval = interval
+        self.max_depth = max_depth
+        self.started_at = time.time()
+        self.duration_sec: Optional[float] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.token: Optional[contextvars.Token] = None
+
+        self._threads: Dict[int, int] = {}  # thread ident -> attach depth
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{self.profile_id[:8]}", daemon=True)
+        self._sampler.start()
+
+    def attach_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def detach_thread(self, ident: int):
+        with self._lock:
+            depth = self._threads.get(ident, 0) - 1
+            if depth > 0:
+                self._threads[ident] = depth
+            else:
+                self._threads.pop(ident, None)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                idents = list(self._threads)
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                labels: List[str] = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join(timeout=1.0)
+        self.duration_sec = round(time.time() - self.started_at, 4)
+
+    def folded(self) -> str:
+        """Collapsed stacks, heaviest first (flamegraph.pl / speedscope input format)."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_sec": self.duration_sec,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "distinct_stacks": len(self.stacks),
+        }
+
+
+class Profiler:
+    """
+    Starts/stops per-request profile sessions and keeps the most recent results
+    in memory (and optionally as `<profile_id>.folded` files in `output_dir`).
+    """
+
+    def __init__(self, interval_ms: float = 5.0, max_profiles: int = 20, output_dir: Optional[str] = None):
+        self.interval = interval_ms / 1000.0
+        self.max_profiles = max_profiles
+        self.output_dir = output_dir
+        self._profiles: "OrderedDict[str, ProfileSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+
+    def start(self, name: str) -> ProfileSession:
+        """Start a session and make it active in the current context (undo with `detach`)."""
+        session = ProfileSession(name, self.interval)
+        session.token = _active_session.set(session)
+        return session
+
+    @staticmethod
+    def detach(session: ProfileSession):
+        if session.token is not None:
+            _active_session.reset(session.token)
+            session.token = None
+
+    def finish(self, session: ProfileSession):
+        """Stop sampling and store the profile."""
+        session.stop()
+        with self._lock:
+            self._profiles[session.profile_id] = session
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        if self.output_dir:
+            try:
+                with open(os.path.join(self.output_dir, f"{session.profile_id}.folded"), 'w', encoding='utf-8') as f:
+                    f.write(session.folded())
+            except Exception as e:
+                print(f"[Profiler] Failed to write profile: {e}")
+        print(f"[Profiler] {session.name}: {session.samples} samples over {session.duration_sec}s "
+              f"(profile {session.profile_id})")
+
+    @contextmanager
+    def attach(self):
+        """Let the active session (if any) sample the current thread while the block runs."""
+        session = _active_session.get()
+        if session is None:
+            yield
+            return
+        ident = threading.get_ident()
+        session.attach_thread(ident)
+        try:
+            yield
+        finally:
+            session.detach_thread(ident)
+
+    def attached(self, fn: Callable) -> Callable:
+        """Decorator form of `attach()`."""
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with self.attach():
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def get(self, profile_id: str) -> Optional[ProfileSession]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """Summaries of stored profiles, newest first."""
+        with self._lock:
+            sessions = list(self._profiles.values())
+        return [session.summary() for session in reversed(sessions)]
@@ -0,0 +1,200 @@
+"""
+Hedged Provider Orchestration
+
+Runs a search against an ordered list of providers (e.g. Coupang Partners,
+then Naver Shopping) without waiting out the primary's full timeout before
+trying the next one: the primary gets a head start of `hedge delay` seconds,
+after which the next provider is queried in parallel ("hedged"), and the
+first acceptable result wins. A provider that fails or returns an
+unacceptable (e.g. empty) result starts the next one immediately.
+
+The hedge delay adapts per provider: it is a high quantile of that
+provider's recent successful latencies, clamped to [min_delay, max_delay],
+so a normally fast provider is hedged early and a slow one isn't hedged on
+every call. Losing calls can't be interrupted (they run on threads), so
+their results are ignored, but their latencies are still recorded.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+
+class LatencyTracker:
+    """Recent latencies and outcomes of one provider."""
+
+    def __init__(self, window: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.successes = 0
+        self.failures = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            if ok:
+                self._latencies.append(seconds)
+                self.successes += 1
+            else:
+                self.failures += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+
+class ProviderOrchestrator:
+    """Hedged, first-acceptable-result-wins calls across registered providers."""
+
+    def __init__(
+        self,
+        hedge_quantile: float = 0.9,
+        initial_delay: float = 0.5,
+        min_delay: float = 0.1,
+        max_delay: float = 2.0,
+        window: int = 200,
+        max_workers: int = 16
+    ):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            hedge_quantile: Latency quantile of the running provider after which the next one is started
+            initial_delay: Hedge delay used until a provider has latency samples
+            min_delay: Lower bound of the hedge delay (0 with max_delay 0 queries all providers at once)
+            max_delay: Upper bound of the hedge delay
+            window: Number of recent latencies kept per provider
+            max_workers: Threads shared by all provider calls
+        """
+        self.hedge_quantile = hedge_quantile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.window = window
+
+        self._providers: Dict[str, Tuple[Callable[..., Any], Callable[[Any], bool]]] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="provider")
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.hedged_calls = 0
+        self.wins: Dict[str, int] = {}
+        self.exhausted = 0
+
+    def register(self, name: str, fn: Callable[..., Any], accept: Callable[[Any], bool] = bool):
+        """Register a provider; `accept(result)` decides whether its result can be returned."""
+        self._providers[name] = (fn, accept)
+        self._latency.setdefault(name, LatencyTracker(self.window))
+        self.wins.setdefault(name, 0)
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to give provider `name` before starting the next one."""
+        observed = self._latency[name].quantile(self.hedge_quantile)
+        delay = self.initial_delay if observed is None else observed
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def _run(self, name: str, *args: Any, **kwargs: Any) -> Any:
+        fn, _ = self._providers[name]
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._latency[name].record(time.perf_counter() - start, ok=False)
+            raise
+        self._latency[name].record(time.perf_counter() - start, ok=True)
+        return result
+
+    def _submit(self, name: str, args: tuple, kwargs: dict) -> Future:
+        # Each call gets its own copy of the caller's context (trace spans, profiler session)
+        ctx = contextvars.copy_context()
+        return self._executor.submit(ctx.run, self._run, name, *args, **kwargs)
+
+    def call(self, order: List[str], *args: Any, **kwargs: Any) -> Tuple[Optional[str], Any]:
+        """
+        Query providers in `order` with hedging and return (winning provider, result).
+        If no provider produced an acceptable result, returns (None, last result) or
+        re-raises the last error when every provider raised.
+        """
+        order = [name for name in order if name in self._providers]
+        if not order:
+            raise ValueError("No providers to call")
+        with self._lock:
+            self.calls += 1
+
+        pending: Dict[Future, str] = {}
+        next_index = 0
+        last_result: Any = None
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def start_next():
+            nonlocal next_index
+            name = order[next_index]
+            next_index += 1
+            pending[self._submit(name, args, kwargs)] = name
+            return name
+
+        running = start_next()
+        deadline = time.monotonic() + self.hedge_delay(running)
+        while pending:
+            timeout = max(0.0, deadline - time.monotonic()) if next_index < len(order) else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Head start used up: hedge with the next provider
+                hedged = True
+                running = start_next()
+                deadline = time.monotonic() + self.hedge_delay(running)
+                continue
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if self._providers[name][1](result):
+                    with self._lock:
+                        self.wins[name] += 1
+                        if hedged:
+                            self.hedged_calls += 1
+                    return name, result
+                last_result = result
+            if next_index < len(order):
+                # A provider failed or returned nothing usable: don't wait for the hedge delay
+                running = start_next()
+                deadline = time.monotonic() + self.hedge_delay(running)
+
+        with self._lock:
+            self.exhausted += 1
+            if hedged:
+                self.hedged_calls += 1
+        if last_result is None and last_error is not None:
+            raise last_error
+        return None, last_result
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Per-provider latency/outcome statistics and current hedge delays."""
+        providers = {}
+        for name, tracker in self._latency.items():
+            p50, p90 = tracker.quantile(0.5), tracker.quantile(0.9)
+            providers[name] = {
+                'successes': tracker.successes,
+                'failures': tracker.failures,
+                'wins': self.wins.get(name, 0),
+                'latency_p50_sec': round(p50, 4) if p50 is not None else None,
+                'latency_p90_sec': round(p90, 4) if p90 is not None else None,
+                'hedge_delay_sec': round(self.hedge_delay(name), 4),
+            }
+        return {
+            'calls': self.calls,
+            'hedged_calls': self.hedged_calls,
+            'exhausted': self.exhausted,
+            'providers': providers,
+        }
@@ -0,0 +1,204 @@
+"""
+Client-side Rate Limiting for Shopping APIs
+
+Keeps product search under the Naver Shopping / Coupang Partners quotas:
+
+- TokenBucket: per-provider requests-per-second limit with a burst allowance
+  and an optional daily quota. Waiting callers are served in priority order,
+  so interactive requests go ahead of background work (cache refreshes,
+  warmers). A 429 from the provider pauses the bucket for Retry-After seconds.
+- RequestCoalescer: concurrent calls with the same key share one upstream
+  call and all receive its result (or exception).
+
+Priority is carried in a contextvar (`priority()` / `run_with_priority()`),
+so it doesn't have to be threaded through every search function.
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Optional
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("yorigo_request_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(level: int):
+    """Run the block's rate-limited calls at `level` (INTERACTIVE or BACKGROUND)."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def run_with_priority(level: int, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with priority(level):
+        return fn(*args, **kwargs)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call can't get a token in time (or the daily quota is used up)."""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} rate limit exceeded, retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Token bucket with priority-ordered waiters, 429 back-off and an optional daily quota."""
+
+    def __init__(self, name: str, rate_per_sec: float, burst: Optional[float] = None, daily_quota: int = 0):
+        """
+        Initialize the bucket.
+
+        Args:
+            name: Provider name (used in errors and statistics)
+            rate_per_sec: Sustained requests per second
+            burst: Max tokens accumulated while idle (defaults to one second of traffic)
+            daily_quota: Max requests per calendar day (0 = unlimited)
+        """
+        self.name = name
+        self.rate = rate_per_sec
+        self.capacity = burst if burst is not None else max(1.0, rate_per_sec)
+        self.daily_quota = daily_quota
+
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._day = time.strftime("%Y-%m-%d")
+        self._used_today = 0
+        self._waiters: list = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.granted = 0
+        self.waited = 0
+        self.rejected = 0
+        self.throttled_responses = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _check_daily_quota(self):
+        today = time.strftime("%Y-%m-%d")
+        if today != self._day:
+            self._day, self._used_today = today, 0
+        if self.daily_quota and self._used_today >= self.daily_quota:
+            self.rejected += 1
+            raise RateLimitExceeded(self.name, retry_after=3600.0)
+
+    def acquire(self, timeout: float = 5.0, level: Optional[int] = None):
+        """
+        Take one token, waiting behind higher-priority callers for at most `timeout` seconds.
+        Raises RateLimitExceeded if no token became available in time.
+        """
+        level = current_priority() if level is None else level
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._check_daily_quota()
+            entry = (level, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            waited = False
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry and now >= self._paused_until and self._tokens >= 1:
+                        self._tokens -= 1
+                        self._used_today += 1
+                        self.granted += 1
+                        self.waited += waited
+                        return
+                    if now >= deadline:
+                        self.rejected += 1
+                        raise RateLimitExceeded(self.name, retry_after=max(self._paused_until - now, 1 / self.rate))
+                    # Sleep until a token should be available (or a waiter ahead of us leaves)
+                    wake = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.001)
+                    waited = True
+                    self._cond.wait(min(wake, deadline - now))
+            finally:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def penalize(self, retry_after: float):
+        """The provider answered 429: stop granting tokens for `retry_after` seconds."""
+        with self._cond:
+            self.throttled_responses += 1
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                'rate_per_sec': self.rate,
+                'burst': self.capacity,
+                'tokens': round(self._tokens, 2),
+                'waiting': len(self._waiters),
+                'paused_for_sec': round(max(0.0, self._paused_until - time.monotonic()), 2),
+                'daily_quota': self.daily_quota,
+                'used_today': self._used_today,
+                'granted': self.granted,
+                'waited': self.waited,
+                'rejected': self.rejected,
+                'throttled_responses': self.throttled_responses,
+            }
+
+
+class RequestCoalescer:
+    """Collapses concurrent identical calls into one."""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.coalesced = 0
+
+    def run(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run `fn()` unless a call with the same key is in flight; then wait for and share its outcome."""
+        with self._lock:
+            self.calls += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+        }
@@ -0,0 +1,110 @@
+"""
+Recipe Segment Planner
+
+Finds the parts of a long video that actually contain the recipe, so ASR and
+frame sampling only process those time ranges instead of the whole timeline.
+
+Signals (all cheap, no model calls):
+- yt-dlp chapters whose titles look like recipe sections
+- caption cues scored by a keyword pass (재료, 넣어, 분, g, ml, ...)
+
+Returns None whenever there is not enough signal or the plan would cover most
+of the video anyway, in which case callers process the full video as before.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+Segment = Tuple[float, float]
+
+# Caption words that show up while a recipe is being cooked
+RECIPE_KEYWORDS = [
+    "재료", "넣어", "넣고", "넣은", "넣어주", "썰어", "다져", "볶아", "볶고", "끓여", "끓이",
+    "익혀", "섞어", "버무", "양념", "간장", "소금", "설탕", "고춧가루", "마늘", "기름", "불을",
+    "중불", "약불", "강불", "레시피",
+    "ingredient", "recipe", "add ", "stir", "chop", "boil", "simmer", "fry", "season", "mix",
+]
+# Quantities ("200g", "1큰술", "5분", "2 cups") are the strongest signal
+QUANTITY_RE = re.compile(
+    r"\d+(?:\.\d+)?\s*(?:g|kg|ml|l|분|초|큰술|작은술|스푼|컵|개|tbsp|tsp|cups?|minutes?|mins?)(?![A-Za-z])",
+    re.IGNORECASE
+)
+CHAPTER_KEYWORDS_RE = re.compile(
+    r"재료|레시피|만들기|만드는|요리|조리|손질|양념|소스|recipe|ingredient|cook|prep|how to",
+    re.IGNORECASE
+)
+_KEYWORDS_RE = re.compile("|".join(re.escape(k) for k in RECIPE_KEYWORDS), re.IGNORECASE)
+
+
+def score_caption_text(text: str) -> int:
+    """Keyword score of a caption cue (quantities count double)."""
+    return len(_KEYWORDS_RE.findall(text)) + 2 * len(QUANTITY_RE.findall(text))
+
+
+def merge_segments(segments: List[Segment], gap: float = 0.0) -> List[Segment]:
+    """Sort segments and merge those that overlap or are within `gap` seconds."""
+    merged: List[List[float]] = []
+    for start, end in sorted(segments):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def plan_recipe_segments(
+    duration: float,
+    chapters: Optional[List[Dict[str, Any]]] = None,
+    caption_cues: Optional[List[Dict[str, Any]]] = None,
+    min_duration: float = 600.0,
+    window_sec: float = 30.0,
+    min_window_score: int = 3,
+    padding_sec: float = 20.0,
+    max_coverage: float = 0.8
+) -> Optional[List[Segment]]:
+    """
+    Plan the recipe-relevant time ranges of a video.
+
+    Args:
+        duration: Video duration in seconds
+        chapters: yt-dlp chapters [{start_time, end_time, title}, ...]
+        caption_cues: Caption cues [{start, end, text}, ...]
+        min_duration: Videos shorter than this are always processed in full
+        window_sec: Caption timeline bucket size for keyword scoring
+        min_window_score: Minimum keyword score for a bucket to be kept
+        padding_sec: Context kept around each selected range
+        max_coverage: Give up (return None) if the plan covers more than this fraction
+
+    Returns:
+        Sorted, merged [(start, end), ...] or None to process the whole video
+    """
+    if not duration or duration < min_duration:
+        return None
+
+    segments: List[Segment] = []
+
+    for chapter in chapters or []:
+        if CHAPTER_KEYWORDS_RE.search(chapter.get("title") or ""):
+            segments.append((float(chapter.get("start_time") or 0), float(chapter.get("end_time") or duration)))
+
+    if caption_cues:
+        bucket_scores: Dict[int, int] = {}
+        for cue in caption_cues:
+            score = score_caption_text(cue.get("text", ""))
+            if score:
+                bucket = int(cue.get("start", 0) // window_sec)
+                bucket_scores[bucket] = bucket_scores.get(bucket, 0) + score
+        for bucket, score in bucket_scores.items():
+            if score >= min_window_score:
+                segments.append((bucket * window_sec, (bucket + 1) * window_sec))
+
+    if not segments:
+        return None
+
+    padded = [(max(0.0, start - padding_sec), min(duration, end + padding_sec)) for start, end in segments]
+    plan = merge_segments(padded, gap=padding_sec)
+
+    coverage = sum(end - start for start, end in plan) / duration
+    if coverage > max_coverage:
+        return None
+    return plan
@@ -0,0 +1,111 @@
+"""
+Product Title Size Parser
+
+Extracts the total package quantity from a shopping product title, normalized
+to base units: grams, milliliters, or a count ("개", "봉지").
+
+    "당근 500g"              -> (500.0, "g")
+    "우유 1L"                -> (1000.0, "ml")
+    "양파 500g x 3개"         -> (1500.0, "g")
+    "감자 1.5kg(3팩)"         -> (4500.0, "g")
+    "탄산수 200ml*24"         -> (4800.0, "ml")
+    "곰곰 우유 900ml, 2개"     -> (1800.0, "ml")
+    "계란 30구"              -> (30.0, "개")
+
+All units are matched by one precompiled pattern in a single scan of the
+title. The first weight or volume in the title wins; counts are only used when
+there is none. Latin units must not run into further letters, so "10 lemons"
+is not read as 10 liters. Results are memoized per title in an LRU, because
+the same products come back on every search for an ingredient.
+"""
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SizeResult = Tuple[Optional[float], Optional[str]]
+
+# Unit spelling -> (base unit, multiplier)
+_UNITS: Dict[str, Tuple[str, float]] = {
+    "kg": ("g", 1000.0), "킬로그램": ("g", 1000.0), "킬로": ("g", 1000.0),
+    "g": ("g", 1.0), "gr": ("g", 1.0), "그램": ("g", 1.0),
+    "l": ("ml", 1000.0), "ℓ": ("ml", 1000.0), "리터": ("ml", 1000.0),
+    "ml": ("ml", 1.0), "cc": ("ml", 1.0), "밀리리터": ("ml", 1.0),
+    "개입": ("개", 1.0), "구": ("개", 1.0),
+    "봉지": ("봉지", 1.0),
+}
+_MEASURES = ("g", "ml")
+
+# Words that may follow a pack multiplier ("x 3개", "(3팩)", "*24입")
+_PACK_WORDS = r"(?:개입|개|팩|봉지|봉|입|병|캔|묶음|세트|박스|통|ea|p)"
+
+_NUMBER = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+_UNIT = "(" + "|".join(
+    # Latin units must not continue into a word ("10 lemons"); "x" may follow ("500gx3")
+    re.escape(unit) + (r"(?![a-wyz])" if unit.isascii() else "")
+    for unit in sorted(_UNITS, key=len, reverse=True)
+) + ")"
+_PACK = (
+    r"(?:\s*[x×*]\s*(\d+)\s*" + _PACK_WORDS + r"?"                 # 500g x 3개, 200ml*24
+    + r"|\s*[\(\[]\s*(\d+)\s*" + _PACK_WORDS + r"\s*[\)\]]"       # 1.5kg(3팩)
+    + r"|\s*,\s*(\d+)\s*(?:개|팩|봉|병|캔)(?!입))?"                  # 900ml, 2개 (Coupang titles)
+)
+_SIZE_PATTERN = re.compile(r"(?<![\d.,])" + _NUMBER + r"\s*" + _UNIT + _PACK, re.IGNORECASE)
+
+
+def _parse(title: str) -> SizeResult:
+    count_result: SizeResult = (None, None)
+    for match in _SIZE_PATTERN.finditer(title):
+        number, unit, pack_x, pack_paren, pack_comma = match.groups()
+        base_unit, multiplier = _UNITS[unit.lower()]
+        packs = int(pack_x or pack_paren or pack_comma or 1) or 1
+        size = float(number.replace(",", "")) * multiplier * packs
+        if base_unit in _MEASURES:
+            return (size, base_unit)
+        if count_result[0] is None:
+            count_result = (size, base_unit)
+    return count_result
+
+
+class ProductSizeParser:
+    """Title -> (total size, base unit) with an LRU over titles."""
+
+    def __init__(self, cache_size: int = 20000):
+        """
+        Initialize the parser.
+
+        Args:
+            cache_size: Number of titles memoized (0 disables the cache)
+        """
+        self.cache_size = cache_size
+        self.parse = lru_cache(maxsize=cache_size)(_parse) if cache_size else _parse
+
+    def parse_many(self, titles: Iterable[str]) -> List[SizeResult]:
+        """Parse a whole result page; each distinct title is parsed once."""
+        parse = self.parse
+        parsed: Dict[str, SizeResult] = {}
+        results = []
+        for title in titles:
+            result = parsed.get(title)
+            if result is None:
+                result = parsed[title] = parse(title or "")
+            results.append(result)
+        return results
+
+    def clear(self):
+        if self.cache_size:
+            self.parse.cache_clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """LRU statistics."""
+        if not self.cache_size:
+            return {'cache_size': 0}
+        info = self.parse.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            'cache_size': self.cache_size,
+            'entries': info.currsize,
+            'hits': info.hits,
+            'misses': info.misses,
+            'hit_rate': (info.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+# Runtime state (caches, catalog, cursors) goes to a throwaway directory, not the working tree
+_state_dir = tempfile.mkdtemp(prefix="yorigo-tests-")
+for name, value in {
+    "USE_MOCK_COUPANG_DATA": "true",
+    "WARMUP_ENABLED": "false",
+    "PRODUCT_CATALOG_DB": ":memory:",
+    "PRODUCT_CACHE_FILE": "",
+    "LLM_CACHE_FILE": os.path.join(_state_dir, "llm_cache.json"),
+    "PARSE_CACHE_DIR": os.path.join(_state_dir, "parse_cache"),
+    "AUDIO_FINGERPRINT_INDEX_FILE": os.path.join(_state_dir, "audio_fingerprints.db"),
+    "INGEST_CURSOR_FILE": os.path.join(_state_dir, "ingest_cursors.json"),
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
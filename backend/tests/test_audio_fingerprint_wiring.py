@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+import backend
+
+
+def test_parse_cache_stats_do_not_load_the_fingerprint_index():
+    assert not backend.fingerprint_index.loaded
+    stats = TestClient(backend.app).get("/parse_cache/stats").json()
+    assert stats["audio_fingerprints"] == "not loaded"
+    assert not backend.fingerprint_index.loaded
+
+
+def test_captioned_videos_are_fingerprinted(monkeypatch, tmp_path):
+    indexed = []
+    monkeypatch.setattr(backend, "get_prefetched", lambda url, deadline: None)
+    monkeypatch.setattr(backend, "get_youtube_captions_vtt",
+                        lambda info, deadline: "WEBVTT\n\n00:00:01.000 --> 00:00:03.000\n양파를 썰어주세요\n")
+    monkeypatch.setattr(backend, "download_audio_prefix", lambda url, outdir, seconds: f"{outdir}/prefix.m4a")
+    monkeypatch.setattr(backend, "find_audio_duplicate",
+                        lambda url, info, path, index_only=False: indexed.append((url, index_only)))
+
+    transcript, used_captions, *_ = backend.get_transcript_within_deadline(
+        "https://www.youtube.com/watch?v=abc", {"duration": 60}, "youtube", str(tmp_path), "ko",
+        backend.ParseDeadline(30)
+    )
+    backend._fingerprint_executor.submit(lambda: None).result(timeout=5)  # drain the single worker
+    assert used_captions and "양파" in transcript
+    assert indexed == [("https://www.youtube.com/watch?v=abc", True)]
@@ -0,0 +1,18 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import backend
+
+
+def test_basket_errors_are_reported_per_merged_item(monkeypatch):
+    def failing_search(name, limit):
+        raise HTTPException(status_code=503, detail=f"no results for {name}")
+
+    monkeypatch.setattr(backend, "search_product_page", failing_search)
+    response = TestClient(backend.app).post("/optimize_basket", json={"items": [
+        {"ingredient_name": "간장", "needed_qty": 30, "needed_unit": "ml"},
+        {"ingredient_name": "간장", "needed_qty": 100, "needed_unit": "g"},
+    ]})
+    assert response.status_code == 200
+    errors = response.json()["errors"]
+    assert sorted((e["ingredient_name"], e["needed_unit"]) for e in errors) == [("간장", "g"), ("간장", "ml")]
@@ -0,0 +1,40 @@
+import itertools
+import random
+
+import pytest
+
+from basket_optimizer import solve_package_cover
+
+
+def brute_force_cost(need, sizes, prices, max_units):
+    costs = [sum(q * p for q, p in zip(quantities, prices))
+             for quantities in itertools.product(range(max_units + 1), repeat=len(sizes))
+             if sum(q * s for q, s in zip(quantities, sizes)) + 1e-9 >= need]
+    return min(costs) if costs else None
+
+
+def test_fractional_size_covers_with_fewest_packs():
+    solution = solve_package_cover(3, [1.5], [2500])
+    assert solution["quantities"] == {0: 2}
+    assert solution["cost"] == 5000
+
+
+def test_fractional_sizes_are_not_rounded_away():
+    need, sizes, prices = 250, [30, 30, 2.5], [9000, 8500, 600]
+    solution = solve_package_cover(need, sizes, prices)
+    assert solution is not None
+    assert solution["purchased"] >= need
+    assert solution["cost"] == brute_force_cost(need, sizes, prices, 10)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_matches_brute_force(seed):
+    rng = random.Random(seed)
+    for _ in range(300):
+        sizes = [rng.choice([0.5, 1.5, 2.5, 7.5, 30, 100, 250, 500, 1000]) for _ in range(rng.randint(1, 3))]
+        prices = [rng.randint(5, 100) * 100 for _ in sizes]
+        need = rng.choice([1, 2.5, 4.5, 12.3, 250, 600, 1800])
+        max_units = rng.randint(1, 5)
+        solution = solve_package_cover(need, sizes, prices, max_units=max_units)
+        expected = brute_force_cost(need, sizes, prices, max_units)
+        assert (solution["cost"] if solution else None) == expected
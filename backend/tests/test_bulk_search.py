@@ -0,0 +1,21 @@
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import backend
+
+
+def test_bulk_errors_are_reported_per_name_and_unit(monkeypatch):
+    def failing_search(item):
+        raise HTTPException(status_code=503, detail=f"no results for {item.needed_unit}")
+
+    monkeypatch.setattr(backend, "search_products_advanced", failing_search)
+    monkeypatch.setattr(backend, "PRODUCT_CACHE_ENABLED", False)
+    response = TestClient(backend.app).post("/search_products_bulk", json={"items": [
+        {"ingredient_name": "간장", "needed_qty": 30, "needed_unit": "ml"},
+        {"ingredient_name": "간장", "needed_qty": 1, "needed_unit": "큰술"},
+        {"ingredient_name": "간장 ", "needed_qty": 15, "needed_unit": "ml"},
+    ]})
+    assert response.status_code == 200
+    errors = response.json()["errors"]
+    assert [(e["ingredient_name"], e["needed_unit"]) for e in errors] == [("간장", "ml"), ("간장", "큰술")]
+    assert errors[1]["error"] == "no results for 큰술"
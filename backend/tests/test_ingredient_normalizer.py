@@ -0,0 +1,38 @@
+import pytest
+
+from ingredient_normalizer import IngredientNormalizer
+
+
+@pytest.fixture
+def normalizer():
+    return IngredientNormalizer()
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("다진 마늘", "마늘"),
+    ("마늘 (다진 것)", "마늘"),
+    ("깐마늘", "마늘"),
+    ("Eggs", "계란"),
+    ("국물용 멸치", "멸치"),
+    ("호주산 소고기", "소고기"),
+    ("chopped green onions", "대파"),
+])
+def test_variants_map_to_the_canonical_term(normalizer, name, expected):
+    assert normalizer.normalize(name) == expected
+
+
+@pytest.mark.parametrize("name, wrong", [
+    ("bell pepper", "후추"),
+    ("red bell pepper", "후추"),
+    ("peanut butter", "버터"),
+    ("coconut milk", "우유"),
+    ("soy milk", "우유"),
+    ("almond milk", "우유"),
+    ("chicken stock", "닭고기"),
+    ("소고기 육수", "소고기"),
+    ("rice wine", "쌀"),
+    ("egg noodles", "계란"),
+])
+def test_compounds_keep_their_own_name(normalizer, name, wrong):
+    assert normalizer.normalize(name) != wrong
+    assert normalizer.normalize(name) == name.lower()
@@ -0,0 +1,32 @@
+import json
+import os
+import time
+
+from llm_cache import LLMResponseCache
+
+
+def test_put_does_not_write_on_request_thread(tmp_path):
+    path = str(tmp_path / "llm.json")
+    cache = LLMResponseCache(cache_file=path, flush_interval=60.0)
+    try:
+        cache.put("k", "v", model="m")
+        assert not os.path.exists(path)
+        cache.flush()
+        with open(path, encoding="utf-8") as f:
+            assert json.load(f)["entries"]["k"]["value"] == "v"
+    finally:
+        cache.close()
+
+
+def test_background_flush_writes_file(tmp_path):
+    path = str(tmp_path / "llm.json")
+    cache = LLMResponseCache(cache_file=path, flush_interval=0.05)
+    try:
+        cache.put("k", "v", model="m")
+        deadline = time.time() + 2
+        while not os.path.exists(path) and time.time() < deadline:
+            time.sleep(0.02)
+        assert os.path.exists(path)
+        assert not [n for n in os.listdir(tmp_path) if n.endswith(".tmp")]
+    finally:
+        cache.close()
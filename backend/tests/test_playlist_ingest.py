@@ -0,0 +1,58 @@
+from concurrent.futures import Future
+
+from playlist_ingest import PlaylistIngestor
+
+
+class InlineScheduler:
+    """Runs each job immediately; enough for the ingestor's submit/get_future use."""
+
+    def __init__(self):
+        self._futures = []
+
+    def submit(self, fn, *args, priority=0, metadata=None):
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        self._futures.append(future)
+        return len(self._futures) - 1
+
+    def get_future(self, job_id):
+        return self._futures[job_id]
+
+
+def run_to_end(ingestor, url):
+    cursor = ingestor.start(url)
+    ingestor._running[cursor["ingest_id"]].join(timeout=5)
+    return ingestor.get_cursor(cursor["ingest_id"])
+
+
+def test_uncached_and_failed_entries_are_retried(tmp_path):
+    cached, parsed = set(), []
+    degraded = {"u2"}
+
+    def parse(url, prefer_lang):
+        parsed.append(url)
+        if url == "u3":
+            raise RuntimeError("download failed")
+        if url not in degraded:
+            cached.add(url)
+
+    entries = [{"url": f"u{i}", "id": f"v{i}"} for i in range(1, 5)]
+    ingestor = PlaylistIngestor(InlineScheduler(), parse, lambda url: url in cached, lambda url: list(entries),
+                                cursor_file=str(tmp_path / "cursors.json"))
+
+    cursor = run_to_end(ingestor, "playlist")
+    assert cursor["processed_ids"] == ["v1", "v4"]
+    assert cursor["retry_ids"] == ["v2", "v3"]
+    assert (cursor["parsed"], cursor["uncached"], cursor["failed"]) == (2, 1, 1)
+
+    # The next run (a new upload first) parses only the new entry and the retries
+    degraded.clear()
+    entries.insert(0, {"url": "u5", "id": "v5"})
+    parsed.clear()
+    cursor = run_to_end(ingestor, "playlist")
+    assert parsed == ["u5", "u2", "u3"]
+    assert cursor["retry_ids"] == ["v3"]
+    assert set(cursor["processed_ids"]) == {"v1", "v2", "v4", "v5"}
@@ -0,0 +1,46 @@
+from product_catalog import ProductCatalog
+
+
+def _products(*names):
+    return [{"productId": name, "productName": name, "productPrice": 1000 + i} for i, name in enumerate(names)]
+
+
+def test_lookup_answers_only_from_the_same_query():
+    catalog = ProductCatalog(db_path=":memory:")
+    catalog.record("양파링 과자", _products("농심 양파링 84g", "양파링 대용량 260g"), "coupang")
+    catalog.record("간장게장", _products("여수 간장게장 1kg", "순살 간장게장 500g"), "coupang")
+
+    assert catalog.lookup("양파", 2, 3600) is None
+    assert catalog.lookup("간장", 2, 3600) is None
+    assert [p["productName"] for p in catalog.lookup("양파링  과자", 2, 3600)] == ["농심 양파링 84g", "양파링 대용량 260g"]
+
+
+def test_name_match_is_opt_in():
+    catalog = ProductCatalog(db_path=":memory:")
+    catalog.record("양파링 과자", _products("농심 양파링 84g", "양파링 대용량 260g"), "coupang")
+    assert len(catalog.lookup("양파링", 2, 3600, fulltext_fallback=True)) == 2
+
+
+def test_short_provider_page_is_a_complete_answer():
+    catalog = ProductCatalog(db_path=":memory:")
+    catalog.record("트러플 오일", _products("트러플 오일 250ml", "트러플 오일 100ml", "블랙 트러플 오일 55ml"),
+                   "naver", requested=50)
+    assert len(catalog.lookup("트러플 오일", 50, 3600)) == 3
+    assert len(catalog.lookup("트러플 오일", 2, 3600)) == 2
+
+
+def test_truncated_page_is_not_a_complete_answer():
+    catalog = ProductCatalog(db_path=":memory:")
+    catalog.record("양파", _products("양파 1kg", "양파 3kg"), "naver", requested=2)
+    assert catalog.lookup("양파", 10, 3600) is None
+
+
+def test_shorter_fetch_keeps_the_stored_tail():
+    catalog = ProductCatalog(db_path=":memory:")
+    names = [f"양파 {n}kg" for n in range(1, 51)]
+    catalog.record("양파", _products(*names), "coupang", requested=50)
+    catalog.record("양파", _products("햇양파 1kg", *names[:9]), "coupang", requested=10)
+    products = catalog.lookup("양파", 50, 3600)
+    assert len(products) == 50
+    assert products[0]["productName"] == "햇양파 1kg"
+    assert [p["productName"] for p in products[1:]] == names[:9] + names[10:]
@@ -0,0 +1,20 @@
+from fastapi.testclient import TestClient
+
+import backend
+from warmup import WarmupManager
+
+
+def test_unknown_component_is_never_ready():
+    manager = WarmupManager()
+    manager.register("whisper", lambda: None, enabled=False)
+    assert manager.is_ready(["whisper"])
+    assert not manager.is_ready(["whisper", "whispr"])
+    assert manager.unknown(["whisper", "whispr"]) == ["whispr"]
+
+
+def test_ready_rejects_unknown_components():
+    client = TestClient(backend.app)
+    response = client.get("/ready", params={"components": "whisper,whispr"})
+    assert response.status_code == 400
+    assert "whispr" in response.json()["detail"]
+    assert client.get("/ready", params={"components": "whisper"}).status_code == 200
@@ -0,0 +1,46 @@
+import threading
+import time
+
+import backend
+from rate_limit import BACKGROUND, run_with_priority
+
+
+def hold_slot(stage, release, entered, order, name, background=False):
+    def body():
+        with backend.stage_slot(stage):
+            order.append(name)
+            entered.set()
+            release.wait(5)
+    thread = threading.Thread(target=(lambda: run_with_priority(BACKGROUND, body)) if background else body)
+    thread.start()
+    return thread
+
+
+def test_background_parses_use_a_reduced_share():
+    stage, limit = "download", backend.PARSE_BACKGROUND_STAGE_LIMITS["download"]
+    release, order = threading.Event(), []
+    threads = [hold_slot(stage, release, threading.Event(), order, i, background=True) for i in range(limit + 2)]
+    time.sleep(0.3)
+    assert len(order) == limit
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert len(order) == limit + 2
+
+
+def test_interactive_waiters_go_before_background():
+    stage, order = "asr", []
+    release_first, release_rest = threading.Event(), threading.Event()
+    first_in = threading.Event()
+    first = hold_slot(stage, release_first, first_in, order, "first")
+    first_in.wait(5)
+    background = hold_slot(stage, release_rest, threading.Event(), order, "background", background=True)
+    time.sleep(0.1)
+    interactive = hold_slot(stage, release_rest, threading.Event(), order, "interactive")
+    time.sleep(0.1)
+    release_first.set()
+    time.sleep(0.3)
+    release_rest.set()
+    for thread in (first, background, interactive):
+        thread.join(5)
+    assert order == ["first", "interactive", "background"]
@@ -0,0 +1,9 @@
+import yt_dlp
+
+import backend
+
+
+def test_youtube_dl_returns_a_ytdlp_instance():
+    with backend.youtube_dl({"quiet": True, "skip_download": True}) as ydl:
+        assert isinstance(ydl, yt_dlp.YoutubeDL)
+        assert ydl.params["skip_download"] is True
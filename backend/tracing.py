@@ -0,0 +1,268 @@
+"""
+Request-scoped Tracing
+
+Per-request span trees (external calls, cache lookups, CPU stages) for
+diagnosing individual slow requests, without an external collector.
+
+The active span lives in a contextvar, so it follows the request through
+`await`s, `asyncio.to_thread` and Starlette's threadpool automatically. Work
+handed to a plain executor must be wrapped with `bind_context(fn)` to keep its
+spans in the request's tree.
+
+Finished traces go to an in-memory ring buffer (and optionally a JSONL file),
+where the admin endpoints read them back.
+"""
+
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("yorigo_current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    def __init__(self, trace: "_Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self._start_perf = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.token: Optional[contextvars.Token] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any):
+        self.events.append({
+            "name": name,
+            "offset_ms": round((time.perf_counter() - self._start_perf) * 1000, 3),
+            **attributes
+        })
+
+    def end(self, error: Optional[BaseException] = None):
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = round((time.perf_counter() - self._start_perf) * 1000, 3)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_offset_ms": round((self.start - self.trace.root_start) * 1000, 3),
+            "duration_ms": self.duration_ms,
+            "thread": self.thread,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class _Trace:
+    def __init__(self, trace_id: str, max_spans: int):
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.root_start = time.time()
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> bool:
+        with self._lock:
+            if len(self.spans) >= self.max_spans:
+                self.dropped_spans += 1
+                return False
+            self.spans.append(span)
+            return True
+
+
+class TraceExporter:
+    """
+    Keeps the most recent finished traces in memory (ring buffer) and optionally
+    appends every trace as one JSON line to `file_path`.
+    """
+
+    def __init__(self, max_traces: int = 200, file_path: Optional[str] = None):
+        self.max_traces = max_traces
+        self.file_path = file_path
+        self._traces: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.exported = 0
+
+    def export(self, trace: Dict[str, Any]):
+        with self._lock:
+            self._traces[trace["trace_id"]] = trace
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+            self.exported += 1
+        if self.file_path:
+            try:
+                with open(self.file_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+            except Exception as e:
+                print(f"[Tracing] Failed to write trace file: {e}")
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._traces.get(trace_id)
+
+    def recent(self, limit: int = 50, min_duration_ms: float = 0.0, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Summaries of the most recent traces (newest first), optionally only slow ones."""
+        with self._lock:
+            traces = list(self._traces.values())
+        summaries = []
+        for trace in reversed(traces):
+            if (trace["duration_ms"] or 0) < min_duration_ms or (name and trace["name"] != name):
+                continue
+            summaries.append({key: trace[key] for key in
+                              ("trace_id", "name", "start_time", "duration_ms", "status", "span_count")})
+            if len(summaries) >= limit:
+                break
+        return summaries
+
+
+class Tracer:
+    """
+    Creates traces and spans. Spans opened while no trace is active are no-ops,
+    so instrumented helpers cost almost nothing outside traced requests.
+    """
+
+    def __init__(self, exporter: TraceExporter, sample_rate: float = 1.0, max_spans_per_trace: int = 500,
+                 enabled: bool = True):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.max_spans_per_trace = max_spans_per_trace
+        self.enabled = enabled
+
+    def start_trace(self, name: str, trace_id: Optional[str] = None, **attributes: Any) -> Optional[Span]:
+        """
+        Start a new trace and make its root span current in this context.
+        Returns None when tracing is disabled or the request is not sampled.
+        The root must be finished with `end_trace`; `detach` restores the previous
+        current span in the context that started the trace.
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        trace = _Trace(trace_id or uuid.uuid4().hex, self.max_spans_per_trace)
+        root = Span(trace, name, None, attributes)
+        trace.add(root)
+        root.token = _current_span.set(root)
+        return root
+
+    @staticmethod
+    def detach(root: Optional[Span]):
+        if root is not None and root.token is not None:
+            _current_span.reset(root.token)
+            root.token = None
+
+    def end_trace(self, root: Optional[Span], error: Optional[BaseException] = None):
+        """Finish the root span and export the whole trace."""
+        if root is None:
+            return
+        root.end(error)
+        trace = root.trace
+        with trace._lock:
+            spans = [span.to_dict() for span in trace.spans]
+        self.exporter.export({
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "start_time": root.start,
+            "duration_ms": root.duration_ms,
+            "status": "error" if root.error else "ok",
+            "span_count": len(spans),
+            "error_spans": sum(1 for span in spans if span["status"] == "error"),
+            "dropped_spans": trace.dropped_spans,
+            "attributes": root.attributes,
+            "spans": spans,
+        })
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any):
+        """Time the block as a child of the current span (no-op outside a trace)."""
+        parent = _current_span.get()
+        if parent is None:
+            yield None
+            return
+        span = Span(parent.trace, name, parent.span_id, attributes)
+        if not parent.trace.add(span):
+            yield None
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.end(e)
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+
+    def traced(self, name: Optional[str] = None):
+        """Decorator: run every call of the function inside a span."""
+        def decorator(fn: Callable) -> Callable:
+            span_name = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @staticmethod
+    def set_attribute(key: str, value: Any):
+        """Set an attribute on the current span, if any."""
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    @staticmethod
+    def add_event(name: str, **attributes: Any):
+        """Record a point-in-time event (e.g. a cache hit) on the current span, if any."""
+        span = _current_span.get()
+        if span is not None:
+            span.add_event(name, **attributes)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'buffered_traces': len(self.exporter._traces),
+            'max_traces': self.exporter.max_traces,
+            'exported': self.exporter.exported,
+            'file_path': self.exporter.file_path,
+        }
+
+
+def bind_context(fn: Callable) -> Callable:
+    """
+    Bind `fn` to a copy of the caller's context, so spans it opens on another
+    thread (executor, thread pool) attach to the caller's trace.
+    """
+    ctx = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return ctx.run(fn, *args, **kwargs)
+    return run
@@ -0,0 +1,107 @@
+"""
+Startup Warm-up and Readiness
+
+Loads slow components (Whisper, EasyOCR, API connections) in a background
+thread right after startup, instead of inside the first request that needs
+them. Each component's state is tracked so `/ready` can tell the load
+balancer whether this instance should receive traffic yet.
+
+States: pending -> warming -> ready | failed, or "disabled" when the
+component is not configured (e.g. no API key) or excluded from warm-up.
+"""
+
+import threading
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional
+
+
+class WarmupManager:
+    """Runs registered warm-up functions once, in order, on a background thread."""
+
+    def __init__(self):
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def register(self, name: str, fn: Callable[[], Any], required: bool = True, enabled: bool = True):
+        """
+        Register a component.
+
+        Args:
+            name: Component name reported by `/ready`
+            fn: Warm-up function; raising marks the component as failed
+            required: Whether the instance is only ready once this component is
+            enabled: False reports the component as "disabled" (it never blocks readiness)
+        """
+        with self._lock:
+            if name not in self._components:
+                self._order.append(name)
+            self._components[name] = {
+                'fn': fn,
+                'required': required and enabled,
+                'state': 'pending' if enabled else 'disabled',
+                'duration_sec': None,
+                'error': None,
+            }
+
+    def start(self):
+        """Start warming all enabled components in the background (no-op if already started)."""
+        if self._thread is not None:
+            return
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        for name in list(self._order):
+            component = self._components[name]
+            if component['state'] != 'pending':
+                continue
+            component['state'] = 'warming'
+            start = time.perf_counter()
+            try:
+                component['fn']()
+                component['state'] = 'ready'
+            except Exception as e:
+                component['state'] = 'failed'
+                component['error'] = f"{type(e).__name__}: {e}"
+                print(f"[Warmup] {name} failed: {component['error']}")
+                traceback.print_exc()
+            component['duration_sec'] = round(time.perf_counter() - start, 3)
+            if component['state'] == 'ready':
+                print(f"[Warmup] {name} ready in {component['duration_sec']}s")
+        self.finished_at = time.time()
+
+    def unknown(self, names: List[str]) -> List[str]:
+        """Names in `names` that are not registered components."""
+        with self._lock:
+            return [name for name in names if name not in self._components]
+
+    def is_ready(self, names: Optional[List[str]] = None) -> bool:
+        """
+        True when every required component (or every component in `names`) is ready or disabled.
+        A name in `names` that is not a registered component is never ready.
+        """
+        if names is not None and self.unknown(names):
+            return False
+        for name, component in self._components.items():
+            wanted = name in names if names is not None else component['required']
+            if wanted and component['state'] not in ('ready', 'disabled'):
+                return False
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        """Per-component readiness for the `/ready` endpoint."""
+        return {
+            'ready': self.is_ready(),
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'components': {
+                name: {key: self._components[name][key] for key in ('state', 'required', 'duration_sec', 'error')}
+                for name in self._order
+            },
+        }